@@ -1,151 +1,214 @@
 import calendar
-import sys
+import os
 import textwrap
-from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import timedelta
+from functools import partial
+from typing import Any, List, Dict, Tuple, Callable
 
 import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, Connection, Engine
 
 from database_op import DatabaseOp
+from deal_engine import DealQueryEngine
+from deal_store import DealDataStore
+from gap_filler import GapFiller
+from override_patches import OverridePatchStore
+from period_comparison import PeriodComparison
+from query_cache import QueryCache
+from report_config import ReportConfig, ReportConfigLoader
+from report_writer import ReportWriter
+from run_profiler import RunProfiler
+from stage_checkpoint import StageCheckpointStore
+from stage_pipeline import StagePipeline
 from utils import CommonUtils
 
 
 class Report8AmMorning(object):
     database_op: DatabaseOp = DatabaseOp()
     common_utils: CommonUtils = CommonUtils()
-
-    def __init__(self, config_path: str, report_date: str, time_flag: str) -> None:
+    deal_store: DealDataStore = DealDataStore()
+    config_loader: ReportConfigLoader = ReportConfigLoader()
+    period_comparison: PeriodComparison = PeriodComparison()
+    gap_filler: GapFiller = GapFiller()
+    override_patches: OverridePatchStore = OverridePatchStore()
+    deal_engine: DealQueryEngine = DealQueryEngine()
+
+    # 并发取数的最大线程数（批量回溯时取数任务较多，避免超出数据库连接池容量）
+    max_fetch_workers: int = 8
+    # 日度成交数据逐块读取时的列类型：城市、数据日期、指标值
+    deal_dtypes: List[str] = ['category', 'datetime64[ns]', 'float64']
+    # 补数策略：prompt--交互确认补数方法；none--不补数直接继续（批处理）；auto--程序自动补数（批处理）
+    fill_policies: Tuple[str, ...] = ('prompt', 'none', 'auto')
+    # 数据类型：{newhouse/secondhouse: (名称, 指标列名)}，新房、二手房的准备、标注、统计阶段按数据类型分支并行
+    house_types: Dict[str, Tuple[str, str]] = {'newhouse': ('新房', '成交面积'), 'secondhouse': ('二手房', '成交套数')}
+
+    def __init__(self, config_path: str, report_date: str, time_flag: str, use_local_store: bool = True,
+                 fill_policy: str = 'prompt', output_dir: str = r'data_files', raw_format: str | None = None,
+                 aggregate_in_sql: bool = False, profiler: RunProfiler | None = None,
+                 query_cache: QueryCache | None = None, engine: str | None = None,
+                 checkpoint_dir: str | None = None, resume: bool = False, keep_checkpoints: bool = False,
+                 refresh_store: bool = False) -> None:
+        if fill_policy not in self.fill_policies:
+            raise ValueError(f'不支持的补数策略：{fill_policy}，可选：{self.fill_policies}')
         self.config_path = config_path
         self.report_date = report_date
         self.time_flag = time_flag
+        self.use_local_store = use_local_store
+        # 刷新本地仓库：忽略覆盖记录，本次取数区间全部重新从数据库拉取并覆盖本地仓库（数据源修正历史数据后使用）
+        self.refresh_store = refresh_store
+        self.fill_policy = fill_policy
+        self.output_dir = output_dir
+        # 服务端汇总模式：月度报告中只需期间合计、零成交天数的整月区间按 城市×月份 在数据库（或本地仓库）中汇总后取数
+        self.aggregate_in_sql = aggregate_in_sql
+        # 原始日度数据输出格式：默认交互运行输出 xlsx（供人工补数），批处理运行输出 Parquet/CSV
+        self.report_writer = ReportWriter(raw_format or ReportWriter.get_default_raw_format(fill_policy == 'prompt'))
+        # 运行耗时分析：各阶段耗时、行数、内存峰值写入输出目录下的运行报告（批量回溯时由调用方传入共用的分析器）
+        self.profiler = profiler or RunProfiler(
+            f'{output_dir}/运行报告-{"周度" if time_flag == "w" else "月度"}.json')
+        # 查询结果缓存（录制/回放）：同一报告日期反复运行时直接读取已缓存的查询结果
+        if query_cache is not None:
+            self.database_op = self.database_op.with_query_cache(query_cache)
+        # 统计阶段的聚合引擎：pandas（默认）或 DuckDB，见 DealQueryEngine
+        if engine is not None:
+            self.deal_engine = DealQueryEngine(engine)
+        # 阶段检查点：各阶段输出写入 检查点目录/周度(月度)-报告日期，续跑时跳过指纹未变化的阶段，见 StageCheckpointStore。
+        # 运行成功后删除本次检查点，指定保留时（如修改人工修正数据后续跑）不删除
+        self.keep_checkpoints = keep_checkpoints
+        self.checkpoint_store: StageCheckpointStore | None = None
+        if checkpoint_dir is not None:
+            self.checkpoint_store = StageCheckpointStore(
+                f'{checkpoint_dir}/{"周度" if time_flag == "w" else "月度"}-{report_date}', resume=resume,
+                context={'time_flag': time_flag, 'report_date': report_date,
+                         'config': StageCheckpointStore.get_file_digest(config_path)})
+
+    @property
+    def config(self) -> ReportConfig:
+        """
+        获取解析后的配置对象（进程内缓存，配置文件修改后自动重新加载）
+        :return:
+        """
+        return self.config_loader.load(self.config_path)
 
     def get_config(self) -> Dict[str, pd.DataFrame]:
         """
         获取配置信息
         :return:
         """
-        config_dfs: Dict = pd.read_excel(self.config_path, sheet_name=None)
+        config_dfs: Dict = self.config.sheets
 
         return config_dfs
 
     def get_newhouse_daily_deal_data(self, start_date: str, end_date: str) -> pd.DataFrame:
         """
-        获取新房每日成交数据
+        获取新房每日成交数据：优先从本地仓库读取，仅对本地未覆盖的日期查询数据库
         :param start_date:
         :param end_date:
         :return:
         """
-        conn_url: str = self.database_op.get_db_conn_url('academe_dataspider')
-        house_test_conn_url: str = self.database_op.get_db_conn_url('house_test')
-        dataspider_conn: Connection = self.database_op.get_db_connection(conn_url)
-        house_test_conn: Connection = self.database_op.get_db_connection(house_test_conn_url)
-        newhouse_config_df: pd.DataFrame = self.get_config()['新房配置']
-        # 获取物业类型为"商品住宅"+数据源为"官方发布"的城市列表
-        proptype_house_cities: Tuple[str] = tuple(newhouse_config_df['城市']
-                                                  [(newhouse_config_df['物业类型'] == '商品住宅')
-                                                   & (newhouse_config_df['数据来源'] == '官方发布')].tolist())
-        # 获取物业类型为"商品房"+数据源为"官方发布"的城市列表
-        proptype_all_cities: Tuple[str] | str = tuple(newhouse_config_df['城市']
-                                                      [(newhouse_config_df['物业类型'] == '商品房')
-                                                       & (newhouse_config_df['数据来源'] == '官方发布')].tolist())
-        # 获取物业类型为"商品住宅"+数据源为"项目汇总"的城市列表
-        project_summary_cities: Tuple[str] | str = tuple(newhouse_config_df['城市']
-                                                         [(newhouse_config_df['物业类型'] == '商品住宅')
-                                                          & (newhouse_config_df['数据来源'] == '项目汇总')].tolist())
-        # 处理单个城市情况
-        if len(proptype_all_cities) == 1:
-            proptype_all_cities = f"('{proptype_all_cities[0]}')"
-        if len(project_summary_cities) == 1:
-            project_summary_cities = f"('{project_summary_cities[0]}')"
-
-        sql = f"""
-                SELECT city_name, data_date, chengjiao_area
-                FROM Academe_DataSpider.dbo.CRED_Macro_Deal_Data
-                WHERE index_name1 = '商品住宅'
-                  AND index_name2 = '总体'
-                  AND date_type = 'day'
-                  AND dimension_type = '城市'
-                  AND city_name IN {proptype_house_cities}
-                  AND data_date BETWEEN '{start_date}' AND '{end_date}'
-                UNION
-                SELECT city_name, data_date, chengjiao_area
+        if not self.use_local_store:
+            return self.query_newhouse_daily_deal_data(start_date, end_date)
+        city_list: List[str] = self.config.newhouse_deal_cities
+
+        return self.get_stored_daily_deal_data('newhouse_deal', city_list, '成交面积',
+                                               self.query_newhouse_daily_deal_data, start_date, end_date)
+
+    def get_newhouse_deal_source_sqls(self, start_date: str, end_date: str) -> Dict[str, Tuple[str, str, Dict[str, Any]]]:
+        """
+        新房每日成交各数据源的参数化查询语句（城市、数据日期、成交面积三列，不含排序），逐日查询与服务端汇总共用。
+        日期、城市列表均为绑定参数，语句文本固定，数据库服务端可复用执行计划
+        :param start_date:
+        :param end_date:
+        :return: {数据源名称: (数据库名称, 查询语句, 参数值)}，数据源按去重优先级排列
+        """
+        params: Dict[str, Any] = {
+            'start_date': start_date,
+            'end_date': end_date,
+            # 物业类型为"商品住宅"+数据源为"官方发布"的城市列表
+            'house_cities': list(self.config.newhouse_official_house_cities),
+            # 物业类型为"商品房"+数据源为"官方发布"的城市列表
+            'all_cities': list(self.config.newhouse_official_all_cities),
+            # 物业类型为"商品住宅"+数据源为"项目汇总"的城市列表
+            'project_summary_cities': list(self.config.newhouse_project_summary_cities),
+        }
+
+        # 每个数据源只扫描一次：按（物业类型, 城市）组合过滤，成交面积在服务端换算为万㎡
+        sql = """
+                SELECT city_name, data_date, CONVERT(FLOAT, chengjiao_area) / 10000 chengjiao_area
                 FROM Academe_DataSpider.dbo.CRED_Macro_Deal_Data
-                WHERE index_name1 = '商品房'
-                  AND index_name2 = '总体'
+                WHERE index_name2 = '总体'
                   AND date_type = 'day'
                   AND dimension_type = '城市'
-                  AND city_name IN {proptype_all_cities}
-                  AND data_date BETWEEN '{start_date}' AND '{end_date}'
-                ORDER BY city_name, data_date;
+                  AND ((index_name1 = '商品住宅' AND city_name IN :house_cities)
+                    OR (index_name1 = '商品房' AND city_name IN :all_cities))
+                  AND data_date BETWEEN :start_date AND :end_date
                 """
-        sql_test = f"""
-                    SELECT dimension_value, data_date, deal_area
+        sql_test = """
+                    SELECT dimension_value, data_date, CONVERT(FLOAT, deal_area) / 10000 deal_area
                     FROM dbo.temp_cred_macro_deal_data
-                    WHERE property_type = '商品住宅'
-                      AND index_name = '总体'
+                    WHERE index_name = '总体'
                       AND date_type = 'day'
                       AND dimension_type = '城市'
-                      AND dimension_value IN {proptype_house_cities}
-                      AND data_date BETWEEN '{start_date}' AND '{end_date}'
-                    UNION
-                    SELECT dimension_value, data_date, deal_area
-                    FROM dbo.temp_cred_macro_deal_data
-                    WHERE property_type = '商品房'
-                      AND index_name = '总体'
-                      AND date_type = 'day'
-                      AND dimension_type = '城市'
-                      AND dimension_value IN {proptype_all_cities}
-                      AND data_date BETWEEN '{start_date}' AND '{end_date}'
-                    ORDER BY dimension_value, data_date;
+                      AND ((property_type = '商品住宅' AND dimension_value IN :house_cities)
+                        OR (property_type = '商品房' AND dimension_value IN :all_cities))
+                      AND data_date BETWEEN :start_date AND :end_date
         """
-        sql_project_summary = f"""
+        sql_project_summary = """
                 SELECT dimension_value, data_date, deal_area
                 FROM dbo.temp_CRED_LowDealData
                 WHERE property_type = '商品住宅'
                   AND date_type = 'day'
                   AND dimension_type = '城市'
-                  AND dimension_value IN {project_summary_cities}
-                  AND data_date BETWEEN '{start_date}' AND '{end_date}'
-                ORDER BY dimension_value, data_date;
+                  AND dimension_value IN :project_summary_cities
+                  AND data_date BETWEEN :start_date AND :end_date
                 """
-        sql_chengdu = f"""
-                WITH HouseDealData AS (SELECT district,
-                                              type,
-                                              data_time,
-                                              zz_area,
-                                              create_time,
-                                              ROW_NUMBER() OVER (PARTITION BY district, type, data_time ORDER BY create_time DESC) rn
-                                       FROM Academe_Business.dbo.cih_macro_chengdu_today_deal
-                                       WHERE district = '全市'
-                                         AND type = 'spf'
-                                         AND CONVERT(DATE, data_time) BETWEEN '{start_date}' AND '{end_date}')
+        # 成都新房数据临时从采集表获取：同一日期多次采集取最新一次
+        sql_chengdu = """
                 SELECT '成都' AS                                      city_name,
                        CONVERT(DATE, data_time)                       data_date,
                        ROUND(SUM(CONVERT(FLOAT, zz_area)) / 10000, 2) house_area
-                FROM HouseDealData
+                FROM (SELECT data_time,
+                             zz_area,
+                             ROW_NUMBER() OVER (PARTITION BY district, type, data_time ORDER BY create_time DESC) rn
+                      FROM Academe_Business.dbo.cih_macro_chengdu_today_deal
+                      WHERE district = '全市'
+                        AND type = 'spf'
+                        AND CONVERT(DATE, data_time) BETWEEN :start_date AND :end_date) AS house_deal_data
                 WHERE rn = 1
                 GROUP BY CONVERT(DATE, data_time)
-                ORDER BY city_name, data_date ;
         """
-        column_list: List[str] = ['城市', '数据日期', '成交面积']
-        data_df: pd.DataFrame = pd.read_sql(sql, dataspider_conn)
-        test_data_df: pd.DataFrame = pd.read_sql(sql_test, house_test_conn)
-        data_df.columns = column_list
-        test_data_df.columns = column_list
-        data_df['成交面积'] = data_df['成交面积'].apply(lambda x: x / 10000 if pd.notnull(x) else x)
-        test_data_df['成交面积'] = test_data_df['成交面积'].apply(lambda x: x / 10000 if pd.notnull(x) else x)
-        project_summary_data_df: pd.DataFrame = pd.read_sql(sql_project_summary, house_test_conn)
 
+        return {
+            'main': ('academe_dataspider', sql, params),
+            'project_summary': ('house_test', sql_project_summary, params),
+            'chengdu': ('academe_dataspider', sql_chengdu, params),
+            'test': ('house_test', sql_test, params),
+        }
+
+    def query_newhouse_daily_deal_data(self, start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        从数据库查询新房每日成交数据
+        :param start_date:
+        :param end_date:
+        :return:
+        """
+        column_list: List[str] = ['城市', '数据日期', '成交面积']
         # 成都新房数据临时从本地获取
         # chengdu_newhouse_deal_df: pd.DataFrame = pd.read_excel(r'data_files/成都商品房日度成交数据.xlsx')
         # chengdu_newhouse_deal_df['数据日期'] = pd.to_datetime(chengdu_newhouse_deal_df['数据日期'])
         # # 筛选指定日期范围内的成交数据
         # chengdu_newhouse_deal_df = chengdu_newhouse_deal_df[(chengdu_newhouse_deal_df['数据日期'] >= start_date)
         #                                                    & (chengdu_newhouse_deal_df['数据日期'] <= end_date)]
-        # 成都新房数据临时从采集表获取
-        chengdu_newhouse_deal_df: pd.DataFrame = pd.read_sql(sql_chengdu, dataspider_conn)
+        # 四个数据源相互独立，并发查询
+        data_dfs: Dict[str, pd.DataFrame] = self.database_op.read_sql_concurrently(
+            {name: (*query, self.deal_dtypes)
+             for name, query in self.get_newhouse_deal_source_sqls(start_date, end_date).items()})
+        data_df: pd.DataFrame = data_dfs['main']
+        test_data_df: pd.DataFrame = data_dfs['test']
+        project_summary_data_df: pd.DataFrame = data_dfs['project_summary']
+        chengdu_newhouse_deal_df: pd.DataFrame = data_dfs['chengdu']
+        data_df.columns = column_list
+        test_data_df.columns = column_list
         chengdu_newhouse_deal_df.columns = column_list
 
         project_summary_data_df.columns = column_list
@@ -153,9 +216,9 @@ class Report8AmMorning(object):
         for df in [data_df, project_summary_data_df, chengdu_newhouse_deal_df, test_data_df]:
             if not df.empty:
                 dfs_to_concat.append(df)
-        data_df = pd.concat(dfs_to_concat, ignore_index=True)
+        # 各数据源在查询区间内均无数据时（如数据延迟发布、节假日）为空数据
+        data_df = self.database_op.concat_chunks(dfs_to_concat, column_list, self.deal_dtypes)
         data_df.drop_duplicates(subset=['城市', '数据日期'], inplace=True)
-        data_df['数据日期'] = pd.to_datetime(data_df['数据日期'])
         # 按城市、数据日期排序
         data_df = data_df.sort_values(by=['城市', '数据日期'], ascending=[True, True])
 
@@ -163,77 +226,265 @@ class Report8AmMorning(object):
 
     def get_secondhouse_daily_deal_data(self, start_date: str, end_date: str) -> pd.DataFrame:
         """
-        获取二手房每日成交数据
+        获取二手房每日成交数据：优先从本地仓库读取，仅对本地未覆盖的日期查询数据库
         :param start_date:
         :param end_date:
         :return:
         """
-        conn_url: str = self.database_op.get_db_conn_url('academe_dataspider')
-        house_test_conn: Connection = self.database_op.get_db_conn_url('house_test')
-        dataspider_conn: Connection = self.database_op.get_db_connection(conn_url)
-        secondhouse_config_df: pd.DataFrame = self.get_config()['二手房配置']
-        # 获取物业类型为"二手商品住宅"的城市列表
-        proptype_house_cities: Tuple[str] = tuple(secondhouse_config_df['城市']
-                                                  [secondhouse_config_df['物业类型'] == '二手商品住宅'].tolist())
-        # 获取物业类型为"二手商品房"的城市列表
-        proptype_all_cities: Tuple[str] | str = tuple(secondhouse_config_df['城市']
-                                                      [secondhouse_config_df['物业类型'] == '二手商品房'].tolist())
-        # 处理单个城市情况
-        if len(proptype_all_cities) == 1:
-            proptype_all_cities = f"('{proptype_all_cities[0]}')"
-        sql = f"""  
-                SELECT city_name, data_date, chengjiao_set
-                FROM Academe_DataSpider.dbo.CRED_Macro_Deal_Data
-                WHERE index_name1 = '二手商品住宅'
-                  AND date_type = 'day'
-                  AND dimension_type = '城市'
-                  AND city_name IN {proptype_house_cities}
-                  AND data_date BETWEEN '{start_date}' AND '{end_date}'
-                UNION
+        if not self.use_local_store:
+            return self.query_secondhouse_daily_deal_data(start_date, end_date)
+        city_list: List[str] = self.config.secondhouse_deal_cities
+
+        return self.get_stored_daily_deal_data('secondhouse_deal', city_list, '成交套数',
+                                               self.query_secondhouse_daily_deal_data, start_date, end_date)
+
+    def get_secondhouse_deal_source_sqls(self, start_date: str, end_date: str) -> Dict[str, Tuple[str, str, Dict[str, Any]]]:
+        """
+        二手房每日成交各数据源的参数化查询语句（城市、数据日期、成交套数三列，不含排序），逐日查询与服务端汇总共用
+        :param start_date:
+        :param end_date:
+        :return: {数据源名称: (数据库名称, 查询语句, 参数值)}，数据源按去重优先级排列
+        """
+        params: Dict[str, Any] = {
+            'start_date': start_date,
+            'end_date': end_date,
+            # 物业类型为"二手商品住宅"的城市列表
+            'house_cities': list(self.config.secondhouse_house_cities),
+            # 物业类型为"二手商品房"的城市列表
+            'all_cities': list(self.config.secondhouse_all_cities),
+        }
+        # 每个数据源只扫描一次：按（物业类型, 城市）组合过滤
+        sql = """
                 SELECT city_name, data_date, chengjiao_set
                 FROM Academe_DataSpider.dbo.CRED_Macro_Deal_Data
-                WHERE index_name1 = '二手商品房'
-                  AND date_type = 'day'
+                WHERE date_type = 'day'
                   AND dimension_type = '城市'
-                  AND city_name IN {proptype_all_cities}
-                  AND data_date BETWEEN '{start_date}' AND '{end_date}'
-                ORDER BY city_name, data_date;
+                  AND ((index_name1 = '二手商品住宅' AND city_name IN :house_cities)
+                    OR (index_name1 = '二手商品房' AND city_name IN :all_cities))
+                  AND data_date BETWEEN :start_date AND :end_date
                 """
-        sql_test = f"""
+        sql_test = """
                     SELECT dimension_value, data_date, deal_num
                     FROM dbo.temp_cred_macro_deal_data
-                    WHERE property_type = '二手商品住宅'
-                      AND date_type = 'day'
-                      AND dimension_type = '城市'
-                      AND dimension_value IN {proptype_house_cities}
-                      AND data_date BETWEEN '{start_date}' AND '{end_date}'
-                    UNION
-                    SELECT dimension_value, data_date, deal_num
-                    FROM dbo.temp_cred_macro_deal_data
-                    WHERE property_type = '二手商品房'
-                      AND date_type = 'day'
+                    WHERE date_type = 'day'
                       AND dimension_type = '城市'
-                      AND dimension_value IN {proptype_all_cities}
-                      AND data_date BETWEEN '{start_date}' AND '{end_date}'
-                    ORDER BY dimension_value, data_date;
+                      AND ((property_type = '二手商品住宅' AND dimension_value IN :house_cities)
+                        OR (property_type = '二手商品房' AND dimension_value IN :all_cities))
+                      AND data_date BETWEEN :start_date AND :end_date
                 """
-        data_df: pd.DataFrame = pd.read_sql(sql, dataspider_conn)
-        test_data_df: pd.DataFrame = pd.read_sql(sql_test, house_test_conn)
+
+        return {
+            'main': ('academe_dataspider', sql, params),
+            'test': ('house_test', sql_test, params),
+        }
+
+    def query_secondhouse_daily_deal_data(self, start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        从数据库查询二手房每日成交数据
+        :param start_date:
+        :param end_date:
+        :return:
+        """
+        data_dfs: Dict[str, pd.DataFrame] = self.database_op.read_sql_concurrently(
+            {name: (*query, self.deal_dtypes)
+             for name, query in self.get_secondhouse_deal_source_sqls(start_date, end_date).items()})
+        data_df: pd.DataFrame = data_dfs['main']
+        test_data_df: pd.DataFrame = data_dfs['test']
         column_list: List[str] = ['城市', '数据日期', '成交套数']
         data_df.columns = column_list
         test_data_df.columns = column_list
         dfs_to_concat = []
         for df in [data_df, test_data_df]:
             if not df.empty:
-                dfs_to_concat.append(df) 
-        data_df = pd.concat(dfs_to_concat, ignore_index=True)
+                dfs_to_concat.append(df)
+        # 各数据源在查询区间内均无数据时（如数据延迟发布、节假日）为空数据
+        data_df = self.database_op.concat_chunks(dfs_to_concat, column_list, self.deal_dtypes)
         data_df.drop_duplicates(subset=['城市', '数据日期'], inplace=True)
-        data_df['数据日期'] = pd.to_datetime(data_df['数据日期'])
         # 按城市、数据日期排序
         data_df = data_df.sort_values(by=['城市', '数据日期'], ascending=[True, True])
 
         return data_df
 
+    def get_stored_daily_deal_data(self, source: str, city_list: List[str], value_column: str,
+                                   query_func: Callable[[str, str], pd.DataFrame],
+                                   start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        增量获取日度成交数据：本地仓库缺少的日期区间从数据库补拉并入库，再统一从本地仓库读取
+        :param source: 数据源标识
+        :param city_list: 城市列表
+        :param value_column: 指标列名
+        :param query_func: 数据库查询函数
+        :param start_date:
+        :param end_date:
+        :return:
+        """
+        self.sync_store_city_specs(source)
+        if self.refresh_store:
+            # 刷新时整个区间重新拉取
+            missing_dates: List[str] = [start_date, end_date]
+        else:
+            missing_dates = self.deal_store.get_missing_dates(source, city_list, start_date, end_date)
+        if missing_dates:
+            fetch_start_date, fetch_end_date = min(missing_dates), max(missing_dates)
+            db_data_df: pd.DataFrame = query_func(fetch_start_date, fetch_end_date)
+            self.deal_store.save(source, db_data_df, city_list, fetch_start_date, fetch_end_date)
+        data_df: pd.DataFrame = self.deal_store.load(source, city_list, start_date, end_date)
+        data_df.columns = ['城市', '数据日期', value_column]
+
+        return data_df
+
+    def sync_store_city_specs(self, source: str) -> None:
+        """
+        向本地仓库登记各城市当前配置的取数口径，口径变更的城市已存数据作废
+        :param source: 数据源标识：newhouse_deal--新房；secondhouse_deal--二手房
+        :return:
+        """
+        changed_cities: List[str] = self.deal_store.sync_city_specs(
+            source, self.config.get_deal_city_specs(source.split('_')[0]))
+        if changed_cities:
+            print(f'配置中取数口径变更的城市：{changed_cities}，本地仓库中已存的数据作废，重新从数据库拉取')
+
+    def get_newhouse_monthly_deal_summary(self, start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        获取新房按城市、月份汇总的成交数据（服务端汇总模式，用于只需期间合计的整月区间）
+        :param start_date: 开始日期（月初）
+        :param end_date: 结束日期（月末）
+        :return:
+        """
+        return self.get_monthly_deal_summary('newhouse_deal', self.config.newhouse_deal_cities, '成交面积',
+                                             self.get_newhouse_deal_source_sqls(start_date, end_date),
+                                             start_date, end_date)
+
+    def get_secondhouse_monthly_deal_summary(self, start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        获取二手房按城市、月份汇总的成交数据（服务端汇总模式，用于只需期间合计的整月区间）
+        :param start_date: 开始日期（月初）
+        :param end_date: 结束日期（月末）
+        :return:
+        """
+        return self.get_monthly_deal_summary('secondhouse_deal', self.config.secondhouse_deal_cities, '成交套数',
+                                             self.get_secondhouse_deal_source_sqls(start_date, end_date),
+                                             start_date, end_date)
+
+    def get_monthly_deal_summary(self, source: str, city_list: List[str], value_column: str,
+                                 source_sqls: Dict[str, Tuple[str, str, Dict[str, Any]]],
+                                 start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        按 城市×月份 汇总成交数据：本地仓库已覆盖整个区间时直接在本地仓库中汇总，否则在数据库服务端汇总，只传输汇总结果。
+        汇总结果按 城市×月份 补齐（无数据的月份合计为0），结构与 summarize_deal_data 的本地汇总一致
+        :param source: 数据源标识
+        :param city_list: 城市列表
+        :param value_column: 指标列名
+        :param source_sqls: 各数据源的每日成交参数化查询语句，见 get_newhouse_deal_source_sqls
+        :param start_date: 开始日期（月初）
+        :param end_date: 结束日期（月末）
+        :return: 城市、数据日期（月初）、指标合计、有数天数、零成交天数、月份
+        """
+        use_store: bool = self.use_local_store and not self.refresh_store
+        if use_store:
+            self.sync_store_city_specs(source)
+        if use_store and not self.deal_store.get_missing_dates(source, city_list, start_date, end_date):
+            summary_df: pd.DataFrame = self.deal_store.load_monthly_summary(source, city_list, start_date, end_date)
+        else:
+            summary_df = self.query_monthly_deal_summary(source_sqls)
+        summary_df.columns = ['城市', '数据日期', value_column, '有数天数', '零成交天数']
+        summary_df['数据日期'] = pd.to_datetime(summary_df['数据日期'])
+
+        # 按 城市×月份 补齐，城市为分类编码（与日度数据网格一致）
+        grid_index: pd.MultiIndex = pd.MultiIndex.from_product(
+            [list(dict.fromkeys(city_list)), pd.date_range(start_date, end_date, freq='MS')], names=['城市', '数据日期'])
+        summary_df = (summary_df[summary_df['城市'].isin(city_list)].set_index(['城市', '数据日期'])
+                      .reindex(grid_index).fillna(0).reset_index())
+        summary_df['城市'] = summary_df['城市'].astype(self.config.city_dtype)
+        summary_df[['有数天数', '零成交天数']] = summary_df[['有数天数', '零成交天数']].astype(int)
+        summary_df['月份'] = self.common_utils.lookup_calendar(summary_df['数据日期'], '月份')
+
+        return summary_df
+
+    def query_monthly_deal_summary(self, source_sqls: Dict[str, Tuple[str, str, Dict[str, Any]]]) -> pd.DataFrame:
+        """
+        在数据库服务端按 城市×月份 汇总各数据源的每日成交（GROUP BY），各数据源并发查询，结果与逐日取数后去重再汇总一致：
+        各数据源同时返回当月有数据的日期掩码，同一城市同一月份各数据源的日期互不重叠（低优先级数据源只补充缺失日期）
+        且数据源内无重复日期时，直接合并各数据源的汇总；否则只对这些 城市×月份 逐日取数，按数据源优先级逐日去重后再汇总
+        :param source_sqls: {数据源名称: (数据库名称, 每日成交查询语句, 参数值)}，按去重优先级排列
+        :return: 城市、月初日期、指标合计、有数天数、零成交天数
+        """
+        summary_sqls: Dict[str, Tuple[str, str, Dict[str, Any]]] = {}
+        for name, (db_name, sql, params) in source_sqls.items():
+            summary_sqls[name] = (db_name, f"""
+                SELECT city_name,
+                       DATEFROMPARTS(YEAR(data_date), MONTH(data_date), 1)            month_first_day,
+                       ISNULL(SUM(CONVERT(FLOAT, deal_value)), 0)                     deal_value,
+                       COUNT(deal_value)                                              data_days,
+                       SUM(CASE WHEN deal_value = 0 THEN 1 ELSE 0 END)                zero_days,
+                       COUNT(*)                                                       row_count,
+                       COUNT(DISTINCT data_date)                                      date_days,
+                       SUM(DISTINCT POWER(CAST(2 AS BIGINT), DAY(data_date) - 1))     date_mask
+                FROM ({sql}) AS daily_deal (city_name, data_date, deal_value)
+                GROUP BY city_name, DATEFROMPARTS(YEAR(data_date), MONTH(data_date), 1);
+                """, params)
+        data_dfs: Dict[str, pd.DataFrame] = self.database_op.read_sql_concurrently(summary_sqls)
+        summary_dfs: List[pd.DataFrame] = []
+        for name in source_sqls:
+            summary_df: pd.DataFrame = data_dfs[name]
+            summary_df.columns = ['城市', '数据日期', '合计', '有数天数', '零成交天数', '行数', '日期数', '日期掩码']
+            summary_dfs.append(summary_df)
+        summary_df = pd.concat(summary_dfs, ignore_index=True)
+        summary_df['数据日期'] = pd.to_datetime(summary_df['数据日期'])
+
+        # 逐日展开日期掩码：同一日期出现在多个数据源、或数据源内有重复日期的 城市×月份 须逐日去重
+        day_flags: pd.DataFrame = pd.DataFrame(
+            (summary_df['日期掩码'].to_numpy(dtype='int64')[:, None] >> np.arange(31)) & 1, index=summary_df.index)
+        group_keys: List[pd.Series] = [summary_df['城市'], summary_df['数据日期']]
+        conflict_sr: pd.Series = (day_flags.groupby(group_keys).sum().gt(1).any(axis=1)
+                                  | summary_df['行数'].ne(summary_df['日期数']).groupby(group_keys).any())
+        conflict_index: pd.MultiIndex = conflict_sr[conflict_sr].index
+        is_conflict: pd.Series = pd.Series(
+            pd.MultiIndex.from_frame(summary_df[['城市', '数据日期']]).isin(conflict_index), index=summary_df.index)
+        summary_df = (summary_df[~is_conflict]
+                      .groupby(['城市', '数据日期'], as_index=False)[['合计', '有数天数', '零成交天数']].sum())
+        if conflict_index.empty:
+            return summary_df
+
+        conflict_df: pd.DataFrame = self.query_conflict_monthly_summary(source_sqls, conflict_index)
+
+        return (pd.concat([summary_df, conflict_df.astype({'城市': str})], ignore_index=True)
+                .sort_values(by=['城市', '数据日期']).reset_index(drop=True))
+
+    def query_conflict_monthly_summary(self, source_sqls: Dict[str, Tuple[str, str, Dict[str, Any]]],
+                                       conflict_index: pd.MultiIndex) -> pd.DataFrame:
+        """
+        数据源日期重叠的 城市×月份：只对涉及的城市、月份区间逐日取数，与逐日取数相同按数据源优先级逐日去重后在本地汇总
+        :param source_sqls: {数据源名称: (数据库名称, 每日成交查询语句, 参数值)}，按去重优先级排列
+        :param conflict_index: 须逐日去重的 (城市, 月初日期)
+        :return: 城市、月初日期、指标合计、有数天数、零成交天数
+        """
+        conflict_cities: set = set(conflict_index.get_level_values('城市'))
+        month_first_days: pd.Index = conflict_index.get_level_values('数据日期')
+        start_date: str = month_first_days.min().strftime('%Y-%m-%d')
+        end_date: str = (month_first_days.max() + pd.offsets.MonthEnd(0)).strftime('%Y-%m-%d')
+        daily_sqls: Dict[str, Tuple] = {}
+        for name, (db_name, sql, params) in source_sqls.items():
+            # 城市列表参数只保留涉及的城市，日期区间收窄至涉及的月份
+            daily_params: Dict[str, Any] = {
+                key: [city for city in value if city in conflict_cities] if isinstance(value, list) else value
+                for key, value in params.items()}
+            daily_params.update(start_date=start_date, end_date=end_date)
+            daily_sqls[name] = (db_name, sql, daily_params, self.deal_dtypes)
+        data_dfs: Dict[str, pd.DataFrame] = self.database_op.read_sql_concurrently(daily_sqls)
+        daily_dfs: List[pd.DataFrame] = []
+        for name in source_sqls:
+            data_df: pd.DataFrame = data_dfs[name]
+            data_df.columns = ['城市', '数据日期', '合计']
+            if not data_df.empty:
+                daily_dfs.append(data_df)
+        data_df = self.database_op.concat_chunks(daily_dfs, ['城市', '数据日期', '合计'],
+                                                 self.deal_dtypes).drop_duplicates(subset=['城市', '数据日期'])
+        month_first_days = data_df['数据日期'].dt.to_period('M').dt.to_timestamp()
+        data_df = data_df[pd.MultiIndex.from_arrays([data_df['城市'].astype(str), month_first_days]).isin(conflict_index)]
+
+        return self.deal_engine.summarize_monthly(data_df, '合计')
+
     def get_newhouse_available_data(self, end_date: str) -> pd.DataFrame:
         """
         获取新房可售数据
@@ -241,42 +492,168 @@ class Report8AmMorning(object):
         :return:
         """
         # end_date = self.date_utils.get_data_date_interval(self.report_date)[1]
-        conn_url: str = self.database_op.get_db_conn_url('academe_dataspider')
-        dataspider_conn: Connection = self.database_op.get_db_connection(conn_url)
-        newhouse_config_df: pd.DataFrame = self.get_config()['新房可售配置']
-        # 获取需要统计可售数据的城市列表
-        city_list: Tuple[str] = tuple(newhouse_config_df['城市'].tolist())
-
-        sql = f"""
-                SELECT city_name, keshou_set, keshou_area
+        sql = """
+                SELECT city_name,
+                       CONVERT(INT, keshou_set)                        keshou_set,
+                       ROUND(CONVERT(FLOAT, keshou_area) / 10000, 2) keshou_area
                 FROM Academe_DataSpider.dbo.CRED_Macro_Deal_Data
                 WHERE index_name1 = '商品住宅'
                   AND index_name2 = '总体'
                   AND date_type = 'day'
                   AND dimension_type = '城市'
-                  AND city_name IN {city_list}
-                  AND data_date = '{end_date}'
+                  AND city_name IN :city_list
+                  AND data_date = :end_date
                 ORDER BY city_name;
                 """
-        data_df: pd.DataFrame = pd.read_sql(sql, dataspider_conn)
+        # 需要统计可售数据的城市列表、日期均为绑定参数
+        data_df: pd.DataFrame = self.database_op.read_sql('academe_dataspider', sql, {
+            'city_list': list(self.config.newhouse_available_cities),
+            'end_date': end_date,
+        })
         column_list: List[str] = ['城市', '可售套数', '可售面积']
         data_df.columns = column_list
-        data_df['可售套数'] = data_df['可售套数'].astype(int)
-        data_df['可售面积'] = data_df['可售面积'].apply(lambda x: round(x / 10000, 2))
 
         return data_df
 
-    def data_statistics(self) -> pd.DataFrame:
+    def fetch_source_data(self, fetch_tasks: Dict[str, Tuple[Callable[..., pd.DataFrame], tuple]]) -> Dict[str, pd.DataFrame]:
+        """
+        并发取数阶段：一次性提交本期所有相互独立的取数任务并汇总结果，取数总耗时取决于最慢的单个查询
+        :param fetch_tasks: {任务名称: (取数函数, 参数元组)}
+        :return: {任务名称: 取数结果}
+        """
+        with self.profiler.span('fetch_source_data', 'fetch', report_date=self.report_date) as fetch_span:
+            with ThreadPoolExecutor(max_workers=min(len(fetch_tasks), self.max_fetch_workers)) as executor:
+                futures: Dict[str, Future] = {name: executor.submit(self.run_fetch_task, name, fetch_func, args)
+                                              for name, (fetch_func, args) in fetch_tasks.items()}
+                fetched_dfs: Dict[str, pd.DataFrame] = {name: future.result() for name, future in futures.items()}
+            fetch_span['rows_out'] = self.count_rows(fetched_dfs)
+            if self.database_op.query_cache is not None:
+                fetch_span['query_cache_hits'] = self.database_op.query_cache.hits
+                fetch_span['query_cache_misses'] = self.database_op.query_cache.misses
+
+        return fetched_dfs
+
+    def run_fetch_task(self, task_name: str, fetch_func: Callable[..., pd.DataFrame], args: tuple) -> pd.DataFrame:
         """
-        数据统计：分周月度
+        执行单个取数任务，并记录耗时、返回行数
+        :param task_name: 任务名称
+        :param fetch_func: 取数函数
+        :param args: 参数元组
         :return:
         """
-        newhouse_deal_city_list: List[str] = self.get_config()['新房配置']['城市'].tolist()
-        secondhouse_deal_city_list: List[str] = self.get_config()['二手房配置']['城市'].tolist()
-        newhouse_available_city_list: List[str] = self.get_config()['新房可售配置']['城市'].tolist()
-        # 新房相关数据统计
-        if self.time_flag == 'w':    # 周度数据统计
-            # 新房本年度交易数据统计
+        with self.profiler.span(f'fetch:{task_name}', 'fetch', parent='fetch_source_data',
+                                report_date=self.report_date) as task_span:
+            data_df: pd.DataFrame = fetch_func(*args)
+            task_span['rows_out'] = len(data_df)
+
+        return data_df
+
+    @staticmethod
+    def count_rows(data_dfs: Dict[str, pd.DataFrame]) -> int:
+        """
+        统计多个数据表的总行数
+        :param data_dfs: {名称: 数据}
+        :return:
+        """
+        return sum(len(data_df) for data_df in data_dfs.values())
+
+    def get_fill_method(self, raw_data_path: str) -> str:
+        """
+        获取补数方法：交互模式下提示用户确认；批处理模式下按补数策略直接返回，不阻塞等待输入
+        :param raw_data_path: 原始日度数据文件路径
+        :return: '1'--人工手动补数；'2'--程序自动补数；''--无需补数
+        """
+        if self.fill_policy == 'none':
+            return ''
+        if self.fill_policy == 'auto':
+            return '2'
+        prompt_msg: str = f"""
+        原始数据已存储至【{raw_data_path}】。
+        请确认以上数据是否正确，若数据有缺失，请确认补数方法：
+        1--人工手动补数；2--程序自动补数。
+        注意，人工手动补数完成后请保存并关闭文件；若无需补数，请回车继续。
+        """
+
+        return input(textwrap.dedent(prompt_msg))
+
+    def get_deal_sheet_spec(self, sheet_name: str) -> Tuple[str, str]:
+        """
+        获取原始日度成交数据 sheet 对应的指标列名、数据类型
+        :param sheet_name: sheet名称，以"新房"或"二手房"开头
+        :return: (指标列名, 数据类型)
+        """
+        if sheet_name.startswith('新房'):
+            return '成交面积', '新房'
+
+        return '成交套数', '二手房'
+
+    def apply_override_patches(self, deal_dfs: Dict[str, pd.DataFrame],
+                               patch_df: pd.DataFrame | None = None) -> Dict[str, pd.DataFrame]:
+        """
+        应用已持久化的人工修正数据
+        :param deal_dfs: {sheet名称: 日度成交数据}
+        :param patch_df: 人工修正数据，为空时读取已持久化的数据
+        :return: 修正后的日度成交数据
+        """
+        if patch_df is None:
+            patch_df = self.override_patches.load()
+
+        return {sheet_name: self.override_patches.apply(deal_df, *self.get_deal_sheet_spec(sheet_name), patch_df=patch_df)
+                for sheet_name, deal_df in deal_dfs.items()}
+
+    def record_manual_fill(self, deal_dfs: Dict[str, pd.DataFrame],
+                           edited_dfs: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        人工补数：比对人工编辑后的原始数据与内存中的快照，仅将改动过的单元格记为人工修正数据并持久化，再应用到内存数据
+        :param deal_dfs: {sheet名称: 日度成交数据快照}
+        :param edited_dfs: {sheet名称: 人工编辑后的数据}
+        :return: 修正后的日度成交数据
+        """
+        patch_df: pd.DataFrame = pd.concat(
+            [self.override_patches.diff(deal_df, edited_dfs[sheet_name], *self.get_deal_sheet_spec(sheet_name))
+             for sheet_name, deal_df in deal_dfs.items()], ignore_index=True)
+        patch_df = patch_df.drop_duplicates(subset=self.override_patches.key_columns, keep='last')
+        self.override_patches.save(patch_df)
+        print(f'人工修正 {len(patch_df)} 个单元格，已存储至【{self.override_patches.patch_path}】。')
+
+        return {sheet_name: self.override_patches.apply(deal_df, *self.get_deal_sheet_spec(sheet_name), patch_df=patch_df)
+                for sheet_name, deal_df in deal_dfs.items()}
+
+    def auto_fill_deal_data(self, deal_dfs: Dict[str, pd.DataFrame], detail_path: str) -> Dict[str, pd.DataFrame]:
+        """
+        程序自动补数：按补数规则级联填充新房、二手房日度成交数据的缺失值，并将补数明细存储至文件
+        :param deal_dfs: {sheet名称: 日度成交数据}，sheet名称以"新房"或"二手房"开头
+        :param detail_path: 补数明细文件路径
+        :return: 填充后的日度成交数据
+        """
+        with self.profiler.span('auto_fill', 'transform', rows_in=self.count_rows(deal_dfs),
+                                report_date=self.report_date) as fill_span:
+            filled_dfs: Dict[str, pd.DataFrame] = {
+                sheet_name: self.gap_filler.fill(deal_df, *self.get_deal_sheet_spec(sheet_name),
+                                                 self.config.holiday_zero_fill_cities if sheet_name.startswith('新房') else [])
+                for sheet_name, deal_df in deal_dfs.items()}
+            fill_span['rows_out'] = self.count_rows(filled_dfs)
+
+        provenance_column: str = self.gap_filler.provenance_column
+        filled_detail_dfs: Dict[str, pd.DataFrame] = {}
+        for sheet_name, filled_df in filled_dfs.items():
+            filled_detail_dfs[sheet_name] = filled_df[filled_df[provenance_column].notnull()]
+            print(f'{sheet_name}自动补数情况：')
+            print(filled_detail_dfs[sheet_name][provenance_column].value_counts())
+        with self.profiler.span('write_fill_detail', 'write', rows_in=self.count_rows(filled_detail_dfs),
+                                report_date=self.report_date):
+            self.report_writer.write_excel(detail_path, filled_detail_dfs)
+        print(f'自动补数明细已存储至【{detail_path}】。')
+
+        return filled_dfs
+
+    def get_report_periods(self) -> Dict[str, str]:
+        """
+        计算报告各统计区间的起止日期：只依赖报告日期和时间维度，供取数计划与数据统计共用
+        :return: {日期名称: 日期（yyyy-mm-dd）}
+        """
+        if self.time_flag == 'w':    # 周度
+            # 本年度交易数据统计区间：近8周，且至少覆盖上月1号起（用于月度环比）
             current_start_date, current_end_date = self.common_utils.get_data_date_interval(
                 specified_date=self.report_date, delta_days=55)
             current_week_satuaday: pd.Timestamp = (pd.to_datetime(self.report_date) - pd.Timedelta(days=1))
@@ -293,15 +670,7 @@ class Report8AmMorning(object):
             if pd.to_datetime(current_start_date) > pd.to_datetime(last_month_first_day):
                 current_start_date = last_month_first_day
 
-            current_year_newhouse_deal_df: pd.DataFrame = self.common_utils.generate_continous_data(
-                newhouse_deal_city_list, current_start_date, current_end_date)
-            db_current_year_newhouse_deal_df: pd.DataFrame = self.get_newhouse_daily_deal_data(current_start_date,
-                                                                                               current_end_date)
-            current_year_newhouse_deal_df = current_year_newhouse_deal_df.merge(db_current_year_newhouse_deal_df,
-                                                                              on=['城市', '数据日期'], how='left')
-            current_year_newhouse_deal_df.drop_duplicates(inplace=True)
-
-            # 新房去年交易数据统计
+            # 去年交易数据统计区间：覆盖去年同周及去年同月
             last_year_same_week_sunday: str = self.common_utils.get_last_year_week_date(self.report_date)
             last_year_same_week_start_date, last_year_same_week_end_date = self.common_utils.get_data_date_interval(
                 specified_date=last_year_same_week_sunday, delta_days=6)
@@ -320,525 +689,27 @@ class Report8AmMorning(object):
             else:
                 last_year_end_date = last_year_same_month_last_day
 
-            last_year_newhouse_deal_df: pd.DataFrame = self.common_utils.generate_continous_data(
-                newhouse_deal_city_list, last_year_start_date, last_year_end_date)
-            db_last_year__newhouse_deal_df: pd.DataFrame = self.get_newhouse_daily_deal_data(
-                last_year_start_date, last_year_end_date)
-            last_year_newhouse_deal_df = last_year_newhouse_deal_df.merge(
-                db_last_year__newhouse_deal_df, on=['城市', '数据日期'], how='left')
-
-            # 周度可售：统计本周期周六的可售套数、面积（万㎡）。若周六数据缺失且无法补充，则可用最近日期的可售代替周度可售数据。
-            current_week_newhouse_available_df: pd.DataFrame = self.get_newhouse_available_data(current_week_satuaday)
-
-            # 周度可售：统计上周周六的可售套数、面积（万㎡）。若周六数据缺失且无法补充，则可用最近日期的可售代替周度可售数据。
+            # 周度可售：统计本周期周六、上周周六的可售套数、面积（万㎡）。若周六数据缺失且无法补充，则可用最近日期的可售代替周度可售数据。
             last_week_satuaday: str = (pd.to_datetime(current_week_satuaday)
                                        - pd.Timedelta(days=7)).strftime('%Y-%m-%d')
-            last_week_newhouse_available_df: pd.DataFrame = self.get_newhouse_available_data(last_week_satuaday)
-
-            # 二手房相关数据统计
-            # 二手房本年度交易数据统计
-            current_year_secondhouse_deal_df: pd.DataFrame = self.common_utils.generate_continous_data(
-                secondhouse_deal_city_list, current_start_date, current_end_date)
-            db_current_year_secondhouse_deal_df: pd.DataFrame = self.get_secondhouse_daily_deal_data(current_start_date,
-                                                                                                    current_end_date)
-            current_year_secondhouse_deal_df = current_year_secondhouse_deal_df.merge(
-                db_current_year_secondhouse_deal_df, on=['城市', '数据日期'], how='left')
-            current_year_secondhouse_deal_df.drop_duplicates(inplace=True)
-
-            # 二手房去年交易数据统计
-            last_year_secondhouse_deal_df: pd.DataFrame = self.common_utils.generate_continous_data(
-                secondhouse_deal_city_list, last_year_start_date, last_year_end_date)
-            db_last_year_secondhouse_deal_df: pd.DataFrame = self.get_secondhouse_daily_deal_data(
-                last_year_start_date, last_year_end_date)
-            last_year_secondhouse_deal_df = last_year_secondhouse_deal_df.merge(
-                db_last_year_secondhouse_deal_df, on=['城市', '数据日期'], how='left')
-            last_year_secondhouse_deal_df.drop_duplicates(inplace=True)
-
-            # 衢州新房成交缺数处理：节假日或周末缺数默认补0
-            current_year: int = pd.to_datetime(current_end_date).year
-            holiday_dates: List[datetime.date] = self.common_utils.get_cn_holidays([current_year - 1, current_year])
-            current_year_newhouse_deal_df.loc[((current_year_newhouse_deal_df['城市'] == '衢州')
-                                               & (current_year_newhouse_deal_df['成交面积'].isnull())), '成交面积'] \
-                = (current_year_newhouse_deal_df.loc[((current_year_newhouse_deal_df['城市'] == '衢州')
-                                               & (current_year_newhouse_deal_df['成交面积'].isnull())), :]
-                   .apply(lambda x: 0 if x['数据日期'].date() in holiday_dates
-                                         or x['数据日期'].weekday() in (5, 6) else x['成交面积'], axis=1))
-            last_year_newhouse_deal_df.loc[((last_year_newhouse_deal_df['城市'] == '衢州')
-                                            & (last_year_newhouse_deal_df['成交面积'].isnull())), '成交面积'] \
-                = (last_year_newhouse_deal_df.loc[((last_year_newhouse_deal_df['城市'] == '衢州')
-                                                   & (last_year_newhouse_deal_df['成交面积'].isnull())), :]
-                   .apply(lambda x: 0 if x['数据日期'].date() in holiday_dates
-                                         or x['数据日期'].weekday() in (5, 6) else x['成交面积'], axis=1))
-
-            # 存储上述统计结果，用于补数确认
-            with pd.ExcelWriter(f'data_files/报告原始日度数据-周度.xlsx') as writer:
-                current_year_newhouse_deal_df.to_excel(writer, sheet_name='新房-本年度交易', index=False)
-                last_year_newhouse_deal_df.to_excel(writer, sheet_name='新房-去年交易', index=False)
-                current_week_newhouse_available_df.to_excel(writer, sheet_name='新房-本周可售', index=False)
-                last_week_newhouse_available_df.to_excel(writer, sheet_name='新房-上周可售', index=False)
-                current_year_secondhouse_deal_df.to_excel(writer, sheet_name='二手房-本年度交易', index=False)
-                last_year_secondhouse_deal_df.to_excel(writer, sheet_name='二手房-去年交易', index=False)
-
-            # 缺数天数统计
-            current_year_newhouse_deal_df['缺数'] = (current_year_newhouse_deal_df['成交面积']
-                                                     .apply(lambda x: 1 if pd.isnull(x) else 0))
-            last_year_newhouse_deal_df['缺数'] = (last_year_newhouse_deal_df['成交面积']
-                                                  .apply(lambda x: 1 if pd.isnull(x) else 0))
-            current_year_secondhouse_deal_df['缺数'] = (current_year_secondhouse_deal_df['成交套数']
-                                                       .apply(lambda x: 1 if pd.isnull(x) else 0))
-            last_year_secondhouse_deal_df['缺数'] = (last_year_secondhouse_deal_df['成交套数']
-                                                    .apply(lambda x: 1 if pd.isnull(x) else 0))
-            current_week_newhouse_available_shortage_city_list: List[str] = list(
-                set(newhouse_available_city_list).difference(set(current_week_newhouse_available_df['城市'].tolist())))
-            last_week_newhouse_available_shortage_city_list: List[str] = list(
-                set(newhouse_available_city_list).difference(set(last_week_newhouse_available_df['城市'].tolist())))
-            print('本年度新房缺数情况：')
-            print(current_year_newhouse_deal_df.groupby('城市')['缺数'].sum())
-            print('去年同期新房缺数情况：')
-            print(last_year_newhouse_deal_df.groupby('城市')['缺数'].sum())
-            print('本年度二手房缺数情况：')
-            print(current_year_secondhouse_deal_df.groupby('城市')['缺数'].sum())
-            print('去年同期二手房缺数情况：')
-            print(last_year_secondhouse_deal_df.groupby('城市')['缺数'].sum())
-            print(f'本周新房可售缺数城市：{current_week_newhouse_available_shortage_city_list}')
-            print(f'上周新房可售缺数城市：{last_week_newhouse_available_shortage_city_list}')
-
-
-            prompt_msg: str = f"""
-            原始数据已存储至【data_files/报告原始日度数据-周度.xlsx】。
-            请确认以上数据是否正确，若数据有缺失，请确认补数方法：
-            1--人工手动补数；2--程序自动补数（待开发）。
-            注意，人工手动补数完成后请保存并关闭文件；若无需补数，请回车继续。
-            """
-            prompt_input: str = input(textwrap.dedent(prompt_msg))
-            if prompt_input == '1':
-                # 手动补数，重新加载补数后的文件
-                data_dfs: Dict[str, pd.DataFrame] = pd.read_excel(f'data_files/报告原始日度数据-周度.xlsx',
-                                                                  sheet_name=None)
-                current_year_newhouse_deal_df = data_dfs['新房-本年度交易']
-                last_year_newhouse_deal_df = data_dfs['新房-去年交易']
-                current_week_newhouse_available_df = data_dfs['新房-本周可售']
-                last_week_newhouse_available_df = data_dfs['新房-上周可售']
-                current_year_secondhouse_deal_df = data_dfs['二手房-本年度交易']
-                last_year_secondhouse_deal_df = data_dfs['二手房-去年交易']
-            elif prompt_input == '2':
-                # 自动补数，待开发
-                sys.exit()
-            else:
-                pass
-
-            # 为上述统计数据增加"梯队"和"周度数"
-            city_level_df: pd.DataFrame = self.get_config()['城市梯队']
-            city_level_dict: Dict[str, str] = city_level_df.set_index('城市')['梯队'].to_dict()
-            current_year_newhouse_deal_df['梯队'] = current_year_newhouse_deal_df['城市'].map(city_level_dict)
-            current_year_newhouse_deal_df['周度数'] = current_year_newhouse_deal_df['数据日期'].apply(
-                lambda x: self.common_utils.get_year_week(x))
-            last_year_newhouse_deal_df['梯队'] = last_year_newhouse_deal_df['城市'].map(city_level_dict)
-            last_year_newhouse_deal_df['周度数'] = last_year_newhouse_deal_df['数据日期'].apply(
-                lambda x: self.common_utils.get_year_week(x))
-            current_week_newhouse_available_df['梯队'] = current_week_newhouse_available_df['城市'].map(city_level_dict)
-            last_week_newhouse_available_df['梯队'] = last_week_newhouse_available_df['城市'].map(city_level_dict)
-            current_year_secondhouse_deal_df['梯队'] = current_year_secondhouse_deal_df['城市'].map(city_level_dict)
-            current_year_secondhouse_deal_df['周度数'] = current_year_secondhouse_deal_df['数据日期'].apply(
-                lambda x: self.common_utils.get_year_week(x))
-            last_year_secondhouse_deal_df['梯队'] = last_year_secondhouse_deal_df['城市'].map(city_level_dict)
-            last_year_secondhouse_deal_df['周度数'] = last_year_secondhouse_deal_df['数据日期'].apply(
-                lambda x: self.common_utils.get_year_week(x))
-
-            recent8_week_nums: List[str] = []
-            for i in range(8):
-                previous_week_saturday = pd.to_datetime(current_week_satuaday) - timedelta(weeks=i)
-                week_number = self.common_utils.get_year_week(previous_week_saturday)
-                recent8_week_nums.append(week_number)
-            recent8_week_nums.reverse()
-            sort_order = recent8_week_nums
-            category_type = pd.CategoricalDtype(categories=sort_order, ordered=True)
-
-
-            # 周度交易：统计近8周的交易面积（万㎡），即截至本周六共56天。
-            recent8week_newhouse_deal_df: pd.DataFrame = current_year_newhouse_deal_df[
-                current_year_newhouse_deal_df['数据日期'] >= current_start_date
-            ]
-            # recent8week_newhouse_deal_df['周度数'] = recent8week_newhouse_deal_df['周度数'].astype(category_type)
-            # recent8week_newhouse_deal_df = recent8week_newhouse_deal_df.sort_values(by='周度数')
-
-            # 月度交易：统计从本月1号起截至本周六的交易面积（万㎡）。
-            current_month_newhouse_deal_df: pd.DataFrame = current_year_newhouse_deal_df[
-                (current_year_newhouse_deal_df['数据日期'] >= current_month_first_day)
-                & (current_year_newhouse_deal_df['数据日期'] <= current_week_satuaday)]
-
-            # 月度交易：统计从上月相同周期的交易面积（万㎡），用于计算环比。比如本月：2024.10.1-10.27，则上月：2024.09.1-10.27。
-            last_month_newhouse_deal_df: pd.DataFrame = current_year_newhouse_deal_df[
-                (current_year_newhouse_deal_df['数据日期'] >= last_month_first_day)
-                & (current_year_newhouse_deal_df['数据日期'] <= last_month_end_date)]
-
-            # 月度交易：统计去年同月份相同周期的交易面积（万㎡），用于计算月度同比。比如本月：2024.10.1-10.27，则去年同月：2023.10.1-10.27。
-            last_year_same_month_newhouse_deal_df: pd.DataFrame = last_year_newhouse_deal_df[
-                (last_year_newhouse_deal_df['数据日期'] >= last_year_same_month_first_day)
-                & (last_year_newhouse_deal_df['数据日期'] <= last_year_same_month_last_day)
-            ]
-
-            # 周度交易：统计去年同周度的交易面积（万㎡），用于计算周度同比。
-            last_year_same_week_newhouse_deal_df: pd.DataFrame = last_year_newhouse_deal_df[
-                (last_year_newhouse_deal_df['数据日期'] >= last_year_same_week_start_date)
-                & (last_year_newhouse_deal_df['数据日期'] <= last_year_same_week_end_date)]
-
-            # 二手房相关数据统计
-            # 周度交易：统计近8周的交易套数，即截至本周六共56天。
-            recent8week_secondhouse_deal_df: pd.DataFrame = current_year_secondhouse_deal_df[
-                current_year_secondhouse_deal_df['数据日期'] >= current_start_date
-            ]
-            # recent8week_secondhouse_deal_df['周度数'] = recent8week_secondhouse_deal_df['周度数'].astype(category_type)
-            # recent8week_secondhouse_deal_df = recent8week_secondhouse_deal_df.sort_values(by='周度数')
-
-            # 月度交易：统计从本月1号起截至本周六的交易套数。
-            current_month_secondhouse_deal_df: pd.DataFrame = current_year_secondhouse_deal_df[
-                (current_year_secondhouse_deal_df['数据日期'] >= current_month_first_day)
-                & (current_year_secondhouse_deal_df['数据日期'] <= current_week_satuaday)]
-
-            # 月度交易：统计从上月相同周期的交易套数，用于计算环比。比如本月：2024.10.1-10.27，则上月：2024.09.1-10.27。
-            last_month_secondhouse_deal_df: pd.DataFrame = current_year_secondhouse_deal_df[
-                (current_year_secondhouse_deal_df['数据日期'] >= last_month_first_day)
-                & (current_year_secondhouse_deal_df['数据日期'] <= last_month_end_date)]
-
-            # 月度交易：统计去年同月份相同周期的成交套数，用于计算月度同比。比如本月：2024.10.1-10.27，则去年同月：2023.10.1-10.27。
-            last_year_same_month_secondhouse_deal_df: pd.DataFrame = last_year_secondhouse_deal_df[
-                (last_year_secondhouse_deal_df['数据日期'] >= last_year_same_month_first_day)
-                & (last_year_secondhouse_deal_df['数据日期'] <= last_year_same_month_last_day)
-            ]
-
-            # 周度交易：统计去年同周度的交易套数，用于计算周度同比。
-            last_year_same_week_secondhouse_deal_df: pd.DataFrame = last_year_secondhouse_deal_df[
-                (last_year_secondhouse_deal_df['数据日期'] >= last_year_same_week_start_date)
-                & (last_year_secondhouse_deal_df['数据日期'] <= last_year_same_week_end_date)]
-
-            # 按周度数分组统计近8周新房的交易面积（万㎡）、二手房的交易套数，即截至本周六共56天。
-            recent8week_newhouse_deal_byweek_df = (recent8week_newhouse_deal_df
-                                             .groupby('周度数')['成交面积'].sum()).reset_index()
-            recent8week_newhouse_deal_byweek_df.columns = ['周度数', '成交面积']
-            recent8week_secondhouse_deal_byweek_df = (recent8week_secondhouse_deal_df
-                                               .groupby('周度数')['成交套数'].sum()).reset_index()
-            recent8week_secondhouse_deal_byweek_df.columns = ['周度数', '成交套数']
-            recent8week_newhouse_deal_byweek_df['周度数'] = (recent8week_newhouse_deal_byweek_df['周度数']
-                                                             .astype(category_type))
-            recent8week_newhouse_deal_byweek_df = recent8week_newhouse_deal_byweek_df.sort_values(by='周度数')
-            recent8week_secondhouse_deal_byweek_df['周度数'] = (recent8week_secondhouse_deal_byweek_df['周度数']
-                                                                .astype(category_type))
-            recent8week_secondhouse_deal_byweek_df = recent8week_secondhouse_deal_byweek_df.sort_values(by='周度数')
-
-            # 按梯队、周度数分组统计近4周新房的交易面积（万㎡）、二手房的交易套数，即截至本周六共56天。
-            current_week = recent8_week_nums[-1]
-            last_week = recent8_week_nums[-2]
-            recent4weeks: List[str] = recent8_week_nums[4:]
-            recent4weeks_v2: List[str] = [week.replace('第', '') for week in recent4weeks]
-            recent4weeks_dict: Dict[str, str] = dict(zip(recent4weeks, recent4weeks_v2))
-            mom_column = f'{recent4weeks_v2[-1]}环比'
-            yoy_column = f'{recent4weeks_v2[-1]}同比'
-            newhouse_last_year_same_week_column = f'去年{current_week}成交面积'
-            secondhouse_last_year_same_week_column = f'去年{current_week}成交套数'
-
-            # 新房：按梯队、城市、周度数分组统计近4周的交易面积（万㎡）
-            recent4week_newhouse_deal_df = recent8week_newhouse_deal_df[
-                recent8week_newhouse_deal_df['周度数'].isin(recent4weeks)]
-            newhouse_deal_bylevel_bycity_df = (recent4week_newhouse_deal_df
-                                               .groupby(['梯队', '城市', '周度数'])['成交面积'].sum())
-            newhouse_deal_bylevel_bycity_df.columns = ['梯队', '城市', '周度数', '成交面积']
-            newhouse_deal_bylevel_bycity_pivot_df = newhouse_deal_bylevel_bycity_df.reset_index().pivot(
-                index=['梯队', '城市'], columns='周度数', values='成交面积')
-            last_year_same_week_newhouse_deal_bylevel_bycity_df = (last_year_same_week_newhouse_deal_df
-                                                                   .groupby(['梯队', '城市'])['成交面积'].sum())
-            last_year_same_week_newhouse_deal_bylevel_bycity_df.columns = ['梯队', '城市', '成交面积']
-            newhouse_deal_bylevel_bycity_pivot_df = newhouse_deal_bylevel_bycity_pivot_df.reset_index()
-            newhouse_deal_bylevel_bycity_merged_df = (newhouse_deal_bylevel_bycity_pivot_df
-                                                     .merge(last_year_same_week_newhouse_deal_bylevel_bycity_df,
-                                                             on=['梯队', '城市'], how='left'))
-            newhouse_deal_bylevel_bycity_merged_df.rename(columns={'成交面积': newhouse_last_year_same_week_column}, inplace=True)
-            newhouse_deal_bylevel_bycity_merged_df[mom_column] \
-                = ((newhouse_deal_bylevel_bycity_merged_df[current_week] -
-                   newhouse_deal_bylevel_bycity_merged_df[last_week])
-                   / newhouse_deal_bylevel_bycity_merged_df[last_week])
-            newhouse_deal_bylevel_bycity_merged_df[yoy_column] \
-                = ((newhouse_deal_bylevel_bycity_merged_df[current_week] -
-                   newhouse_deal_bylevel_bycity_merged_df[newhouse_last_year_same_week_column])
-                   / newhouse_deal_bylevel_bycity_merged_df[newhouse_last_year_same_week_column])
-
-            # 新房：按梯队、周度数分组统计近4周的交易面积（万㎡）
-            recent4week_newhouse_deal_bylevel_df: pd.DataFrame = (recent4week_newhouse_deal_df
-                                                                  .groupby(['梯队', '周度数'])['成交面积'].sum())
-            recent4week_newhouse_deal_bylevel_df.columns = ['梯队', '周度数', '成交面积']
-            recent4week_newhouse_deal_bylevel_pivot_df = (recent4week_newhouse_deal_bylevel_df
-                                                         .reset_index()
-                                                         .pivot(index='梯队',
-                                                                columns='周度数',
-                                                                values='成交面积'))
-            last_year_same_week_newhouse_deal_bylevel_df = (last_year_same_week_newhouse_deal_df
-                                                    .groupby('梯队')['成交面积'].sum())
-            last_year_same_week_newhouse_deal_bylevel_df.columns = ['梯队', '成交面积']
-            recent4week_newhouse_deal_bylevel_pivot_df = recent4week_newhouse_deal_bylevel_pivot_df.reset_index()
-            recent4week_newhouse_deal_bylevel_merged_df = (recent4week_newhouse_deal_bylevel_pivot_df
-                                                           .merge(last_year_same_week_newhouse_deal_bylevel_df,
-                                                                  on='梯队', how='left'))
-            recent4week_newhouse_deal_bylevel_merged_df.rename(columns={'成交面积': newhouse_last_year_same_week_column}, inplace=True)
-            recent4week_newhouse_deal_bylevel_merged_df[mom_column] = ((recent4week_newhouse_deal_bylevel_merged_df[current_week]
-                                                                        - recent4week_newhouse_deal_bylevel_merged_df[last_week])
-                                                                       / recent4week_newhouse_deal_bylevel_merged_df[last_week])
-            recent4week_newhouse_deal_bylevel_merged_df[yoy_column] = ((recent4week_newhouse_deal_bylevel_merged_df[f'{current_week}']
-                                                                        - recent4week_newhouse_deal_bylevel_merged_df[newhouse_last_year_same_week_column])
-                                                                       / recent4week_newhouse_deal_bylevel_merged_df[newhouse_last_year_same_week_column])
-
-            # 新房：按周度数分组统计近4周的交易面积（万㎡）
-            recent4week_newhouse_deal_byweek_df = (recent4week_newhouse_deal_df
-                                             .groupby('周度数')['成交面积'].sum()).reset_index()
-            recent4week_newhouse_deal_byweek_df.columns = ['周度数', '成交面积']
-            recent4week_newhouse_deal_byweek_pivot_df = recent4week_newhouse_deal_byweek_df.set_index('周度数').T
-            recent4week_newhouse_deal_byweek_pivot_df.columns.name = None
-            recent4week_newhouse_deal_byweek_pivot_df.index = ['']
-            last_year_same_week_newhouse_deal_byweek_df = (last_year_same_week_newhouse_deal_df
-                                                         .groupby('周度数')['成交面积'].sum()).reset_index()
-            last_year_same_week_newhouse_deal_byweek_df.columns = ['周度数', '成交面积']
-            last_year_same_week_newhouse_deal_byweek_df.rename(columns={'成交面积': newhouse_last_year_same_week_column}, inplace=True)
-            recent4week_newhouse_deal_byweek_pivot_df[newhouse_last_year_same_week_column] \
-                = last_year_same_week_newhouse_deal_byweek_df.loc[0, newhouse_last_year_same_week_column]
-            recent4week_newhouse_deal_byweek_merged_df = recent4week_newhouse_deal_byweek_pivot_df
-            recent4week_newhouse_deal_byweek_merged_df[mom_column] = ((recent4week_newhouse_deal_byweek_merged_df[current_week]
-                                                                       - recent4week_newhouse_deal_byweek_merged_df[last_week])
-                                                                      / recent4week_newhouse_deal_byweek_merged_df[last_week])
-            recent4week_newhouse_deal_byweek_merged_df[yoy_column] = ((recent4week_newhouse_deal_byweek_merged_df[f'{current_week}']
-                                                                       - recent4week_newhouse_deal_byweek_merged_df[newhouse_last_year_same_week_column])
-                                                                      / recent4week_newhouse_deal_byweek_merged_df[newhouse_last_year_same_week_column])
-
-            newhouse_columns = ['梯队', '城市'] + recent4weeks + [mom_column, yoy_column, newhouse_last_year_same_week_column]
-            newhouse_deal_bylevel_bycity_merged_df = newhouse_deal_bylevel_bycity_merged_df[newhouse_columns]
-            recent4week_newhouse_deal_bylevel_merged_df['城市'] = '整体'
-            recent4week_newhouse_deal_byweek_merged_df[['梯队', '城市']] = ['全线', '整体']
-            recent4week_newhouse_deal_bylevel_merged_df \
-                = recent4week_newhouse_deal_bylevel_merged_df[newhouse_columns]
-            recent4week_newhouse_deal_byweek_merged_df \
-                = recent4week_newhouse_deal_byweek_merged_df[newhouse_columns]
-            newhouse_deal_bylevel_bycity_merged_df = pd.concat([
-                newhouse_deal_bylevel_bycity_merged_df,
-                recent4week_newhouse_deal_bylevel_merged_df,
-                recent4week_newhouse_deal_byweek_merged_df
-            ], ignore_index=True)
-            # 自定义排序
-            sort_order = ['一线', '二线', '三四线', '全线']
-            category_type = pd.CategoricalDtype(categories=sort_order, ordered=True)
-            newhouse_deal_bylevel_bycity_merged_df['梯队'] = newhouse_deal_bylevel_bycity_merged_df['梯队'].astype(category_type)
-            newhouse_deal_bylevel_bycity_merged_df.sort_values(by='梯队', inplace=True)
-            newhouse_deal_bylevel_bycity_merged_df = newhouse_deal_bylevel_bycity_merged_df.rename(columns=recent4weeks_dict)
-
-            # 二手房：按梯队、城市、周度数分组统计近4周的成交套数
-            recent4week_secondhouse_deal_df: pd.DataFrame = recent8week_secondhouse_deal_df[
-                recent8week_secondhouse_deal_df['周度数'].isin(recent4weeks)]
-            secondhouse_deal_bylevel_bycity_df = (recent4week_secondhouse_deal_df
-                                               .groupby(['梯队', '城市', '周度数'])['成交套数'].sum())
-            secondhouse_deal_bylevel_bycity_df.columns = ['梯队', '城市', '周度数', '成交套数']
-            secondhouse_deal_bylevel_bycity_pivot_df = secondhouse_deal_bylevel_bycity_df.reset_index().pivot(
-                index=['梯队', '城市'], columns='周度数', values='成交套数')
-            last_year_same_week_secondhouse_deal_bycity_df = (last_year_same_week_secondhouse_deal_df
-                                                            .groupby(['梯队', '城市'])['成交套数'].sum())
-            last_year_same_week_secondhouse_deal_bycity_df.columns = ['梯队', '城市', '成交套数']
-            secondhouse_deal_bylevel_bycity_pivot_df = secondhouse_deal_bylevel_bycity_pivot_df.reset_index()
-            secondhouse_deal_bylevel_bycity_merged_df = (secondhouse_deal_bylevel_bycity_pivot_df
-                                                        .merge(last_year_same_week_secondhouse_deal_bycity_df,
-                                                               on=['梯队', '城市'], how='left'))
-            secondhouse_deal_bylevel_bycity_merged_df.rename(columns={'成交套数': secondhouse_last_year_same_week_column}, inplace=True)
-            secondhouse_deal_bylevel_bycity_merged_df[mom_column] \
-                = ((secondhouse_deal_bylevel_bycity_merged_df[current_week] -
-                    secondhouse_deal_bylevel_bycity_merged_df[last_week])
-                    / secondhouse_deal_bylevel_bycity_merged_df[last_week])
-            secondhouse_deal_bylevel_bycity_merged_df[yoy_column] \
-                = ((secondhouse_deal_bylevel_bycity_merged_df[current_week] -
-                    secondhouse_deal_bylevel_bycity_merged_df[secondhouse_last_year_same_week_column])
-                    / secondhouse_deal_bylevel_bycity_merged_df[secondhouse_last_year_same_week_column])
-
-            # 二手房：按梯队、周度数分组统计近4周的成交套数
-            recent4week_secondhouse_deal_bylevel_df: pd.DataFrame = (recent4week_secondhouse_deal_df
-                                                           .groupby(['梯队', '周度数'])['成交套数'].sum())
-            recent4week_secondhouse_deal_bylevel_df.columns = ['梯队', '周度数', '成交套数']
-            rencent4week_secondhouse_deal_bylevel_pivot_df = (recent4week_secondhouse_deal_bylevel_df
-                                                             .reset_index()
-                                                             .pivot(index='梯队',
-                                                                    columns='周度数',
-                                                                    values='成交套数'))
-            last_year_same_week_secondhouse_deal_bylevel_df = (last_year_same_week_secondhouse_deal_df
-                                                       .groupby('梯队')['成交套数'].sum())
-            last_year_same_week_secondhouse_deal_bylevel_df.columns = ['梯队', '去年同周度成交套数']
-            rencent4week_secondhouse_deal_bylevel_pivot_df = rencent4week_secondhouse_deal_bylevel_pivot_df.reset_index()
-            recent4week_secondhouse_deal_bylevel_merged_df = (rencent4week_secondhouse_deal_bylevel_pivot_df
-                                                              .merge(last_year_same_week_secondhouse_deal_bylevel_df,
-                                                                     on='梯队', how='left'))
-            recent4week_secondhouse_deal_bylevel_merged_df.rename(columns={'成交套数': secondhouse_last_year_same_week_column}, inplace=True)
-            recent4week_secondhouse_deal_bylevel_merged_df[mom_column] = \
-                ((recent4week_secondhouse_deal_bylevel_merged_df[f'{current_week}']
-                  - recent4week_secondhouse_deal_bylevel_merged_df[f'{last_week}'])
-                 / recent4week_secondhouse_deal_bylevel_merged_df[f'{last_week}'])
-            recent4week_secondhouse_deal_bylevel_merged_df[yoy_column] = \
-                ((recent4week_secondhouse_deal_bylevel_merged_df[f'{current_week}'] -
-                  recent4week_secondhouse_deal_bylevel_merged_df[secondhouse_last_year_same_week_column])
-                 / recent4week_secondhouse_deal_bylevel_merged_df[secondhouse_last_year_same_week_column])
-
-            # 二手房：按周度数分组统计近4周的成交套数
-            recent4week_secondhouse_deal_byweek_df = (recent4week_secondhouse_deal_df
-                                                    .groupby('周度数')['成交套数'].sum()).reset_index()
-            recent4week_secondhouse_deal_byweek_df.columns = ['周度数', '成交套数']
-            recent4week_secondhouse_deal_byweek_pivot_df = recent4week_secondhouse_deal_byweek_df.set_index('周度数').T
-            recent4week_secondhouse_deal_byweek_pivot_df.columns.name = None
-            recent4week_secondhouse_deal_byweek_pivot_df.index = ['']
-            last_year_same_week_secondhouse_deal_byweek_df = (last_year_same_week_secondhouse_deal_df
-                                                            .groupby('周度数')['成交套数'].sum()).reset_index()
-            last_year_same_week_secondhouse_deal_byweek_df.columns = ['周度数', '成交套数']
-            last_year_same_week_secondhouse_deal_byweek_df.rename(columns={'成交套数': secondhouse_last_year_same_week_column}, inplace=True)
-            recent4week_secondhouse_deal_byweek_pivot_df[secondhouse_last_year_same_week_column] \
-                = last_year_same_week_secondhouse_deal_byweek_df.loc[0, secondhouse_last_year_same_week_column]
-            recent4week_secondhouse_deal_byweek_merged_df = recent4week_secondhouse_deal_byweek_pivot_df
-            recent4week_secondhouse_deal_byweek_merged_df[mom_column] = \
-                ((recent4week_secondhouse_deal_byweek_merged_df[current_week]
-                  - recent4week_secondhouse_deal_byweek_merged_df[last_week])
-                 / recent4week_secondhouse_deal_byweek_merged_df[last_week])
-            recent4week_secondhouse_deal_byweek_merged_df[yoy_column] = \
-                ((recent4week_secondhouse_deal_byweek_merged_df[current_week] -
-                  recent4week_secondhouse_deal_byweek_merged_df[secondhouse_last_year_same_week_column])
-                 / recent4week_secondhouse_deal_byweek_merged_df[secondhouse_last_year_same_week_column])
-
-            secondhouse_columns = ['梯队', '城市'] + recent4weeks + [mom_column, yoy_column, secondhouse_last_year_same_week_column]
-            secondhouse_deal_bylevel_bycity_merged_df = secondhouse_deal_bylevel_bycity_merged_df[secondhouse_columns]
-            recent4week_secondhouse_deal_bylevel_merged_df['城市'] = '整体'
-            recent4week_secondhouse_deal_byweek_merged_df[['梯队', '城市']] = ['全线', '整体']
-            recent4week_secondhouse_deal_bylevel_merged_df \
-                = recent4week_secondhouse_deal_bylevel_merged_df[secondhouse_columns]
-            recent4week_secondhouse_deal_byweek_merged_df \
-                = recent4week_secondhouse_deal_byweek_merged_df[secondhouse_columns]
-            secondhouse_deal_bylevel_bycity_merged_df = pd.concat([
-                secondhouse_deal_bylevel_bycity_merged_df,
-                recent4week_secondhouse_deal_bylevel_merged_df,
-                recent4week_secondhouse_deal_byweek_merged_df
-            ], ignore_index=True)
-            # 自定义排序
-            sort_order = ['一线', '二线', '三四线', '全线']
-            category_type = pd.CategoricalDtype(categories=sort_order, ordered=True)
-            secondhouse_deal_bylevel_bycity_merged_df['梯队'] = secondhouse_deal_bylevel_bycity_merged_df['梯队'].astype(category_type)
-            secondhouse_deal_bylevel_bycity_merged_df.sort_values(by='梯队', inplace=True)
-            secondhouse_deal_bylevel_bycity_merged_df = secondhouse_deal_bylevel_bycity_merged_df.rename(columns=recent4weeks_dict)
-
-            # 新房月度（从月初1号至本周六）梯队同环比计算
-            current_month_newhouse_sum_df = (current_month_newhouse_deal_df
-                                .groupby('梯队')['成交面积'].sum()).reset_index()
-            current_month_newhouse_sum_df.columns = ['梯队', '本月成交面积']
-            last_month_newhouse_deal_df = (last_month_newhouse_deal_df
-                                            .groupby('梯队')['成交面积'].sum()).reset_index()
-            last_month_newhouse_deal_df.columns = ['梯队', '上月成交面积']
-            last_year_same_month_newhouse_deal_df = (last_year_same_month_newhouse_deal_df
-                                                    .groupby('梯队')['成交面积'].sum()).reset_index()
-            last_year_same_month_newhouse_deal_df.columns = ['梯队', '去年同月成交面积']
-            merged_month_newhouse_df = current_month_newhouse_sum_df.merge(last_month_newhouse_deal_df, on='梯队', how='left')
-            merged_month_newhouse_df = merged_month_newhouse_df.merge(last_year_same_month_newhouse_deal_df, on='梯队', how='left')
-            merged_month_newhouse_df['环比'] = ((merged_month_newhouse_df['本月成交面积'] - merged_month_newhouse_df['上月成交面积'])
-                                               / merged_month_newhouse_df['上月成交面积'])
-            merged_month_newhouse_df['同比'] = ((merged_month_newhouse_df['本月成交面积'] - merged_month_newhouse_df['去年同月成交面积'])
-                                               / merged_month_newhouse_df['去年同月成交面积'])
-            # 计算全线同环比
-            current_month_newhouse_sum_deal = current_month_newhouse_sum_df['本月成交面积'].sum()
-            last_month_newhouse_sum_deal = last_month_newhouse_deal_df['上月成交面积'].sum()
-            last_year_same_month_newhouse_sum_deal = last_year_same_month_newhouse_deal_df['去年同月成交面积'].sum()
-            month_on_month_ratio = ((current_month_newhouse_sum_deal - last_month_newhouse_sum_deal)
-                                    / last_month_newhouse_sum_deal)
-            year_on_year_ratio = ((current_month_newhouse_sum_deal - last_year_same_month_newhouse_sum_deal)
-                                  / last_year_same_month_newhouse_sum_deal)
-            merged_month_newhouse_df.loc[len(merged_month_newhouse_df), :] \
-                = ['全线', current_month_newhouse_sum_deal,
-                   last_month_newhouse_sum_deal,
-                   last_year_same_month_newhouse_sum_deal,
-                   month_on_month_ratio, year_on_year_ratio]
-            # 自定义排序
-            sort_order = ['一线', '二线', '三四线', '全线']
-            category_type = pd.CategoricalDtype(categories=sort_order, ordered=True)
-            merged_month_newhouse_df['梯队'] = merged_month_newhouse_df['梯队'].astype(category_type)
-            merged_month_newhouse_df.sort_values(by='梯队', inplace=True)
-
-            # 二手房月度（从月初1号至本周六）梯队同环比计算
-            current_month_secondhouse_sum_df = (current_month_secondhouse_deal_df
-                                               .groupby('梯队')['成交套数'].sum()).reset_index()
-            current_month_secondhouse_sum_df.columns = ['梯队', '本月成交套数']
-            last_month_secondhouse_deal_df = (last_month_secondhouse_deal_df
-                                             .groupby('梯队')['成交套数'].sum()).reset_index()
-            last_month_secondhouse_deal_df.columns = ['梯队', '上月成交套数']
-            last_year_same_month_secondhouse_deal_df = (last_year_same_month_secondhouse_deal_df
-                                                       .groupby('梯队')['成交套数'].sum()).reset_index()
-            last_year_same_month_secondhouse_deal_df.columns = ['梯队', '去年同月成交套数']
-            merged_month_secondhouse_df = current_month_secondhouse_sum_df.merge(last_month_secondhouse_deal_df, on='梯队', how='left')
-            merged_month_secondhouse_df = merged_month_secondhouse_df.merge(last_year_same_month_secondhouse_deal_df, on='梯队', how='left')
-            merged_month_secondhouse_df['环比'] = ((merged_month_secondhouse_df['本月成交套数'] - merged_month_secondhouse_df['上月成交套数'])
-                                                  / merged_month_secondhouse_df['上月成交套数'])
-            merged_month_secondhouse_df['同比'] = ((merged_month_secondhouse_df['本月成交套数'] - merged_month_secondhouse_df['去年同月成交套数'])
-                                                  / merged_month_secondhouse_df['去年同月成交套数'])
-            # 计算全线同环比
-            current_month_secondhouse_sum_deal = current_month_secondhouse_sum_df['本月成交套数'].sum()
-            last_month_secondhouse_sum_deal = last_month_secondhouse_deal_df['上月成交套数'].sum()
-            last_year_same_month_secondhouse_sum_deal = last_year_same_month_secondhouse_deal_df['去年同月成交套数'].sum()
-            month_on_month_ratio = ((current_month_secondhouse_sum_deal - last_month_secondhouse_sum_deal)
-                                    / last_month_secondhouse_sum_deal)
-            year_on_year_ratio = ((current_month_secondhouse_sum_deal - last_year_same_month_secondhouse_sum_deal)
-                                  / last_year_same_month_secondhouse_sum_deal)
-            merged_month_secondhouse_df.loc[len(merged_month_secondhouse_df), :] \
-                = ['全线', current_month_secondhouse_sum_deal,
-                   last_month_secondhouse_sum_deal,
-                   last_year_same_month_secondhouse_sum_deal,
-                   month_on_month_ratio, year_on_year_ratio]
-            # 自定义排序
-            sort_order = ['一线', '二线', '三四线', '全线']
-            category_type = pd.CategoricalDtype(categories=sort_order, ordered=True)
-            merged_month_secondhouse_df['梯队'] = merged_month_secondhouse_df['梯队'].astype(category_type)
-            merged_month_secondhouse_df.sort_values(by='梯队', inplace=True)
-
-            # 可售面积环比
-            current_week_newhouse_available_df.loc[len(current_week_newhouse_available_df), :] \
-                = ['整体',
-                   current_week_newhouse_available_df['可售套数'].sum(),
-                   current_week_newhouse_available_df['可售面积'].sum(),
-                   '全线']
-            last_week_newhouse_available_df.loc[len(last_week_newhouse_available_df), :] \
-                = ['整体',
-                   last_week_newhouse_available_df['可售套数'].sum(),
-                   last_week_newhouse_available_df['可售面积'].sum(),
-                   '全线']
-            current_week_newhouse_available_df.rename(columns={'可售套数': '本周可售套数',
-                                                               '可售面积': '本周可售面积'}, inplace=True)
-            last_week_newhouse_available_df.rename(columns={'可售套数': '上周可售套数',
-                                                            '可售面积': '上周可售面积'}, inplace=True)
-            available_df: pd.DataFrame = current_week_newhouse_available_df.merge(last_week_newhouse_available_df,
-                                                                         on=['梯队', '城市'], how='left')
-            available_df['可售面积环比'] = available_df.apply(
-                lambda x: (x['本周可售面积'] - x['上周可售面积']) / x['上周可售面积'], axis=1)
-            available_df.drop(columns=['上周可售套数', '上周可售面积'], inplace=True)
-            available_df.rename(columns={'本周可售套数': '可售套数', '本周可售面积': '可售面积'}, inplace=True)
-            available_columns = ['梯队', '城市', '可售套数', '可售面积', '可售面积环比']
-            available_df = available_df[available_columns]
-            # 自定义排序
-            sort_order = ['一线', '二线', '全线']
-            category_type = pd.CategoricalDtype(categories=sort_order, ordered=True)
-            available_df['梯队'] = available_df['梯队'].astype(category_type)
-            available_df.sort_values(by=['梯队', '可售面积环比'], inplace=True)
-
-            # 生成新房二手房近8周成交趋势柱状图
-            self.common_utils.gen_deal_trade_charts(
-                newhouse_deal_df=recent8week_newhouse_deal_byweek_df,
-                secondhouse_deal_df=recent8week_secondhouse_deal_byweek_df,
-                save_path=r'data_files',
-                date_flag='w'
-            )
-
-            # 将每个统计表存储到同一个Excel文件的不同sheet中
-            with pd.ExcelWriter(f'data_files/报告数据-周度.xlsx') as writer:
-                recent8week_newhouse_deal_byweek_df.to_excel(writer, sheet_name='近8周新房交易面积', index=False)
-                recent8week_secondhouse_deal_byweek_df.to_excel(writer, sheet_name='近8周二手房交易套数', index=False)
-                newhouse_deal_bylevel_bycity_merged_df.to_excel(writer, sheet_name='近4周新房交易面积(同环比)', index=False)
-                secondhouse_deal_bylevel_bycity_merged_df.to_excel(writer, sheet_name='近4周二手房交易套数(同环比)', index=False)
-                merged_month_newhouse_df.to_excel(writer, sheet_name='新房月度交易面积(按梯队)', index=False)
-                merged_month_secondhouse_df.to_excel(writer, sheet_name='二手房月度交易套数(按梯队)', index=False)
-                available_df.to_excel(writer, sheet_name='周度可售', index=False)
-
-        elif self.time_flag == 'm':  # 月度数据统计
+
+            return {
+                'current_start_date': current_start_date,
+                'current_end_date': current_end_date,
+                'current_week_satuaday': current_week_satuaday,
+                'last_week_satuaday': last_week_satuaday,
+                'current_month_first_day': current_month_first_day,
+                'last_month_first_day': last_month_first_day,
+                'last_month_end_date': last_month_end_date,
+                'last_year_same_week_start_date': last_year_same_week_start_date,
+                'last_year_same_week_end_date': last_year_same_week_end_date,
+                'last_year_same_month_first_day': last_year_same_month_first_day,
+                'last_year_same_month_last_day': last_year_same_month_last_day,
+                'last_year_start_date': last_year_start_date,
+                'last_year_end_date': last_year_end_date,
+            }
+
+        elif self.time_flag == 'm':  # 月度
             current_month_first_day: str = pd.to_datetime(self.report_date).replace(day=1).strftime('%Y-%m-%d')
             current_month_last_day: str = self.report_date
             last_month_last_day: str = (pd.to_datetime(current_month_first_day).replace(day=1)
@@ -867,677 +738,556 @@ class Report8AmMorning(object):
             last_year_first_day: str = (pd.to_datetime(current_year_first_day)
                                         .replace(year=current_year_value-1).strftime('%Y-%m-%d'))
 
-            # 新房本年度交易数据统计
-            # 如果当前月份小于6，则这里统计近6个月的数据
-            if pd.to_datetime(current_month_first_day).month < 6:
-                current_year_newhouse_deal_df: pd.DataFrame = self.common_utils.generate_continous_data(
-                    city_list=newhouse_deal_city_list,
-                    start_date=recent6_month_first_day,
-                    end_date=current_month_last_day
-                )
-                db_current_year_newhouse_deal_df: pd.DataFrame = self.get_newhouse_daily_deal_data(
-                    start_date=recent6_month_first_day,
-                    end_date=current_month_last_day
-                )
-                current_year_newhouse_deal_df = current_year_newhouse_deal_df.merge(
-                    db_current_year_newhouse_deal_df, on=['城市', '数据日期'], how='left'
-                )
-            else:
-                current_year_newhouse_deal_df: pd.DataFrame = self.common_utils.generate_continous_data(
-                    city_list=newhouse_deal_city_list,
-                    start_date=current_year_first_day,
-                    end_date=current_month_last_day
-                )
-                db_current_year_newhouse_deal_df: pd.DataFrame = self.get_newhouse_daily_deal_data(
-                    start_date=current_year_first_day,
-                    end_date=current_month_last_day
-                )
-                current_year_newhouse_deal_df = current_year_newhouse_deal_df.merge(
-                    db_current_year_newhouse_deal_df, on=['城市', '数据日期'], how='left'
-                )
-
-            # 新房去年度交易数据统计
-            last_year_newhouse_deal_df: pd.DataFrame = self.common_utils.generate_continous_data(
-                city_list=newhouse_deal_city_list,
-                start_date=last_year_first_day,
-                end_date=last_year_same_month_last_day
-            )
-            db_last_year_newhouse_deal_df: pd.DataFrame = self.get_newhouse_daily_deal_data(
-                start_date=last_year_first_day,
-                end_date=last_year_same_month_last_day
-            )
-            last_year_newhouse_deal_df = last_year_newhouse_deal_df.merge(
-                db_last_year_newhouse_deal_df, on=['城市', '数据日期'], how='left'
-            )
-
-            # 新房本月可售数据统计
-            current_month_newhouse_available_df: pd.DataFrame = self.get_newhouse_available_data(current_month_last_day)
-
-            # 新房上月可售数据统计
-            last_month_newhouse_available_df: pd.DataFrame = self.get_newhouse_available_data(last_month_last_day)
-
-            # 二手房本年度交易数据统计
-            # 如果当前月份小于6，则这里统计近6个月的数据
+            # 本年度交易数据统计区间：如果当前月份小于6，则这里统计近6个月的数据
             if pd.to_datetime(current_month_first_day).month < 6:
-                current_year_secondhouse_deal_df: pd.DataFrame = self.common_utils.generate_continous_data(
-                    city_list=secondhouse_deal_city_list,
-                    start_date=recent6_month_first_day,
-                    end_date=current_month_last_day
-                )
-                db_current_year_secondhouse_deal_df: pd.DataFrame = self.get_secondhouse_daily_deal_data(
-                    start_date=recent6_month_first_day,
-                    end_date=current_month_last_day
-                )
-                current_year_secondhouse_deal_df = current_year_secondhouse_deal_df.merge(
-                    db_current_year_secondhouse_deal_df, on=['城市', '数据日期'], how='left'
-                )
-            else:
-                current_year_secondhouse_deal_df: pd.DataFrame = self.common_utils.generate_continous_data(
-                    city_list=secondhouse_deal_city_list,
-                    start_date=current_year_first_day,
-                    end_date=current_month_last_day
-                )
-                db_current_year_secondhouse_deal_df: pd.DataFrame = self.get_secondhouse_daily_deal_data(
-                    start_date=current_year_first_day,
-                    end_date=current_month_last_day
-                )
-                current_year_secondhouse_deal_df = current_year_secondhouse_deal_df.merge(
-                    db_current_year_secondhouse_deal_df, on=['城市', '数据日期'], how='left'
-                )
-
-            # 二手房去年度交易数据统计
-            last_year_secondhouse_deal_df: pd.DataFrame = self.common_utils.generate_continous_data(
-                city_list=secondhouse_deal_city_list,
-                start_date=last_year_first_day,
-                end_date=last_year_same_month_last_day
-            )
-            db_last_year_secondhouse_deal_df: pd.DataFrame = self.get_secondhouse_daily_deal_data(
-                start_date=last_year_first_day,
-                end_date=last_year_same_month_last_day
-            )
-            last_year_secondhouse_deal_df = last_year_secondhouse_deal_df.merge(
-                db_last_year_secondhouse_deal_df, on=['城市', '数据日期'], how='left'
-            )
-
-            # 如果当月是1月，则上月数据需单独统计，用于计算环比
-            # if pd.to_datetime(current_month_first_day).month == 1:
-            #     # 上月新房交易数据
-            #     last_month_newhouse_deal_df = self.common_utils.generate_continous_data(
-            #         city_list=newhouse_deal_city_list,
-            #         start_date=last_month_first_day,
-            #         end_date=last_month_last_day
-            #     )
-            #     db_last_month_newhouse_deal_df: pd.DataFrame = self.get_newhouse_daily_deal_data(
-            #         start_date=last_month_first_day,
-            #         end_date=last_month_last_day
-            #     )
-            #     last_month_newhouse_deal_df = last_month_newhouse_deal_df.merge(
-            #         db_last_month_newhouse_deal_df, on=['城市', '数据日期'], how='left'
-            #     )
-            #     if not last_month_newhouse_deal_df.empty:
-            #         current_year_newhouse_deal_df = pd.concat([current_year_newhouse_deal_df,
-            #                                                    last_month_newhouse_deal_df], ignore_index=True)
-            #     # 上月二手房交易数据
-            #     last_month_secondhouse_deal_df: pd.DataFrame = self.common_utils.generate_continous_data(
-            #         city_list=last_year_first_day,
-            #         start_date=last_month_first_day,
-            #         end_date=last_month_last_day
-            #     )
-            #     db_last_month_secondhouse_deal_df: pd.DataFrame = self.get_secondhouse_daily_deal_data(
-            #         start_date=last_month_first_day,
-            #         end_date=last_month_last_day
-            #     )
-            #     last_month_secondhouse_deal_df = last_month_secondhouse_deal_df.merge(
-            #         db_last_month_secondhouse_deal_df, on=['城市', '数据日期'], how='left'
-            #     )
-            #     if not last_month_secondhouse_deal_df.empty:
-            #         current_year_secondhouse_deal_df = pd.concat([current_year_secondhouse_deal_df,
-            #                                                       last_month_secondhouse_deal_df], ignore_index=True)
-
-            # 衢州新房成交缺数处理：节假日或周末缺数默认补0
-            current_year: int = pd.to_datetime(current_month_last_day).year
-            holiday_dates: List[datetime.date] = self.common_utils.get_cn_holidays([current_year - 1, current_year])
-            current_year_newhouse_deal_df.loc[((current_year_newhouse_deal_df['城市'] == '衢州')
-                                               & (current_year_newhouse_deal_df['成交面积'].isnull())), '成交面积'] \
-                = (current_year_newhouse_deal_df.loc[((current_year_newhouse_deal_df['城市'] == '衢州')
-                                                      & (current_year_newhouse_deal_df['成交面积'].isnull())), :]
-                   .apply(lambda x: 0 if x['数据日期'].date() in holiday_dates
-                                         or x['数据日期'].weekday() in (5, 6) else x['成交面积'], axis=1))
-            last_year_newhouse_deal_df.loc[((last_year_newhouse_deal_df['城市'] == '衢州')
-                                            & (last_year_newhouse_deal_df['成交面积'].isnull())), '成交面积'] \
-                = (last_year_newhouse_deal_df.loc[((last_year_newhouse_deal_df['城市'] == '衢州')
-                                                   & (last_year_newhouse_deal_df['成交面积'].isnull())), :]
-                   .apply(lambda x: 0 if x['数据日期'].date() in holiday_dates
-                                         or x['数据日期'].weekday() in (5, 6) else x['成交面积'], axis=1))
-
-            # 临时补充缺失日度数据
-            cric_official_daily_data_df: pd.DataFrame = pd.read_excel('data_files/克而瑞官方发布日度数据.xlsx')
-            cric_official_daily_data_df['数据日期'] = pd.to_datetime(cric_official_daily_data_df['数据日期'])
-            newhouse_daily_deal_df = cric_official_daily_data_df[['城市', '数据日期', '成交面积/套数']][cric_official_daily_data_df['数据类型'] == '新房']
-            newhouse_daily_deal_df = newhouse_daily_deal_df.rename(columns={'成交面积/套数': '成交面积'})
-            secondhouse_daily_deal_df = cric_official_daily_data_df[cric_official_daily_data_df['数据类型'] == '二手房']
-            secondhouse_daily_deal_df = secondhouse_daily_deal_df.rename(columns={'成交面积/套数': '成交套数'})
-            newhouse_daily_deal_dict: dict = newhouse_daily_deal_df.set_index(['城市', '数据日期'])['成交面积'].to_dict()
-            secondhouse_daily_deal_dict: dict = secondhouse_daily_deal_df.set_index(['城市', '数据日期'])['成交套数'].to_dict()
-            current_year_newhouse_deal_df['成交面积'] = current_year_newhouse_deal_df.apply(
-                lambda x: newhouse_daily_deal_dict.get((x['城市'], x['数据日期']), None)
-                if pd.isnull(x['成交面积']) else x['成交面积'], axis=1)
-            last_year_newhouse_deal_df['成交面积'] = last_year_newhouse_deal_df.apply(
-                lambda x: newhouse_daily_deal_dict.get((x['城市'], x['数据日期']), None)
-                if pd.isnull(x['成交面积']) else x['成交面积'], axis=1)
-            current_year_secondhouse_deal_df['成交套数'] = current_year_secondhouse_deal_df.apply(
-                lambda x: secondhouse_daily_deal_dict.get((x['城市'], x['数据日期']), None)
-                if pd.isnull(x['成交套数']) else x['成交套数'], axis=1)
-            last_year_secondhouse_deal_df['成交套数'] = last_year_secondhouse_deal_df.apply(
-                lambda x: secondhouse_daily_deal_dict.get((x['城市'], x['数据日期']), None)
-                if pd.isnull(x['成交套数']) else x['成交套数'], axis=1)
-            
-            # 存储上述统计结果，用于补数确认
-            with pd.ExcelWriter(f'data_files/报告原始日度数据-月度.xlsx') as writer:
-                current_year_newhouse_deal_df.to_excel(writer, sheet_name='新房-本年度交易', index=False)
-                last_year_newhouse_deal_df.to_excel(writer, sheet_name='新房-去年交易', index=False)
-                current_month_newhouse_available_df.to_excel(writer, sheet_name='新房-本月可售', index=False)
-                last_month_newhouse_available_df.to_excel(writer, sheet_name='新房-上月可售', index=False)
-                current_year_secondhouse_deal_df.to_excel(writer, sheet_name='二手房-本年度交易', index=False)
-                last_year_secondhouse_deal_df.to_excel(writer, sheet_name='二手房-去年交易', index=False)
-
-            # 缺数天数统计
-            current_year_newhouse_deal_df['缺数'] = current_year_newhouse_deal_df['成交面积'].isnull().astype(int)
-            last_year_newhouse_deal_df['缺数'] = last_year_newhouse_deal_df['成交面积'].isnull().astype(int)
-            current_year_secondhouse_deal_df['缺数'] = current_year_secondhouse_deal_df['成交套数'].isnull().astype(int)
-            last_year_secondhouse_deal_df['缺数'] = last_year_secondhouse_deal_df['成交套数'].isnull().astype(int)
-            current_month_newhouse_available_shortage_city_list: List[str] = list(
-                set(newhouse_available_city_list).difference(set(current_month_newhouse_available_df['城市'].tolist()))
-            )
-            last_month_newhouse_available_shortage_city_list: List[str] = list(
-                set(newhouse_available_city_list).difference(set(last_month_newhouse_available_df['城市'].tolist()))
-            )
-            print('本年度新房缺数情况：')
-            print(current_year_newhouse_deal_df.groupby('城市')['缺数'].sum())
-            print('去年新房缺数情况：')
-            print(last_year_newhouse_deal_df.groupby('城市')['缺数'].sum())
-            print('本年度二手房缺数情况：')
-            print(current_year_secondhouse_deal_df.groupby('城市')['缺数'].sum())
-            print('去年二手房缺数情况：')
-            print(last_year_secondhouse_deal_df.groupby('城市')['缺数'].sum())
-            print(f'本月新房可售缺数城市：{current_month_newhouse_available_shortage_city_list}')
-            print(f'上月新房可售缺数城市：{last_month_newhouse_available_shortage_city_list}')
-
-            prompt_msg: str = f"""
-                        原始数据已存储至【data_files/报告原始日度数据-月度.xlsx】。
-                        请确认以上数据是否正确，若数据有缺失，请确认补数方法：
-                        1--人工手动补数；2--程序自动补数（待开发）。
-                        注意，人工手动补数完成后请保存并关闭文件；若无需补数，请回车继续。
-                        """
-            prompt_input: str = input(textwrap.dedent(prompt_msg))
-            if prompt_input == '1':
-                # 手动补数，重新加载补数后的文件
-                data_dfs: Dict[str, pd.DataFrame] = pd.read_excel(f'data_files/报告原始日度数据-月度.xlsx',
-                                                                  sheet_name=None)
-                current_year_newhouse_deal_df = data_dfs['新房-本年度交易']
-                last_year_newhouse_deal_df = data_dfs['新房-去年交易']
-                current_month_newhouse_available_df = data_dfs['新房-本月可售']
-                last_month_newhouse_available_df = data_dfs['新房-上月可售']
-                current_year_secondhouse_deal_df = data_dfs['二手房-本年度交易']
-                last_year_secondhouse_deal_df = data_dfs['二手房-去年交易']
-            elif prompt_input == '2':
-                # 自动补数，待开发
-                sys.exit()
+                current_year_start_date: str = recent6_month_first_day
             else:
-                pass
-
-            # 为上述统计数据增加"梯队"和"月份"
-            city_level_df: pd.DataFrame = self.get_config()['城市梯队']
-            city_level_dict: Dict[str, str] = city_level_df.set_index('城市')['梯队'].to_dict()
-            current_year_newhouse_deal_df['梯队'] = current_year_newhouse_deal_df['城市'].map(city_level_dict)
-            current_year_newhouse_deal_df['月份'] = pd.to_datetime(current_year_newhouse_deal_df['数据日期']).apply(lambda x: x.strftime('%Y-%#m'))
-            last_year_newhouse_deal_df['梯队'] = last_year_newhouse_deal_df['城市'].map(city_level_dict)
-            last_year_newhouse_deal_df['月份'] = pd.to_datetime(last_year_newhouse_deal_df['数据日期']).apply(lambda x: x.strftime('%Y-%#m'))
-            current_month_newhouse_available_df['梯队'] = current_month_newhouse_available_df['城市'].map(city_level_dict)
-            last_month_newhouse_available_df['梯队'] = last_month_newhouse_available_df['城市'].map(city_level_dict)
-            current_year_secondhouse_deal_df['梯队'] = current_year_secondhouse_deal_df['城市'].map(city_level_dict)
-            current_year_secondhouse_deal_df['月份'] = pd.to_datetime(current_year_secondhouse_deal_df['数据日期']).apply(lambda x: x.strftime('%Y-%#m'))
-            last_year_secondhouse_deal_df['梯队'] = last_year_secondhouse_deal_df['城市'].map(city_level_dict)
-            last_year_secondhouse_deal_df['月份'] = pd.to_datetime(last_year_secondhouse_deal_df['数据日期']).apply(lambda x: x.strftime('%Y-%#m'))
-
-            # 根据报告时间计算近6个月的月度时间（年-月），并存储在列表中
-            recent6_month_list: List[str] = []
-            for i in range(6):
-                recent6_month_list.append((pd.to_datetime(current_month_first_day)
-                                           - pd.DateOffset(months=i)).strftime('%Y-%#m'))
-            # 月份逆序排列（从小到大排序）
-            recent6_month_list.reverse()
-            recent6_month_v2_list: List[str] = [month.split('-')[1] + '月' for month in recent6_month_list]
-            recent6_month_dict: Dict[str, str] = dict(zip(recent6_month_list, recent6_month_v2_list))
-            current_month: str = recent6_month_list[-1]
-            last_month: str = recent6_month_list[-2]
-            newhouse_last_year_same_month_column: str = f'去年{current_month.split("-")[1]}月成交面积'
-            secondhouse_last_year_same_month_column: str = f'去年{current_month.split("-")[1]}月成交套数'
-            mom_column: str = f'{recent6_month_v2_list[-1]}环比'
-            yoy_column: str = f'{recent6_month_v2_list[-1]}同比'
-
-            # 相关基表准备
-            # 新房交易：统计近6个月的交易面积（万㎡）
-            recent6_month_newhouse_deal_df: pd.DataFrame = current_year_newhouse_deal_df[
-                current_year_newhouse_deal_df['月份'].isin(recent6_month_list)]
-            # 新房交易：统计近4个月的交易面积（万㎡）
-            recent4_month_newhouse_deal_df: pd.DataFrame = current_year_newhouse_deal_df[
-                current_year_newhouse_deal_df['月份'].isin(recent6_month_list[-4:])
-            ]
-            # 新房交易：统计当月的交易面积（万㎡）
-            current_month_newhouse_deal_df: pd.DataFrame = current_year_newhouse_deal_df[
-                (current_year_newhouse_deal_df['数据日期'] >= current_month_first_day)
-                & (current_year_newhouse_deal_df['数据日期'] <= current_month_last_day)
-            ]
-            # 新房交易：统计上月的交易面积（万㎡）
-            last_month_newhouse_deal_df: pd.DataFrame = current_year_newhouse_deal_df[
-                (current_year_newhouse_deal_df['数据日期'] >= last_month_first_day)
-                & (current_year_newhouse_deal_df['数据日期'] <= last_month_last_day)
-            ]
-            # 新房交易：统计去年同月的交易面积（万㎡）
-            last_year_same_month_newhouse_deal_df: pd.DataFrame = last_year_newhouse_deal_df[
-                (last_year_newhouse_deal_df['数据日期'] >= last_year_same_month_first_day)
-                & (last_year_newhouse_deal_df['数据日期'] <= last_year_same_month_last_day)
-            ]
-            # 二手房交易：统计近6个月的交易套数
-            recent6_month_secondhouse_deal_df: pd.DataFrame = current_year_secondhouse_deal_df[
-                current_year_secondhouse_deal_df['月份'].isin(recent6_month_list)]
-            # 二手房交易：统计近4个月的交易套数
-            recent4_month_secondhouse_deal_df: pd.DataFrame = current_year_secondhouse_deal_df[
-                current_year_secondhouse_deal_df['月份'].isin(recent6_month_list[-4:])
-            ]
-            # 二手房交易：统计当月的交易套数
-            current_month_secondhouse_deal_df: pd.DataFrame = current_year_secondhouse_deal_df[
-                (current_year_secondhouse_deal_df['数据日期'] >= current_month_first_day)
-                & (current_year_secondhouse_deal_df['数据日期'] <= current_month_last_day)
-            ]
-            # 二手房交易：统计上月的交易套数
-            last_month_secondhouse_deal_df: pd.DataFrame = last_year_secondhouse_deal_df[
-                (last_year_secondhouse_deal_df['数据日期'] >= last_month_first_day)
-                & (last_year_secondhouse_deal_df['数据日期'] <= last_month_last_day)
-            ]
-            # 二手房交易：统计去年同月的交易套数
-            last_year_same_month_secondhouse_deal_df: pd.DataFrame = last_year_secondhouse_deal_df[
-                (last_year_secondhouse_deal_df['数据日期'] >= last_year_same_month_first_day)
-                & (last_year_secondhouse_deal_df['数据日期'] <= last_year_same_month_last_day)
-            ]
-
-            # 计算同环比需要剔除的城市
-            current_month_days: int = pd.to_datetime(current_month_last_day).day
-            last_month_days: int = pd.to_datetime(last_month_last_day).day
-            last_year_same_month_days: int = pd.to_datetime(last_year_same_month_last_day).day
-            current_year_days: int = pd.to_datetime(current_month_last_day).dayofyear
-            last_year_days: int = pd.to_datetime(last_year_same_month_last_day).dayofyear
-            current_month_newhouse_zero_deal_city_list: List[str] = (
-                current_month_newhouse_deal_df[current_month_newhouse_deal_df['成交面积'] == 0]
-                .groupby('城市')['成交面积'].count()
-                .loc[lambda x: x > current_month_days / 3].index.tolist()
-            )
-            last_month_zero_newhouse_deal_city_list: List[str] = (
-                last_month_newhouse_deal_df[last_month_newhouse_deal_df['成交面积'] == 0]
-                .groupby('城市')['成交面积'].count()
-                .loc[lambda x: x > last_month_days / 3].index.tolist()
-            )
-            last_year_same_month_newhouse_zero_deal_city_list: List[str] = (
-                last_year_same_month_newhouse_deal_df[last_year_same_month_newhouse_deal_df['成交面积'] == 0]
-                .groupby('城市')['成交面积'].count()
-                .loc[lambda x: x > last_year_same_month_days / 3].index.tolist()
-            )
-            current_year_zero_newhouse_deal_city_list: List[str] = list(
-                current_year_newhouse_deal_df[(current_year_newhouse_deal_df['成交面积'] == 0)
-                                              & (current_year_newhouse_deal_df['数据日期'] >= current_year_first_day)
-                                              & (current_year_newhouse_deal_df['数据日期'] <= current_month_last_day)]
-                .groupby('城市')['成交面积'].count()
-                .loc[lambda x: x > current_year_days / 3].index.tolist()
-            )
-            last_year_zero_newhouse_deal_city_list: List[str] = list(
-                last_year_newhouse_deal_df[last_year_newhouse_deal_df['成交面积'] == 0]
-                .groupby('城市')['成交面积'].count()
-                .loc[lambda x: x > last_year_days / 3].index.tolist()
-            )
-            newhouse_month_mom_exclude_city_list: List[str] = list(
-                set(current_month_newhouse_zero_deal_city_list).union(set(last_month_zero_newhouse_deal_city_list)))
-            newhouse_month_yoy_exclude_city_list: List[str] = list(
-                set(current_month_newhouse_zero_deal_city_list).union(
-                    set(last_year_same_month_newhouse_zero_deal_city_list)))
-            newhouse_year_exclude_city_list: List[str] = list(
-                set(current_year_zero_newhouse_deal_city_list).union(set(last_year_zero_newhouse_deal_city_list)))
-
-            current_month_secondhouse_zero_deal_city_list: List[str] = (
-                current_month_secondhouse_deal_df[current_month_secondhouse_deal_df['成交套数'] == 0]
-                .groupby('城市')['成交套数'].count()
-                .loc[lambda x: x > current_month_days / 3].index.tolist()
-            )
-            last_month_zero_secondhouse_deal_city_list: List[str] = (
-                last_month_secondhouse_deal_df[last_month_secondhouse_deal_df['成交套数'] == 0]
-                .groupby('城市')['成交套数'].count()
-                .loc[lambda x: x > last_month_days / 3].index.tolist()
-            )
-            last_year_same_month_secondhouse_zero_deal_city_list: List[str] = (
-                last_year_same_month_secondhouse_deal_df[last_year_same_month_secondhouse_deal_df['成交套数'] == 0]
-                .groupby('城市')['成交套数'].count()
-                .loc[lambda x: x > last_year_same_month_days / 3].index.tolist()
-            )
-            current_year_zero_secondhouse_deal_city_list: List[str] = list(
-                current_year_secondhouse_deal_df[(current_year_secondhouse_deal_df['成交套数'] == 0)
-                                                 & (current_year_secondhouse_deal_df['数据日期'] >= current_year_first_day)
-                                                 & (current_year_secondhouse_deal_df['数据日期'] <= current_month_last_day)
-                                                 ]
-                .groupby('城市')['成交套数'].count()
-                .loc[lambda x: x > current_year_days / 3].index.tolist()
-            )
-            last_year_zero_secondhouse_deal_city_list: List[str] = list(
-                last_year_secondhouse_deal_df[last_year_secondhouse_deal_df['成交套数'] == 0]
-                .groupby('城市')['成交套数'].count()
-                .loc[lambda x: x > last_year_days / 3].index.tolist()
-            )
-            secondhouse_mom_exclude_city_list: List[str] = list(
-                set(current_month_secondhouse_zero_deal_city_list).union(
-                    set(last_month_zero_secondhouse_deal_city_list)))
-            secondhouse_yoy_exclude_city_list: List[str] = list(
-                set(current_month_secondhouse_zero_deal_city_list).union(
-                    set(last_year_same_month_secondhouse_zero_deal_city_list)))
-            secondhouse_year_exclude_city_list: List[str] = list(
-                set(current_year_zero_secondhouse_deal_city_list).union(set(last_year_zero_secondhouse_deal_city_list)))
-
-            # 新房：按"月份"分组统计近6个月的交易面积（万㎡）
-            recent6_month_newhouse_deal_bymonth_df: pd.DataFrame = (recent6_month_newhouse_deal_df
-                                                         .groupby('月份')['成交面积'].sum()).reset_index()
-            recent6_month_newhouse_deal_bymonth_df.columns = ['月份', '成交面积']
-            sort_order = recent6_month_list
-            category_type = pd.CategoricalDtype(categories=sort_order, ordered=True)
-            recent6_month_newhouse_deal_bymonth_df['月份'] = (
-                recent6_month_newhouse_deal_bymonth_df['月份'].astype(category_type))
-            recent6_month_newhouse_deal_bymonth_df.sort_values(by='月份', inplace=True)
-            recent6_month_newhouse_deal_bymonth_df['月份'] = recent6_month_newhouse_deal_bymonth_df['月份'].apply(lambda x: x[2:])
-
-            # 新房：按"梯队"、"城市"、"月份"分组统计近4个月的交易面积（万㎡）
-            recent4_month_newhouse_deal_belevel_bycity_bymonth_df: pd.DataFrame = (
-                recent4_month_newhouse_deal_df.groupby(['梯队', '城市', '月份'])['成交面积'].sum()).reset_index()
-            recent4_month_newhouse_deal_belevel_bycity_bymonth_df.columns = ['梯队', '城市', '月份', '成交面积']
-            recent4_month_newhouse_deal_bylevel_bycity_bymonth_pivot_df: pd.DataFrame = (
-                recent4_month_newhouse_deal_belevel_bycity_bymonth_df
-                .pivot(index=['梯队', '城市'],
-                       columns='月份',
-                       values='成交面积'))
-            # recent4_month_newhouse_deal_bylevel_bycity_bymonth_pivot_df.columns = recent6_month_v2_list[-4:]
-            last_year_same_month_newhouse_deal_bylevel_bycity_bymonth_df: pd.DataFrame = (
-                last_year_same_month_newhouse_deal_df.groupby(['梯队', '城市'])['成交面积'].sum()).reset_index()
-            last_year_same_month_newhouse_deal_bylevel_bycity_bymonth_df.columns = ['梯队', '城市', '成交面积']
-            recent4_month_newhouse_deal_bylevel_bycity_bymonth_pivot_df.reset_index(inplace=True)
-            recent4_month_newhouse_deal_bylevel_bycity_bymonth_merged_df: pd.DataFrame = (
-                recent4_month_newhouse_deal_bylevel_bycity_bymonth_pivot_df
-                .merge(last_year_same_month_newhouse_deal_bylevel_bycity_bymonth_df,
-                       on=['梯队', '城市'], how='left'))
-            recent4_month_newhouse_deal_bylevel_bycity_bymonth_merged_df.rename(
-                columns={'成交面积': newhouse_last_year_same_month_column}, inplace=True)
-            recent4_month_newhouse_deal_bylevel_bycity_bymonth_merged_df[mom_column] = (
-                (recent4_month_newhouse_deal_bylevel_bycity_bymonth_merged_df[current_month]
-                 - recent4_month_newhouse_deal_bylevel_bycity_bymonth_merged_df[last_month])
-                / recent4_month_newhouse_deal_bylevel_bycity_bymonth_merged_df[last_month])
-            recent4_month_newhouse_deal_bylevel_bycity_bymonth_merged_df[yoy_column] = (
-                (recent4_month_newhouse_deal_bylevel_bycity_bymonth_merged_df[current_month]
-                 - recent4_month_newhouse_deal_bylevel_bycity_bymonth_merged_df[newhouse_last_year_same_month_column])
-                / recent4_month_newhouse_deal_bylevel_bycity_bymonth_merged_df[newhouse_last_year_same_month_column])
-
-            # 新房：按"梯队"、"月份"分组统计近4个月的交易面积（万㎡）
-            recent4_month_newhouse_deal_bylevel_bymonth_df: pd.DataFrame = (
-                recent4_month_newhouse_deal_df.groupby(['梯队', '月份'])['成交面积'].sum()).reset_index()
-            recent4_month_newhouse_deal_bylevel_bymonth_df.columns = ['梯队', '月份', '成交面积']
-            recent4_month_newhouse_deal_bylevel_bymonth_pivot_df: pd.DataFrame = (
-                recent4_month_newhouse_deal_bylevel_bymonth_df
-                .pivot(index='梯队', columns='月份', values='成交面积'))
-            # recent4_month_newhouse_deal_bylevel_bymonth_pivot_df.columns = recent6_month_v2_list[-4:]
-            last_year_same_month_newhouse_deal_bylevel_bymonth_df: pd.DataFrame = (
-                last_year_same_month_newhouse_deal_df.groupby('梯队')['成交面积'].sum()).reset_index()
-            last_year_same_month_newhouse_deal_bylevel_bymonth_df.columns = ['梯队', '成交面积']
-            recent4_month_newhouse_deal_bylevel_bymonth_pivot_df.reset_index(inplace=True)
-            recent4_month_newhouse_deal_bylevel_bymonth_merged_df: pd.DataFrame = (
-                recent4_month_newhouse_deal_bylevel_bymonth_pivot_df
-                .merge(last_year_same_month_newhouse_deal_bylevel_bymonth_df, on='梯队', how='left'))
-            recent4_month_newhouse_deal_bylevel_bymonth_merged_df.rename(
-                columns={'成交面积': newhouse_last_year_same_month_column}, inplace=True)
-            recent4_month_newhouse_deal_bylevel_bymonth_merged_df[mom_column] = (
-                (recent4_month_newhouse_deal_bylevel_bymonth_merged_df[current_month]
-                 - recent4_month_newhouse_deal_bylevel_bymonth_merged_df[last_month])
-                / recent4_month_newhouse_deal_bylevel_bymonth_merged_df[last_month])
-            recent4_month_newhouse_deal_bylevel_bymonth_merged_df[yoy_column] = (
-                (recent4_month_newhouse_deal_bylevel_bymonth_merged_df[current_month]
-                 - recent4_month_newhouse_deal_bylevel_bymonth_merged_df[newhouse_last_year_same_month_column])
-                / recent4_month_newhouse_deal_bylevel_bymonth_merged_df[newhouse_last_year_same_month_column])
-
-            # 新房：按"月份"分组统计近4个月的交易面积（万㎡）
-            recent4_month_newhouse_deal_bymonth_df: pd.DataFrame = (recent4_month_newhouse_deal_df
-                                                         .groupby('月份')['成交面积'].sum()).reset_index()
-            recent4_month_newhouse_deal_bymonth_df.columns = ['月份', '成交面积']
-            recent4_month_newhouse_deal_bymonth_pivot_df = recent4_month_newhouse_deal_bymonth_df.set_index('月份').T
-            recent4_month_newhouse_deal_bymonth_pivot_df.columns.name = None
-            recent4_month_newhouse_deal_bymonth_pivot_df.index = ['']
-            last_year_same_month_newhouse_deal_bymonth_df = (last_year_same_month_newhouse_deal_df
-                                                           .groupby('月份')['成交面积'].sum()).reset_index()
-            last_year_same_month_newhouse_deal_bymonth_df.columns = ['月份', '成交面积']
-            last_year_same_month_newhouse_deal_bymonth_df.rename(columns={'成交面积': newhouse_last_year_same_month_column},
-                                                               inplace=True)
-            recent4_month_newhouse_deal_bymonth_pivot_df[newhouse_last_year_same_month_column] \
-                = last_year_same_month_newhouse_deal_bymonth_df.loc[0, newhouse_last_year_same_month_column]
-            recent4_month_newhouse_deal_bymonth_merged_df = recent4_month_newhouse_deal_bymonth_pivot_df
-            recent4_month_newhouse_deal_bymonth_merged_df[mom_column] = (
-                (recent4_month_newhouse_deal_bymonth_merged_df[current_month]
-                 - recent4_month_newhouse_deal_bymonth_merged_df[last_month])
-                / recent4_month_newhouse_deal_bymonth_merged_df[last_month])
-            recent4_month_newhouse_deal_bymonth_merged_df[yoy_column] = (
-                (recent4_month_newhouse_deal_bymonth_merged_df[current_month]
-                 - recent4_month_newhouse_deal_bymonth_merged_df[newhouse_last_year_same_month_column])
-                / recent4_month_newhouse_deal_bymonth_merged_df[newhouse_last_year_same_month_column])
-
-            newhosue_columns: List[str] = (['梯队', '城市'] + recent6_month_list[-4:]
-                                           + [mom_column, yoy_column, newhouse_last_year_same_month_column])
-            recent4_month_newhouse_deal_bylevel_bycity_bymonth_merged_df \
-                = recent4_month_newhouse_deal_bylevel_bycity_bymonth_merged_df[newhosue_columns]
-            recent4_month_newhouse_deal_bylevel_bymonth_merged_df['城市'] = '整体'
-            recent4_month_newhouse_deal_bymonth_merged_df[['梯队', '城市']] = ['全线', '整体']
-            recent4_month_newhouse_deal_bylevel_bymonth_merged_df \
-                = recent4_month_newhouse_deal_bylevel_bymonth_merged_df[newhosue_columns]
-            recent4_month_newhouse_deal_bymonth_merged_df = recent4_month_newhouse_deal_bymonth_merged_df[newhosue_columns]
-            recent4_month_newhouse_deal_bylevel_bycity_bymonth_merged_df = pd.concat([
-                recent4_month_newhouse_deal_bylevel_bycity_bymonth_merged_df,
-                recent4_month_newhouse_deal_bylevel_bymonth_merged_df,
-                recent4_month_newhouse_deal_bymonth_merged_df
-            ], ignore_index=True)
-            # 自定义排序
-            sort_order = ['一线', '二线', '三四线', '全线']
-            category_type = pd.CategoricalDtype(categories=sort_order, ordered=True)
-            recent4_month_newhouse_deal_bylevel_bycity_bymonth_merged_df['梯队'] = (
-                recent4_month_newhouse_deal_bylevel_bycity_bymonth_merged_df['梯队'].astype(category_type))
-            recent4_month_newhouse_deal_bylevel_bycity_bymonth_merged_df.sort_values(by='梯队', inplace=True)
-            recent4_month_newhouse_deal_bylevel_bycity_bymonth_merged_df.rename(
-                columns=recent6_month_dict, inplace=True
-            )
-
-            # 二手房：按"月份"分组统计近6个月的交易套数
-            recent6_month_secondhouse_deal_bymonth_df: pd.DataFrame = (recent6_month_secondhouse_deal_df
-                                                            .groupby('月份')['成交套数'].sum()).reset_index()
-            recent6_month_secondhouse_deal_bymonth_df.columns = ['月份', '成交套数']
-            sort_order = recent6_month_list
-            category_type = pd.CategoricalDtype(categories=sort_order, ordered=True)
-            recent6_month_secondhouse_deal_bymonth_df['月份'] = (
-                recent6_month_secondhouse_deal_bymonth_df['月份'].astype(category_type))
-            recent6_month_secondhouse_deal_bymonth_df.sort_values(by='月份', inplace=True)
-            recent6_month_secondhouse_deal_bymonth_df['月份'] = recent6_month_secondhouse_deal_bymonth_df['月份'].apply(lambda x: x[2:])
-
-            # 二手房：按"梯队"、"城市"、"月份"分组统计近4个月的交易套数
-            recent4_month_secondhouse_deal_belevel_bycity_bymonth_df: pd.DataFrame = (
-                recent4_month_secondhouse_deal_df.groupby(['梯队', '城市', '月份'])['成交套数'].sum()).reset_index()
-            recent4_month_secondhouse_deal_belevel_bycity_bymonth_df.columns = ['梯队', '城市', '月份', '成交套数']
-            recent4_month_secondhouse_deal_bylevel_bycity_bymonth_pivot_df: pd.DataFrame = (
-                recent4_month_secondhouse_deal_belevel_bycity_bymonth_df
-                .pivot(index=['梯队', '城市'], columns='月份', values='成交套数'))
-            # recent4_month_secondhouse_deal_bylevel_bycity_bymonth_pivot_df.columns = recent6_month_v2_list[-4:]
-            last_year_same_month_secondhouse_deal_bylevel_bycity_bymonth_df: pd.DataFrame = (
-                last_year_same_month_secondhouse_deal_df.groupby(['梯队', '城市'])['成交套数'].sum()).reset_index()
-            last_year_same_month_secondhouse_deal_bylevel_bycity_bymonth_df.columns = ['梯队', '城市', '成交套数']
-            recent4_month_secondhouse_deal_bylevel_bycity_bymonth_pivot_df.reset_index(inplace=True)
-            recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df: pd.DataFrame = (
-                recent4_month_secondhouse_deal_bylevel_bycity_bymonth_pivot_df
-                .merge(last_year_same_month_secondhouse_deal_bylevel_bycity_bymonth_df,
-                       on=['梯队', '城市'], how='left'))
-            recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df.rename(
-                columns={'成交套数': secondhouse_last_year_same_month_column}, inplace=True)
-            recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df[mom_column] = (
-                (recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df[current_month]
-                 - recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df[last_month])
-                / recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df[last_month])
-            recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df[yoy_column] = (
-                (recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df[current_month]
-                 - recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df[secondhouse_last_year_same_month_column])
-                / recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df[secondhouse_last_year_same_month_column])
-
-            # 二手房：按"梯队"、"月份"分组统计近4个月的交易套数
-            recent4_month_secondhouse_deal_bylevel_bymonth_df: pd.DataFrame = (
-                recent4_month_secondhouse_deal_df.groupby(['梯队', '月份'])['成交套数'].sum()).reset_index()
-            recent4_month_secondhouse_deal_bylevel_bymonth_df.columns = ['梯队', '月份', '成交套数']
-            recent4_month_secondhouse_deal_bylevel_bymonth_pivot_df: pd.DataFrame = (
-                recent4_month_secondhouse_deal_bylevel_bymonth_df
-                .pivot(index='梯队', columns='月份', values='成交套数'))
-            # recent4_month_secondhouse_deal_bylevel_bymonth_pivot_df.columns = recent6_month_v2_list[-4:]
-            last_year_same_month_secondhouse_deal_bylevel_bymonth_df: pd.DataFrame = (
-                last_year_same_month_secondhouse_deal_df.groupby('梯队')['成交套数'].sum()).reset_index()
-            last_year_same_month_secondhouse_deal_bylevel_bymonth_df.columns = ['梯队', '成交套数']
-            recent4_month_secondhouse_deal_bylevel_bymonth_pivot_df.reset_index(inplace=True)
-            recent4_month_secondhouse_deal_bylevel_bymonth_merged_df: pd.DataFrame = (
-                recent4_month_secondhouse_deal_bylevel_bymonth_pivot_df
-                .merge(last_year_same_month_secondhouse_deal_bylevel_bymonth_df, on='梯队', how='left'))
-            recent4_month_secondhouse_deal_bylevel_bymonth_merged_df.rename(
-                columns={'成交套数': secondhouse_last_year_same_month_column}, inplace=True)
-            recent4_month_secondhouse_deal_bylevel_bymonth_merged_df[mom_column] = (
-                (recent4_month_secondhouse_deal_bylevel_bymonth_merged_df[current_month]
-                 - recent4_month_secondhouse_deal_bylevel_bymonth_merged_df[last_month])
-                / recent4_month_secondhouse_deal_bylevel_bymonth_merged_df[last_month])
-            recent4_month_secondhouse_deal_bylevel_bymonth_merged_df[yoy_column] = (
-                (recent4_month_secondhouse_deal_bylevel_bymonth_merged_df[current_month]
-                 - recent4_month_secondhouse_deal_bylevel_bymonth_merged_df[secondhouse_last_year_same_month_column])
-                / recent4_month_secondhouse_deal_bylevel_bymonth_merged_df[secondhouse_last_year_same_month_column])
-
-            # 二手房：按"月份"分组统计近4个月的交易套数
-            recent4_month_secondhouse_deal_bymonth_df: pd.DataFrame = (recent4_month_secondhouse_deal_df
-                                                         .groupby('月份')['成交套数'].sum()).reset_index()
-            recent4_month_secondhouse_deal_bymonth_df.columns = ['月份', '成交套数']
-            recent4_month_secondhouse_deal_bymonth_pivot_df = recent4_month_secondhouse_deal_bymonth_df.set_index('月份').T
-            recent4_month_secondhouse_deal_bymonth_pivot_df.columns.name = None
-            recent4_month_secondhouse_deal_bymonth_pivot_df.index = ['']
-            last_year_same_month_secondhouse_deal_bymonth_df = (last_year_same_month_secondhouse_deal_df
-                                                           .groupby('月份')['成交套数'].sum()).reset_index()
-            last_year_same_month_secondhouse_deal_bymonth_df.columns = ['月份', '成交套数']
-            last_year_same_month_secondhouse_deal_bymonth_df.rename(
-                columns={'成交套数': secondhouse_last_year_same_month_column}, inplace=True)
-            recent4_month_secondhouse_deal_bymonth_pivot_df[secondhouse_last_year_same_month_column] \
-                = last_year_same_month_secondhouse_deal_bymonth_df.loc[0, secondhouse_last_year_same_month_column]
-            recent4_month_secondhouse_deal_bymonth_merged_df = recent4_month_secondhouse_deal_bymonth_pivot_df
-            recent4_month_secondhouse_deal_bymonth_merged_df[mom_column] = (
-                (recent4_month_secondhouse_deal_bymonth_merged_df[current_month]
-                 - recent4_month_secondhouse_deal_bymonth_merged_df[last_month])
-                / recent4_month_secondhouse_deal_bymonth_merged_df[last_month])
-            recent4_month_secondhouse_deal_bymonth_merged_df[yoy_column] = (
-                (recent4_month_secondhouse_deal_bymonth_merged_df[current_month]
-                 - recent4_month_secondhouse_deal_bymonth_merged_df[secondhouse_last_year_same_month_column])
-                / recent4_month_secondhouse_deal_bymonth_merged_df[secondhouse_last_year_same_month_column])
-
-            secondhouse_columns: List[str] = (['梯队', '城市'] + recent6_month_list[-4:]
-                                              + [mom_column, yoy_column, secondhouse_last_year_same_month_column])
-            recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df \
-                = recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df[secondhouse_columns]
-            recent4_month_secondhouse_deal_bylevel_bymonth_merged_df['城市'] = '整体'
-            recent4_month_secondhouse_deal_bymonth_merged_df[['梯队', '城市']] = ['全线', '整体']
-            recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df \
-                = recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df[secondhouse_columns]
-            recent4_month_secondhouse_deal_bymonth_merged_df \
-                = recent4_month_secondhouse_deal_bymonth_merged_df[secondhouse_columns]
-            recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df = pd.concat([
-                recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df,
-                recent4_month_secondhouse_deal_bylevel_bymonth_merged_df,
-                recent4_month_secondhouse_deal_bymonth_merged_df
-            ], ignore_index=True)
-            # 自定义排序
-            sort_order = ['一线', '二线', '三四线', '全线']
-            category_type = pd.CategoricalDtype(categories=sort_order, ordered=True)
-            recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df['梯队'] = (
-                recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df['梯队'].astype(category_type))
-            recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df.sort_values(by='梯队', inplace=True)
-            recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df.rename(
-                columns=recent6_month_dict, inplace=True
-            )
-
-            # 可售面积环比
-            current_month_newhouse_available_df.loc[len(current_month_newhouse_available_df), :] \
-                = ['整体',
-                   current_month_newhouse_available_df['可售套数'].sum(),
-                   current_month_newhouse_available_df['可售面积'].sum(),
-                   '全线']
-            last_month_newhouse_available_df.loc[len(last_month_newhouse_available_df), :] \
-                = ['整体',
-                   last_month_newhouse_available_df['可售套数'].sum(),
-                   last_month_newhouse_available_df['可售面积'].sum(),
-                   '全线']
-            current_month_newhouse_available_df.rename(columns={'可售套数': '本周可售套数',
-                                                                '可售面积': '本周可售面积'}, inplace=True)
-            last_month_newhouse_available_df.rename(columns={'可售套数': '上周可售套数',
-                                                             '可售面积': '上周可售面积'}, inplace=True)
-            available_df: pd.DataFrame = current_month_newhouse_available_df.merge(last_month_newhouse_available_df,
-                                                                                   on=['梯队', '城市'], how='left')
-            available_df['可售面积环比'] = available_df.apply(
-                lambda x: (x['本周可售面积'] - x['上周可售面积']) / x['上周可售面积'], axis=1)
-            available_df.drop(columns=['上周可售套数', '上周可售面积'], inplace=True)
-            available_df.rename(columns={'本周可售套数': '可售套数', '本周可售面积': '可售面积'}, inplace=True)
-            available_columns = ['梯队', '城市', '可售套数', '可售面积', '可售面积环比']
-            available_df = available_df[available_columns]
-            # 自定义排序
-            sort_order = ['一线', '二线', '全线']
-            category_type = pd.CategoricalDtype(categories=sort_order, ordered=True)
-            available_df['梯队'] = available_df['梯队'].astype(category_type)
-            available_df.sort_values(by=['梯队', '可售面积环比'], inplace=True)
-
-            # 计算新房二手房年度同比
-            current_year_newhouse_deal_sum = current_year_newhouse_deal_df['成交面积'][
-                (~current_year_newhouse_deal_df['城市'].isin(newhouse_year_exclude_city_list))
-                & (current_year_newhouse_deal_df['数据日期'] >= current_year_first_day)
-                & (current_year_newhouse_deal_df['数据日期'] <= current_month_last_day)].sum()
-            last_year_newhouse_deal_sum = last_year_newhouse_deal_df['成交面积'][
-                ~last_year_newhouse_deal_df['城市'].isin(newhouse_year_exclude_city_list)].sum()
-            print(f'新房年度同比剔除城市：{newhouse_year_exclude_city_list}；'
-                  f'本年度新房成交面积：{current_year_newhouse_deal_sum}；'
-                  f'去年度新房成交面积：{last_year_newhouse_deal_sum}')
-            yoy_of_newhouse_deal_annual = ((current_year_newhouse_deal_sum - last_year_newhouse_deal_sum) 
-                                           / last_year_newhouse_deal_sum)
-            current_year_secondhouse_deal_sum = current_year_secondhouse_deal_df['成交套数'][
-                (~current_year_secondhouse_deal_df['城市'].isin(secondhouse_year_exclude_city_list))
-                & (current_year_secondhouse_deal_df['数据日期'] >= current_year_first_day)
-                & (current_year_secondhouse_deal_df['数据日期'] <= current_month_last_day)].sum()
-            last_year_secondhouse_deal_sum = last_year_secondhouse_deal_df['成交套数'][
-                ~last_year_secondhouse_deal_df['城市'].isin(secondhouse_year_exclude_city_list)].sum()
-            print(f'二手房年度同比剔除城市：{secondhouse_year_exclude_city_list}；'
-                  f'本年度二手房成交套数：{current_year_secondhouse_deal_sum}；'
-                  f'去年度二手房成交套数：{last_year_secondhouse_deal_sum}')
-            yoy_of_secondhouse_deal_annual = ((current_year_secondhouse_deal_sum - last_year_secondhouse_deal_sum)
-                                              / last_year_secondhouse_deal_sum)
-            new_secondhouse_deal_yoy_annual_df: pd.DataFrame = pd.DataFrame(data={'数据类型': ['新房', '二手房'],
-                                                                                  '同比': [yoy_of_newhouse_deal_annual,
-                                                                                         yoy_of_secondhouse_deal_annual]})
-
-            # 生成近6个月新房二手房成交趋势柱状图
-            self.common_utils.gen_deal_trade_charts(
-                newhouse_deal_df=recent6_month_newhouse_deal_bymonth_df,
-                secondhouse_deal_df=recent6_month_secondhouse_deal_bymonth_df,
-                save_path=r'data_files',
-                date_flag='m'
-            )
-
-            # 将每个统计表存储到同一个Excel文件的不同sheet中
-            with pd.ExcelWriter('data_files/报告数据-月度.xlsx') as writer:
-                recent6_month_newhouse_deal_bymonth_df.to_excel(writer, sheet_name='近6月新房交易面积', index=False)
-                recent6_month_secondhouse_deal_bymonth_df.to_excel(writer, sheet_name='近6月二手房交易套数', index=False)
-                recent4_month_newhouse_deal_bylevel_bycity_bymonth_merged_df.to_excel(writer, sheet_name='近4月新房交易面积(同环比)', index=False)
-                recent4_month_secondhouse_deal_bylevel_bycity_bymonth_merged_df.to_excel(writer, sheet_name='近4月二手房交易套数(同环比)', index=False)
-                available_df.to_excel(writer, sheet_name='可售面积环比', index=False)
-                new_secondhouse_deal_yoy_annual_df.to_excel(writer, sheet_name='新房二手房年度交易同比', index=False)
+                current_year_start_date: str = current_year_first_day
+
+            return {
+                'current_month_first_day': current_month_first_day,
+                'current_month_last_day': current_month_last_day,
+                'last_month_first_day': last_month_first_day,
+                'last_month_last_day': last_month_last_day,
+                'current_year_first_day': current_year_first_day,
+                'current_year_start_date': current_year_start_date,
+                'last_year_first_day': last_year_first_day,
+                'last_year_same_month_first_day': last_year_same_month_first_day,
+                'last_year_same_month_last_day': last_year_same_month_last_day,
+            }
+
+        raise ValueError(f'不支持的时间维度标志：{self.time_flag}')
+
+    def get_deal_windows(self, periods: Dict[str, str]) -> Dict[str, Tuple[str, str]]:
+        """
+        成交数据取数区间：current_year、last_year 为逐日取数区间；服务端汇总模式下，月度报告只有本月、上月及去年同月
+        需要逐日核对、补数，其余整月只需期间合计及零成交天数，划入按月汇总取数区间 current_year_summary、last_year_summary
+        :param periods: 报告各统计区间的起止日期，见 get_report_periods
+        :return: {区间名称: (开始日期, 结束日期)}
+        """
+        if self.time_flag == 'w':
+            return {
+                'current_year': (periods['current_start_date'], periods['current_end_date']),
+                'last_year': (periods['last_year_start_date'], periods['last_year_end_date']),
+            }
+        if not self.aggregate_in_sql:
+            return {
+                'current_year': (periods['current_year_start_date'], periods['current_month_last_day']),
+                'last_year': (periods['last_year_first_day'], periods['last_year_same_month_last_day']),
+            }
+
+        last_month_first_day: pd.Timestamp = pd.to_datetime(periods['last_month_first_day'])
+        last_year_same_month_first_day: pd.Timestamp = pd.to_datetime(periods['last_year_same_month_first_day'])
+        deal_windows: Dict[str, Tuple[str, str]] = {
+            'current_year': (periods['last_month_first_day'], periods['current_month_last_day']),
+            'last_year': (periods['last_year_same_month_first_day'], periods['last_year_same_month_last_day']),
+            'current_year_summary': (periods['current_year_start_date'],
+                                     (last_month_first_day - pd.Timedelta(days=1)).strftime('%Y-%m-%d')),
+        }
+        # 报告月份为1月时，去年同月之前没有需要汇总的月份
+        if last_year_same_month_first_day > pd.to_datetime(periods['last_year_first_day']):
+            deal_windows['last_year_summary'] = (periods['last_year_first_day'],
+                                                 (last_year_same_month_first_day
+                                                  - pd.Timedelta(days=1)).strftime('%Y-%m-%d'))
+
+        return deal_windows
+
+    def get_fetch_tasks(self, periods: Dict[str, str]) -> Dict[str, Tuple[Callable[..., pd.DataFrame], tuple]]:
+        """
+        取数计划：本期所有相互独立的取数任务
+        :param periods: 报告各统计区间的起止日期，见 get_report_periods
+        :return: {任务名称: (取数函数, 参数元组)}
+        """
+        deal_windows: Dict[str, Tuple[str, str]] = self.get_deal_windows(periods)
+        if self.time_flag == 'w':
+            current_available_date, last_available_date = periods['current_week_satuaday'], periods['last_week_satuaday']
+            current_available_task, last_available_task = 'current_week_newhouse_available', 'last_week_newhouse_available'
         else:
-            pass
+            current_available_date, last_available_date = periods['current_month_last_day'], periods['last_month_last_day']
+            current_available_task, last_available_task = 'current_month_newhouse_available', 'last_month_newhouse_available'
+
+        fetch_tasks: Dict[str, Tuple[Callable[..., pd.DataFrame], tuple]] = {
+            'current_year_newhouse_deal': (self.get_newhouse_daily_deal_data, deal_windows['current_year']),
+            'last_year_newhouse_deal': (self.get_newhouse_daily_deal_data, deal_windows['last_year']),
+            current_available_task: (self.get_newhouse_available_data, (current_available_date,)),
+            last_available_task: (self.get_newhouse_available_data, (last_available_date,)),
+            'current_year_secondhouse_deal': (self.get_secondhouse_daily_deal_data, deal_windows['current_year']),
+            'last_year_secondhouse_deal': (self.get_secondhouse_daily_deal_data, deal_windows['last_year']),
+        }
+        # 服务端汇总模式：按月汇总取数
+        for window_name in ('current_year', 'last_year'):
+            if f'{window_name}_summary' in deal_windows:
+                fetch_tasks[f'{window_name}_newhouse_summary'] = (self.get_newhouse_monthly_deal_summary,
+                                                                  deal_windows[f'{window_name}_summary'])
+                fetch_tasks[f'{window_name}_secondhouse_summary'] = (self.get_secondhouse_monthly_deal_summary,
+                                                                     deal_windows[f'{window_name}_summary'])
+
+        return fetch_tasks
+
+    def summarize_deal_data(self, deal_df: pd.DataFrame, value_column: str,
+                            summary_df: pd.DataFrame | None = None) -> pd.DataFrame:
+        """
+        成交数据按 城市×月份 汇总并增加"梯队"：逐日数据在本地汇总，服务端汇总模式下并入按月汇总取数的月份
+        :param deal_df: 日度成交数据
+        :param value_column: 指标列名
+        :param summary_df: 按月汇总取数的结果（见 get_monthly_deal_summary），为空时只汇总日度数据
+        :return: 梯队、城市、数据日期（月初）、月份、指标合计、有数天数、零成交天数
+        """
+        monthly_summary_df: pd.DataFrame = self.deal_engine.summarize_monthly(deal_df, value_column)
+        monthly_summary_df['月份'] = self.common_utils.lookup_calendar(monthly_summary_df['数据日期'], '月份')
+        summary_dfs: List[pd.DataFrame] = [monthly_summary_df]
+        if summary_df is not None:
+            summary_dfs.insert(0, summary_df)
+        summary_df = pd.concat(summary_dfs, ignore_index=True)
+        summary_df['梯队'] = self.config.map_city_level(summary_df['城市'])
+
+        return summary_df[['梯队', '城市', '数据日期', '月份', value_column, '有数天数', '零成交天数']]
+
+    def get_available_data(self, fetched_dfs: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        获取本期、上期新房可售数据
+        :param fetched_dfs: 本期数据源，见 get_fetch_tasks
+        :return: {sheet名称: 可售数据}，如 新房-本周可售、新房-上周可售
+        """
+        period_unit, period_label = ('week', '周') if self.time_flag == 'w' else ('month', '月')
+
+        return {
+            f'新房-本{period_label}可售': fetched_dfs[f'current_{period_unit}_newhouse_available'],
+            f'新房-上{period_label}可售': fetched_dfs[f'last_{period_unit}_newhouse_available'],
+        }
+
+    def prepare_deal_data(self, fetched_dfs: Dict[str, pd.DataFrame], periods: Dict[str, str],
+                          override_patch_df: pd.DataFrame, house_type: str) -> Dict[str, pd.DataFrame]:
+        """
+        日度成交数据准备阶段：对齐 城市×日期 网格，衢州等城市节假日补0，月度报告补充CRIC官方发布数据，再应用人工修正
+        :param fetched_dfs: 本期数据源，见 get_fetch_tasks
+        :param periods: 报告各统计区间的起止日期，见 get_report_periods
+        :param override_patch_df: 已持久化的人工修正数据
+        :param house_type: 数据类型：newhouse--新房；secondhouse--二手房
+        :return: {sheet名称: 日度成交数据}，如 新房-本年度交易、新房-去年交易
+        """
+        house_name, value_column = self.house_types[house_type]
+        city_list: List[str] = (self.config.newhouse_deal_cities if house_type == 'newhouse'
+                                else self.config.secondhouse_deal_cities)
+        deal_windows: Dict[str, Tuple[str, str]] = self.get_deal_windows(periods)
+        deal_dfs: Dict[str, pd.DataFrame] = {}
+        for sheet_name, window_name in ((f'{house_name}-本年度交易', 'current_year'), (f'{house_name}-去年交易', 'last_year')):
+            deal_df: pd.DataFrame = self.common_utils.generate_continous_data(
+                city_list=city_list,
+                start_date=deal_windows[window_name][0],
+                end_date=deal_windows[window_name][1],
+                data_df=fetched_dfs[f'{window_name}_{house_type}_deal'],
+                city_dtype=self.config.city_dtype)
+            # 衢州等城市（配置"补数规则"）新房成交缺数处理：节假日或周末缺数默认补0
+            if house_type == 'newhouse':
+                deal_df = self.common_utils.fill_holiday_weekend_zero(
+                    deal_df, value_column, self.config.holiday_zero_fill_cities)
+            # 月度报告临时补充缺失日度数据：CRIC官方发布数据
+            if self.time_flag == 'm':
+                deal_df = self.gap_filler.fill(deal_df, value_column, house_name, fill_methods=['cric'])
+            deal_dfs[sheet_name] = deal_df
+
+        # 应用此前人工补数/修正并持久化的数据
+        return self.apply_override_patches(deal_dfs, override_patch_df)
+
+    def write_raw_data(self, fetched_dfs: Dict[str, pd.DataFrame], newhouse_deal_dfs: Dict[str, pd.DataFrame],
+                       secondhouse_deal_dfs: Dict[str, pd.DataFrame]) -> str:
+        """
+        写出原始日度数据阶段：存储准备后的成交、可售数据，用于补数确认
+        :param fetched_dfs: 本期数据源
+        :param newhouse_deal_dfs: 新房日度成交数据，见 prepare_deal_data
+        :param secondhouse_deal_dfs: 二手房日度成交数据
+        :return: 原始日度数据文件路径
+        """
+        raw_sheets: Dict[str, pd.DataFrame] = {**newhouse_deal_dfs, **self.get_available_data(fetched_dfs),
+                                               **secondhouse_deal_dfs}
+
+        return self.report_writer.write_raw(
+            f'{self.output_dir}/报告原始日度数据-{"周度" if self.time_flag == "w" else "月度"}', raw_sheets)
+
+    def review_deal_data(self, raw_data_path: str, fetched_dfs: Dict[str, pd.DataFrame],
+                         newhouse_deal_dfs: Dict[str, pd.DataFrame], secondhouse_deal_dfs: Dict[str, pd.DataFrame]
+                         ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, pd.DataFrame], Dict[str, pd.DataFrame]]:
+        """
+        缺数核对阶段：输出缺数情况，按补数策略人工补数（重新加载补数后的文件）或程序自动补数
+        :param raw_data_path: 原始日度数据文件路径，见 write_raw_data
+        :param fetched_dfs: 本期数据源
+        :param newhouse_deal_dfs: 新房日度成交数据
+        :param secondhouse_deal_dfs: 二手房日度成交数据
+        :return: 补数后的新房日度成交数据、二手房日度成交数据、新房可售数据
+        """
+        period_name, last_year_label = ('周度', '去年同期') if self.time_flag == 'w' else ('月度', '去年')
+        # 缺数天数统计
+        deal_dfs: Dict[str, pd.DataFrame] = {
+            sheet_name: deal_df.assign(缺数=deal_df[self.get_deal_sheet_spec(sheet_name)[0]].isnull().astype(int))
+            for sheet_name, deal_df in {**newhouse_deal_dfs, **secondhouse_deal_dfs}.items()}
+        available_dfs: Dict[str, pd.DataFrame] = self.get_available_data(fetched_dfs)
+        for sheet_name, deal_df in deal_dfs.items():
+            house_name, period = sheet_name.split('-')
+            print(f'{"本年度" if period == "本年度交易" else last_year_label}{house_name}缺数情况：')
+            print(deal_df.groupby('城市', observed=True)['缺数'].sum())
+        for sheet_name, available_df in available_dfs.items():
+            shortage_city_list: List[str] = list(
+                set(self.config.newhouse_available_cities).difference(set(available_df['城市'].tolist())))
+            print(f'{sheet_name.split("-")[1][:2]}新房可售缺数城市：{shortage_city_list}')
+
+        prompt_input: str = self.get_fill_method(raw_data_path)
+        if prompt_input == '1':
+            # 手动补数，重新加载补数后的文件：成交数据只提取改动过的单元格记为人工修正数据（持久化，后续运行自动应用）
+            data_dfs: Dict[str, pd.DataFrame] = self.report_writer.read_raw(raw_data_path)
+            deal_dfs = self.record_manual_fill(deal_dfs, data_dfs)
+            available_dfs = {sheet_name: data_dfs[sheet_name] for sheet_name in available_dfs}
+        elif prompt_input == '2':
+            # 程序自动补数：CRIC官方发布 -> 节假日周末补0 -> 近期同星期均值 -> 线性插值
+            deal_dfs = self.auto_fill_deal_data(deal_dfs, detail_path=f'{self.output_dir}/自动补数明细-{period_name}.xlsx')
+
+        return ({sheet_name: deal_df for sheet_name, deal_df in deal_dfs.items() if sheet_name.startswith('新房')},
+                {sheet_name: deal_df for sheet_name, deal_df in deal_dfs.items() if sheet_name.startswith('二手房')},
+                available_dfs)
+
+    def label_deal_data(self, deal_dfs: Dict[str, pd.DataFrame], fetched_dfs: Dict[str, pd.DataFrame],
+                        house_type: str) -> Dict[str, pd.DataFrame]:
+        """
+        标注阶段：周度报告为日度成交数据增加"梯队"和"周度数"；月度报告按"城市"、"月份"汇总（期间合计、有数天数、
+        零成交天数）并增加"梯队"，服务端汇总模式下并入按月汇总取数的月份，后续统计均基于月度汇总
+        :param deal_dfs: 补数后的日度成交数据，见 review_deal_data
+        :param fetched_dfs: 本期数据源
+        :param house_type: 数据类型：newhouse--新房；secondhouse--二手房
+        :return: {sheet名称: 标注后的数据}
+        """
+        house_name, value_column = self.house_types[house_type]
+        if self.time_flag == 'w':
+            return {sheet_name: deal_df.assign(梯队=self.config.map_city_level(deal_df['城市']),
+                                               周度数=self.common_utils.lookup_calendar(deal_df['数据日期'], '周度数'))
+                    for sheet_name, deal_df in deal_dfs.items()}
+
+        return {
+            f'{house_name}-本年度交易': self.summarize_deal_data(
+                deal_dfs[f'{house_name}-本年度交易'], value_column, fetched_dfs.get(f'current_year_{house_type}_summary')),
+            f'{house_name}-去年交易': self.summarize_deal_data(
+                deal_dfs[f'{house_name}-去年交易'], value_column, fetched_dfs.get(f'last_year_{house_type}_summary')),
+        }
+
+    def aggregate_weekly_deal_data(self, labeled_dfs: Dict[str, pd.DataFrame], periods: Dict[str, str],
+                                   house_type: str) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]:
+        """
+        周度统计汇总阶段：近8周成交、近4周按梯队及城市的同环比、月度（从月初1号至本周六）按梯队的同环比
+        :param labeled_dfs: 标注后的日度成交数据，见 label_deal_data
+        :param periods: 报告各统计区间的起止日期
+        :param house_type: 数据类型：newhouse--新房；secondhouse--二手房
+        :return: 近8周成交趋势（绘图数据）、{sheet名称: 统计表}
+        """
+        house_name, value_column = self.house_types[house_type]
+        metric_name: str = value_column.replace('成交', '交易')
+        current_year_deal_df: pd.DataFrame = labeled_dfs[f'{house_name}-本年度交易']
+        last_year_deal_df: pd.DataFrame = labeled_dfs[f'{house_name}-去年交易']
+
+        recent8_week_nums: List[str] = []
+        for i in range(8):
+            previous_week_saturday = pd.to_datetime(periods['current_week_satuaday']) - timedelta(weeks=i)
+            week_number = self.common_utils.get_year_week(previous_week_saturday)
+            recent8_week_nums.append(week_number)
+        recent8_week_nums.reverse()
+        category_type = pd.CategoricalDtype(categories=recent8_week_nums, ordered=True)
+
+        # 周度交易：统计近8周的成交，即截至本周六共56天。
+        recent8week_deal_df: pd.DataFrame = current_year_deal_df[
+            current_year_deal_df['数据日期'] >= periods['current_start_date']]
+        # 周度交易：统计去年同周度的成交，用于计算周度同比。
+        last_year_same_week_deal_df: pd.DataFrame = last_year_deal_df[
+            (last_year_deal_df['数据日期'] >= periods['last_year_same_week_start_date'])
+            & (last_year_deal_df['数据日期'] <= periods['last_year_same_week_end_date'])]
+
+        # 按周度数分组统计近8周的成交（新房为交易面积（万㎡），二手房为交易套数）
+        recent8week_deal_byweek_df: pd.DataFrame = self.deal_engine.aggregate(
+            current_year_deal_df, value_column, ['周度数'], start_date=periods['current_start_date'])[['周度数', value_column]]
+        recent8week_deal_byweek_df['周度数'] = recent8week_deal_byweek_df['周度数'].astype(category_type)
+        recent8week_deal_byweek_df = recent8week_deal_byweek_df.sort_values(by='周度数')
+
+        # 按梯队、城市、周度数统计近4周的成交及同环比，并汇总梯队、全线
+        current_week = recent8_week_nums[-1]
+        recent4weeks: List[str] = recent8_week_nums[4:]
+        recent4weeks_v2: List[str] = [week.replace('第', '') for week in recent4weeks]
+        recent4weeks_dict: Dict[str, str] = dict(zip(recent4weeks, recent4weeks_v2))
+        deal_bylevel_bycity_merged_df: pd.DataFrame = self.period_comparison.compare(
+            current_df=recent8week_deal_df,
+            last_year_df=last_year_same_week_deal_df,
+            value_column=value_column,
+            period_column='周度数',
+            periods=recent4weeks,
+            last_year_column=f'去年{current_week}{value_column}',
+            period_labels=recent4weeks_dict)
+
+        # 月度（从月初1号至本周六）梯队同环比计算：本月、上月同期在本年度数据中一次汇总，去年同月在去年数据中汇总
+        current_month_column, last_month_column, last_year_same_month_column = (
+            f'本月{value_column}', f'上月{value_column}', f'去年同月{value_column}')
+        merged_month_df: pd.DataFrame = self.deal_engine.aggregate_windows(
+            current_year_deal_df, value_column, '梯队', {
+                current_month_column: (periods['current_month_first_day'], periods['current_week_satuaday']),
+                last_month_column: (periods['last_month_first_day'], periods['last_month_end_date']),
+            }).merge(self.deal_engine.aggregate_windows(
+                last_year_deal_df, value_column, '梯队', {
+                    last_year_same_month_column: (periods['last_year_same_month_first_day'],
+                                                  periods['last_year_same_month_last_day']),
+                }), on='梯队', how='left')
+        merged_month_df['环比'] = ((merged_month_df[current_month_column] - merged_month_df[last_month_column])
+                                   / merged_month_df[last_month_column])
+        merged_month_df['同比'] = ((merged_month_df[current_month_column] - merged_month_df[last_year_same_month_column])
+                                   / merged_month_df[last_year_same_month_column])
+        # 计算全线同环比
+        current_month_sum_deal = merged_month_df[current_month_column].sum()
+        last_month_sum_deal = merged_month_df[last_month_column].sum()
+        last_year_same_month_sum_deal = merged_month_df[last_year_same_month_column].sum()
+        month_on_month_ratio = (current_month_sum_deal - last_month_sum_deal) / last_month_sum_deal
+        year_on_year_ratio = (current_month_sum_deal - last_year_same_month_sum_deal) / last_year_same_month_sum_deal
+        merged_month_df.loc[len(merged_month_df), :] \
+            = ['全线', current_month_sum_deal, last_month_sum_deal, last_year_same_month_sum_deal,
+               month_on_month_ratio, year_on_year_ratio]
+        # 自定义排序
+        category_type = pd.CategoricalDtype(categories=['一线', '二线', '三四线', '全线'], ordered=True)
+        merged_month_df['梯队'] = merged_month_df['梯队'].astype(category_type)
+        merged_month_df.sort_values(by='梯队', inplace=True)
+
+        return recent8week_deal_byweek_df, {
+            f'近8周{house_name}{metric_name}': recent8week_deal_byweek_df,
+            f'近4周{house_name}{metric_name}(同环比)': deal_bylevel_bycity_merged_df,
+            f'{house_name}月度{metric_name}(按梯队)': merged_month_df,
+        }
+
+    def aggregate_monthly_deal_data(self, labeled_dfs: Dict[str, pd.DataFrame], periods: Dict[str, str],
+                                    house_type: str) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame], float]:
+        """
+        月度统计汇总阶段：近6个月成交、近4个月按梯队及城市的同环比、年度同比（剔除零成交天数超过1/3的城市）
+        :param labeled_dfs: 按 城市×月份 汇总后的成交数据，见 label_deal_data
+        :param periods: 报告各统计区间的起止日期
+        :param house_type: 数据类型：newhouse--新房；secondhouse--二手房
+        :return: 近6个月成交趋势（绘图数据）、{sheet名称: 统计表}、年度同比
+        """
+        house_name, value_column = self.house_types[house_type]
+        metric_name: str = value_column.replace('成交', '交易')
+        current_year_first_day: str = periods['current_year_first_day']
+        current_year_summary_df: pd.DataFrame = labeled_dfs[f'{house_name}-本年度交易']
+        last_year_summary_df: pd.DataFrame = labeled_dfs[f'{house_name}-去年交易']
+
+        # 根据报告时间计算近6个月的月度时间（年-月），并存储在列表中
+        recent6_month_list: List[str] = []
+        for i in range(6):
+            recent_month_first_day: pd.Timestamp = (pd.to_datetime(periods['current_month_first_day'])
+                                                    - pd.DateOffset(months=i))
+            recent6_month_list.append(f'{recent_month_first_day.year}-{recent_month_first_day.month}')
+        # 月份逆序排列（从小到大排序）
+        recent6_month_list.reverse()
+        recent6_month_v2_list: List[str] = [month.split('-')[1] + '月' for month in recent6_month_list]
+        recent6_month_dict: Dict[str, str] = dict(zip(recent6_month_list, recent6_month_v2_list))
+        current_month: str = recent6_month_list[-1]
+        last_year_same_month: str = (f'{pd.to_datetime(periods["last_year_same_month_first_day"]).year}-'
+                                     f'{pd.to_datetime(periods["last_year_same_month_first_day"]).month}')
+
+        # 相关基表准备：近6个月、近4个月、去年同月的成交
+        recent6_month_deal_df: pd.DataFrame = current_year_summary_df[
+            current_year_summary_df['月份'].isin(recent6_month_list)]
+        recent4_month_deal_df: pd.DataFrame = current_year_summary_df[
+            current_year_summary_df['月份'].isin(recent6_month_list[-4:])]
+        last_year_same_month_deal_df: pd.DataFrame = last_year_summary_df[
+            last_year_summary_df['月份'] == last_year_same_month]
+
+        # 计算年度同比需要剔除的城市：统计期内零成交天数超过1/3的城市
+        current_year_days: int = pd.to_datetime(periods['current_month_last_day']).dayofyear
+        last_year_days: int = pd.to_datetime(periods['last_year_same_month_last_day']).dayofyear
+        current_year_zero_deal_city_list: List[str] = (
+            current_year_summary_df[current_year_summary_df['数据日期'] >= current_year_first_day]
+            .groupby('城市', observed=True)['零成交天数'].sum()
+            .loc[lambda x: x > current_year_days / 3].index.tolist()
+        )
+        last_year_zero_deal_city_list: List[str] = (
+            last_year_summary_df.groupby('城市', observed=True)['零成交天数'].sum()
+            .loc[lambda x: x > last_year_days / 3].index.tolist()
+        )
+        year_exclude_city_list: List[str] = list(
+            set(current_year_zero_deal_city_list).union(set(last_year_zero_deal_city_list)))
+
+        # 按"月份"分组统计近6个月的成交
+        recent6_month_deal_bymonth_df: pd.DataFrame = (recent6_month_deal_df
+                                                       .groupby('月份', observed=True)[value_column].sum()).reset_index()
+        recent6_month_deal_bymonth_df.columns = ['月份', value_column]
+        category_type = pd.CategoricalDtype(categories=recent6_month_list, ordered=True)
+        recent6_month_deal_bymonth_df['月份'] = recent6_month_deal_bymonth_df['月份'].astype(category_type)
+        recent6_month_deal_bymonth_df.sort_values(by='月份', inplace=True)
+        recent6_month_deal_bymonth_df['月份'] = recent6_month_deal_bymonth_df['月份'].apply(lambda x: x[2:])
+
+        # 按"梯队"、"城市"、"月份"统计近4个月的成交及同环比，并汇总梯队、全线
+        recent4_month_deal_bylevel_bycity_bymonth_merged_df: pd.DataFrame = self.period_comparison.compare(
+            current_df=recent4_month_deal_df,
+            last_year_df=last_year_same_month_deal_df,
+            value_column=value_column,
+            period_column='月份',
+            periods=recent6_month_list[-4:],
+            last_year_column=f'去年{current_month.split("-")[1]}月{value_column}',
+            period_labels=recent6_month_dict)
+
+        # 计算年度同比
+        current_year_deal_sum = current_year_summary_df[value_column][
+            (~current_year_summary_df['城市'].isin(year_exclude_city_list))
+            & (current_year_summary_df['数据日期'] >= current_year_first_day)].sum()
+        last_year_deal_sum = last_year_summary_df[value_column][
+            ~last_year_summary_df['城市'].isin(year_exclude_city_list)].sum()
+        print(f'{house_name}年度同比剔除城市：{year_exclude_city_list}；'
+              f'本年度{house_name}{value_column}：{current_year_deal_sum}；'
+              f'去年度{house_name}{value_column}：{last_year_deal_sum}')
+        yoy_of_deal_annual = (current_year_deal_sum - last_year_deal_sum) / last_year_deal_sum
+
+        return recent6_month_deal_bymonth_df, {
+            f'近6月{house_name}{metric_name}': recent6_month_deal_bymonth_df,
+            f'近4月{house_name}{metric_name}(同环比)': recent4_month_deal_bylevel_bycity_bymonth_merged_df,
+        }, yoy_of_deal_annual
+
+    def aggregate_available_data(self, available_dfs: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        可售统计阶段：本期、上期可售数据增加"梯队"及"整体"合计行，计算可售面积环比
+        :param available_dfs: 新房可售数据，见 review_deal_data
+        :return: {sheet名称: 统计表}
+        """
+        current_available_df, last_available_df = (available_df.copy() for available_df in available_dfs.values())
+        for available_df in (current_available_df, last_available_df):
+            available_df['梯队'] = self.config.map_city_level(available_df['城市'])
+            available_df.loc[len(available_df), :] = ['整体',
+                                                      available_df['可售套数'].sum(),
+                                                      available_df['可售面积'].sum(),
+                                                      '全线']
+        current_available_df.rename(columns={'可售套数': '本周可售套数', '可售面积': '本周可售面积'}, inplace=True)
+        last_available_df.rename(columns={'可售套数': '上周可售套数', '可售面积': '上周可售面积'}, inplace=True)
+        available_df: pd.DataFrame = current_available_df.merge(last_available_df, on=['梯队', '城市'], how='left')
+        available_df['可售面积环比'] = available_df.apply(
+            lambda x: (x['本周可售面积'] - x['上周可售面积']) / x['上周可售面积'], axis=1)
+        available_df.drop(columns=['上周可售套数', '上周可售面积'], inplace=True)
+        available_df.rename(columns={'本周可售套数': '可售套数', '本周可售面积': '可售面积'}, inplace=True)
+        available_columns = ['梯队', '城市', '可售套数', '可售面积', '可售面积环比']
+        available_df = available_df[available_columns]
+        # 自定义排序
+        category_type = pd.CategoricalDtype(categories=['一线', '二线', '全线'], ordered=True)
+        available_df['梯队'] = available_df['梯队'].astype(category_type)
+        available_df.sort_values(by=['梯队', '可售面积环比'], inplace=True)
+
+        return {'周度可售' if self.time_flag == 'w' else '可售面积环比': available_df}
+
+    def aggregate_annual_yoy(self, newhouse_annual_yoy: float, secondhouse_annual_yoy: float) -> Dict[str, pd.DataFrame]:
+        """
+        年度同比阶段（月度报告）：汇总新房、二手房年度同比
+        :param newhouse_annual_yoy: 新房年度同比，见 aggregate_monthly_deal_data
+        :param secondhouse_annual_yoy: 二手房年度同比
+        :return: {sheet名称: 统计表}
+        """
+        return {'新房二手房年度交易同比': pd.DataFrame(data={'数据类型': ['新房', '二手房'],
+                                                     '同比': [newhouse_annual_yoy, secondhouse_annual_yoy]})}
+
+    def render_trend_charts(self, newhouse_trend_df: pd.DataFrame, secondhouse_trend_df: pd.DataFrame) -> str | None:
+        """
+        绘图阶段：生成新房二手房成交趋势柱状图（在图表绘制线程中串行绘制），与写出统计表并行
+        :param newhouse_trend_df: 新房成交趋势（统计周期列、成交面积）
+        :param secondhouse_trend_df: 二手房成交趋势（统计周期列、成交套数）
+        :return: 图片路径
+        """
+        chart_future: Future | None = self.common_utils.gen_deal_trade_charts(
+            newhouse_deal_df=newhouse_trend_df,
+            secondhouse_deal_df=secondhouse_trend_df,
+            save_path=self.output_dir,
+            date_flag=self.time_flag,
+            profiler=self.profiler,
+            parent='render_charts'
+        )
+
+        # 等待绘图完成（绘图异常在此抛出）
+        return None if chart_future is None else chart_future.result()
+
+    def write_report_data(self, newhouse_sheets: Dict[str, pd.DataFrame], secondhouse_sheets: Dict[str, pd.DataFrame],
+                          available_sheets: Dict[str, pd.DataFrame],
+                          annual_sheets: Dict[str, pd.DataFrame] | None = None) -> str:
+        """
+        写出统计表阶段：将每个统计表存储到同一个Excel文件的不同sheet中，新房、二手房的同类统计表相邻排列
+        :param newhouse_sheets: 新房统计表
+        :param secondhouse_sheets: 二手房统计表
+        :param available_sheets: 可售统计表
+        :param annual_sheets: 年度同比统计表（月度报告）
+        :return: 文件路径
+        """
+        report_sheets: Dict[str, pd.DataFrame] = {}
+        for newhouse_sheet, secondhouse_sheet in zip(newhouse_sheets.items(), secondhouse_sheets.items()):
+            report_sheets.update([newhouse_sheet, secondhouse_sheet])
+        report_sheets.update(available_sheets)
+        report_sheets.update(annual_sheets or {})
+
+        return self.report_writer.write_excel(
+            f'{self.output_dir}/报告数据-{"周度" if self.time_flag == "w" else "月度"}.xlsx', report_sheets)
+
+    def build_pipeline(self) -> StagePipeline:
+        """
+        构建报告流水线：取数 -> 新房、二手房日度数据准备（并行）-> 写出原始日度数据 -> 缺数核对、补数
+        -> 新房、二手房标注及统计汇总、可售统计（并行）-> 绘制趋势图、写出统计表（并行）。
+        绘图、写出统计表阶段不写入检查点，续跑时总是重新执行；输出控制台信息的阶段（取数、缺数核对、月度统计汇总）独占控制台
+        :return:
+        """
+        pipeline: StagePipeline = StagePipeline(self.profiler, checkpoint_store=self.checkpoint_store,
+                                                report_date=self.report_date)
+        pipeline.add_stage('fetch', lambda periods: self.fetch_source_data(self.get_fetch_tasks(periods)),
+                           ('periods',), ('fetched_dfs',), stage='fetch',
+                           params={'aggregate_in_sql': self.aggregate_in_sql, 'use_local_store': self.use_local_store,
+                                   'refresh_store': self.refresh_store}, exclusive=True)
+        for house_type in self.house_types:
+            pipeline.add_stage(f'prepare_{house_type}', partial(self.prepare_deal_data, house_type=house_type),
+                               ('fetched_dfs', 'periods', 'override_patch_df'), (f'{house_type}_deal_dfs',))
+        # 原始日度数据写入检查点：续跑时输入未变化则不重新写出，保留两次运行之间对原始数据文件的人工修改
+        pipeline.add_stage('write_raw', self.write_raw_data,
+                           ('fetched_dfs', 'newhouse_deal_dfs', 'secondhouse_deal_dfs'), ('raw_data_path',), stage='write',
+                           params={'output_dir': self.output_dir, 'raw_format': self.report_writer.raw_format})
+        # 缺数核对指纹包含原始日度数据文件的内容摘要：文件被人工修改后续跑时重新核对、补数
+        pipeline.add_stage('review', self.review_deal_data,
+                           ('raw_data_path', 'fetched_dfs', 'newhouse_deal_dfs', 'secondhouse_deal_dfs'),
+                           ('newhouse_reviewed_dfs', 'secondhouse_reviewed_dfs', 'available_dfs'),
+                           params={'fill_policy': self.fill_policy, 'output_dir': self.output_dir,
+                                   'raw_data_digest': lambda raw_data_path, **_: StageCheckpointStore.get_file_digest(
+                                       raw_data_path)}, exclusive=True)
+        for house_type in self.house_types:
+            pipeline.add_stage(f'label_{house_type}', partial(self.label_deal_data, house_type=house_type),
+                               {'deal_dfs': f'{house_type}_reviewed_dfs', 'fetched_dfs': 'fetched_dfs'},
+                               (f'{house_type}_labeled_dfs',))
+            if self.time_flag == 'w':
+                pipeline.add_stage(f'statistics_{house_type}', partial(self.aggregate_weekly_deal_data, house_type=house_type),
+                                   {'labeled_dfs': f'{house_type}_labeled_dfs', 'periods': 'periods'},
+                                   (f'{house_type}_trend_df', f'{house_type}_sheets'))
+            else:
+                pipeline.add_stage(f'statistics_{house_type}', partial(self.aggregate_monthly_deal_data, house_type=house_type),
+                                   {'labeled_dfs': f'{house_type}_labeled_dfs', 'periods': 'periods'},
+                                   (f'{house_type}_trend_df', f'{house_type}_sheets', f'{house_type}_annual_yoy'),
+                                   exclusive=True)
+        pipeline.add_stage('statistics_available', self.aggregate_available_data, ('available_dfs',),
+                           ('available_sheets',))
+        report_inputs: Tuple[str, ...] = ('newhouse_sheets', 'secondhouse_sheets', 'available_sheets')
+        if self.time_flag == 'm':
+            pipeline.add_stage('statistics_annual', self.aggregate_annual_yoy,
+                               ('newhouse_annual_yoy', 'secondhouse_annual_yoy'), ('annual_sheets',))
+            report_inputs += ('annual_sheets',)
+        pipeline.add_stage('render_charts', self.render_trend_charts, ('newhouse_trend_df', 'secondhouse_trend_df'),
+                           ('chart_path',), stage='render', checkpoint=False)
+        pipeline.add_stage('write_excel', self.write_report_data, report_inputs, ('report_path',), stage='write',
+                           checkpoint=False)
+
+        return pipeline
+
+    def data_statistics(self, fetched_dfs: Dict[str, pd.DataFrame] | None = None) -> pd.DataFrame:
+        """
+        数据统计：分周月度，按 build_pipeline 中声明的阶段依赖调度执行，相互独立的阶段并发执行
+        :param fetched_dfs: 预先拉取的本期数据源（批量回溯时由调用方统一拉取后切片传入），为空时自行拉取，见 get_fetch_tasks
+        :return:
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.time_flag in ('w', 'm'):
+            values: Dict[str, Any] = {'periods': self.get_report_periods(),
+                                      'override_patch_df': self.override_patches.load()}
+            if fetched_dfs is not None:
+                values['fetched_dfs'] = fetched_dfs
+            self.build_pipeline().run(values)
+            if self.checkpoint_store is not None and not self.keep_checkpoints:
+                self.checkpoint_store.clear()
+
+        # 写出运行报告：各阶段耗时、行数、内存峰值
+        self.profiler.write_report()
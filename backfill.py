@@ -0,0 +1,173 @@
+import traceback
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from Report_8am_morning import Report8AmMorning
+from query_cache import QueryCache
+from run_profiler import RunProfiler
+
+
+class ReportBackfill(object):
+    """
+    批量回溯报告：对一段日期内的多期报告统一规划取数窗口，所有数据源只拉取一次（各期窗口的并集），
+    再在内存中按各期窗口切片，逐期完成统计与输出。
+    """
+    def __init__(self, config_path: str, time_flag: str, start_date: str, end_date: str,
+                 fill_policy: str = 'none', output_dir: str = r'data_files', use_local_store: bool = True,
+                 raw_format: str | None = None, aggregate_in_sql: bool = False,
+                 query_cache: QueryCache | None = None, engine: str | None = None,
+                 checkpoint_dir: str | None = None, resume: bool = False, keep_checkpoints: bool = False,
+                 refresh_store: bool = False) -> None:
+        """
+        :param config_path: 配置文件路径
+        :param time_flag: 时间维度标志（w--周；m--月）
+        :param start_date: 回溯开始日期
+        :param end_date: 回溯结束日期
+        :param fill_policy: 补数策略，见 Report8AmMorning.fill_policies
+        :param output_dir: 输出目录，每期报告输出至该目录下以报告日期命名的子目录
+        :param use_local_store: 是否使用本地日度成交数据仓库
+        :param raw_format: 原始日度数据输出格式，见 ReportWriter.raw_formats
+        :param aggregate_in_sql: 是否启用服务端汇总模式，见 Report8AmMorning.aggregate_in_sql
+        :param query_cache: 查询结果缓存（录制/回放），见 QueryCache
+        :param engine: 统计阶段的聚合引擎，见 DealQueryEngine
+        :param checkpoint_dir: 阶段检查点目录，各期报告的检查点以报告日期区分，见 StageCheckpointStore
+        :param resume: 是否续跑：各期报告跳过参数及输入均未变化的阶段（并集取数仍重新执行）
+        :param keep_checkpoints: 运行成功后是否保留检查点
+        :param refresh_store: 是否刷新本地仓库，见 Report8AmMorning.refresh_store
+        """
+        self.config_path = config_path
+        self.time_flag = time_flag
+        self.start_date = start_date
+        self.end_date = end_date
+        self.fill_policy = fill_policy
+        self.output_dir = output_dir
+        self.use_local_store = use_local_store
+        self.raw_format = raw_format
+        self.aggregate_in_sql = aggregate_in_sql
+        self.query_cache = query_cache
+        self.engine = engine
+        self.checkpoint_dir = checkpoint_dir
+        self.resume = resume
+        self.keep_checkpoints = keep_checkpoints
+        self.refresh_store = refresh_store
+
+    def get_report_dates(self) -> List[str]:
+        """
+        获取回溯区间内的全部报告日期：周度为区间内的每个周日，月度为区间内的每个月末
+        :return:
+        """
+        date_index: pd.DatetimeIndex = pd.date_range(self.start_date, self.end_date)
+        if self.time_flag == 'w':
+            date_index = date_index[date_index.weekday == 6]
+        else:
+            date_index = date_index[date_index.is_month_end]
+
+        return date_index.strftime('%Y-%m-%d').tolist()
+
+    @staticmethod
+    def merge_date_windows(windows: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        合并日期窗口：重叠或首尾相接的窗口合并为一个
+        :param windows: [(开始日期, 结束日期)]
+        :return: 合并后按开始日期排序的窗口
+        """
+        merged_windows: List[List[pd.Timestamp]] = []
+        for start_date, end_date in sorted((pd.Timestamp(start), pd.Timestamp(end)) for start, end in windows):
+            if merged_windows and start_date <= merged_windows[-1][1] + pd.Timedelta(days=1):
+                merged_windows[-1][1] = max(merged_windows[-1][1], end_date)
+            else:
+                merged_windows.append([start_date, end_date])
+
+        return [(start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')) for start, end in merged_windows]
+
+    def plan_fetch_tasks(self, reports: List[Report8AmMorning]) -> Dict[str, Tuple[Callable[..., pd.DataFrame], tuple]]:
+        """
+        取数规划：汇总各期报告的取数任务，按取数函数合并为并集任务。区间类任务（开始日期, 结束日期）合并重叠窗口，
+        时点类任务（日期）按日期去重
+        :param reports: 各期报告
+        :return: {并集任务名称: (取数函数, 参数元组)}
+        """
+        fetch_funcs: Dict[str, Callable[..., pd.DataFrame]] = {}
+        range_windows: Dict[str, List[Tuple[str, str]]] = {}
+        point_dates: Dict[str, set] = {}
+        for report in reports:
+            for fetch_func, args in report.get_fetch_tasks(report.get_report_periods()).values():
+                fetch_funcs.setdefault(fetch_func.__name__, fetch_func)
+                if len(args) == 2:
+                    range_windows.setdefault(fetch_func.__name__, []).append(args)
+                else:
+                    point_dates.setdefault(fetch_func.__name__, set()).add(args[0])
+
+        union_tasks: Dict[str, Tuple[Callable[..., pd.DataFrame], tuple]] = {}
+        for func_name, windows in range_windows.items():
+            for start_date, end_date in self.merge_date_windows(windows):
+                union_tasks[f'{func_name}:{start_date}:{end_date}'] = (fetch_funcs[func_name], (start_date, end_date))
+        for func_name, dates in point_dates.items():
+            for date_i in sorted(dates):
+                union_tasks[f'{func_name}:{date_i}'] = (fetch_funcs[func_name], (date_i,))
+
+        return union_tasks
+
+    def slice_fetched_data(self, report: Report8AmMorning,
+                           union_tasks: Dict[str, Tuple[Callable[..., pd.DataFrame], tuple]],
+                           union_dfs: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        按单期报告的取数任务，从并集数据中切片出该期所需的数据（均为副本，单期统计的修改不影响其他期）
+        :param report: 单期报告
+        :param union_tasks: 并集取数任务，见 plan_fetch_tasks
+        :param union_dfs: {并集任务名称: 取数结果}
+        :return: {任务名称: 取数结果}，与 Report8AmMorning.fetch_source_data 的返回一致
+        """
+        fetched_dfs: Dict[str, pd.DataFrame] = {}
+        for task_name, (fetch_func, args) in report.get_fetch_tasks(report.get_report_periods()).items():
+            union_task_name: str = next(
+                name for name, (union_func, union_args) in union_tasks.items()
+                if union_func.__name__ == fetch_func.__name__ and len(union_args) == len(args)
+                and union_args[0] <= args[0] and union_args[-1] >= args[-1])
+            if len(args) == 2:
+                union_df: pd.DataFrame = union_dfs[union_task_name]
+                union_dates: pd.Series = pd.to_datetime(union_df['数据日期'])
+                fetched_dfs[task_name] = union_df[(union_dates >= args[0])
+                                                  & (union_dates <= args[1])].reset_index(drop=True)
+            else:
+                fetched_dfs[task_name] = union_dfs[union_task_name].copy()
+
+        return fetched_dfs
+
+    def run(self) -> List[str]:
+        """
+        执行批量回溯：一次并集取数，逐期切片统计并输出
+        :return: 统计失败的报告日期列表
+        """
+        report_dates: List[str] = self.get_report_dates()
+        if not report_dates:
+            print(f'回溯区间内没有报告日期：{self.start_date} ~ {self.end_date}')
+            return []
+        # 各期报告共用一个运行耗时分析器，运行报告写入回溯输出目录
+        profiler: RunProfiler = RunProfiler(f'{self.output_dir}/运行报告-批量回溯.json')
+        reports: List[Report8AmMorning] = [
+            Report8AmMorning(self.config_path, report_date, self.time_flag, use_local_store=self.use_local_store,
+                             fill_policy=self.fill_policy, output_dir=f'{self.output_dir}/{report_date}',
+                             raw_format=self.raw_format, aggregate_in_sql=self.aggregate_in_sql, profiler=profiler,
+                             query_cache=self.query_cache, engine=self.engine,
+                             checkpoint_dir=self.checkpoint_dir, resume=self.resume,
+                             keep_checkpoints=self.keep_checkpoints, refresh_store=self.refresh_store)
+            for report_date in report_dates]
+
+        union_tasks: Dict[str, Tuple[Callable[..., pd.DataFrame], tuple]] = self.plan_fetch_tasks(reports)
+        print(f'回溯报告 {len(reports)} 期，合并为 {len(union_tasks)} 个取数任务')
+        union_dfs: Dict[str, pd.DataFrame] = reports[0].fetch_source_data(union_tasks)
+
+        failed_report_dates: List[str] = []
+        for report in reports:
+            try:
+                report.data_statistics(fetched_dfs=self.slice_fetched_data(report, union_tasks, union_dfs))
+                print(f'报告已生成：{report.report_date} -> {report.output_dir}')
+            except Exception:
+                traceback.print_exc()
+                failed_report_dates.append(report.report_date)
+                print(f'报告生成失败：{report.report_date}')
+        profiler.write_report()
+
+        return failed_report_dates
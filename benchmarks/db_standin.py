@@ -0,0 +1,178 @@
+import os
+import re
+import sqlite3
+from typing import Dict, List
+
+import pandas as pd
+
+from database_op import DatabaseOp
+
+
+class SqliteStandin(object):
+    """
+    生产数据库的本地 SQLite 替身：每个数据库（database_conf 中的键）对应一个 SQLite 文件，表名、列名与生产库一致，
+    报告中的 T-SQL 查询语句经 translate_sql 改写后直接在替身库上执行，报告代码无需任何改动
+    """
+    # 替身库表结构：{数据库名称: {表名: 建表语句}}，日期列以 'YYYY-MM-DD' 文本存储
+    table_ddls: Dict[str, Dict[str, str]] = {
+        'academe_dataspider': {
+            'CRED_Macro_Deal_Data': """
+                CREATE TABLE CRED_Macro_Deal_Data (
+                    city_name      TEXT,
+                    data_date      TEXT,
+                    date_type      TEXT,
+                    dimension_type TEXT,
+                    index_name1    TEXT,
+                    index_name2    TEXT,
+                    chengjiao_area REAL,
+                    chengjiao_set  REAL,
+                    keshou_set     REAL,
+                    keshou_area    REAL
+                )
+            """,
+            'cih_macro_chengdu_today_deal': """
+                CREATE TABLE cih_macro_chengdu_today_deal (
+                    district    TEXT,
+                    type        TEXT,
+                    data_time   TEXT,
+                    zz_area     REAL,
+                    create_time TEXT
+                )
+            """,
+        },
+        'house_test': {
+            'temp_cred_macro_deal_data': """
+                CREATE TABLE temp_cred_macro_deal_data (
+                    dimension_value TEXT,
+                    data_date       TEXT,
+                    date_type       TEXT,
+                    dimension_type  TEXT,
+                    property_type   TEXT,
+                    index_name      TEXT,
+                    deal_area       REAL,
+                    deal_num        REAL
+                )
+            """,
+            'temp_CRED_LowDealData': """
+                CREATE TABLE temp_CRED_LowDealData (
+                    dimension_value TEXT,
+                    data_date       TEXT,
+                    date_type       TEXT,
+                    dimension_type  TEXT,
+                    property_type   TEXT,
+                    deal_area       REAL
+                )
+            """,
+        },
+    }
+    # 与生产库一致的查询索引：按 指标/物业类型 + 城市 + 日期 过滤
+    index_ddls: Dict[str, List[str]] = {
+        'academe_dataspider': [
+            'CREATE INDEX ix_macro_deal ON CRED_Macro_Deal_Data (index_name1, city_name, data_date)',
+            'CREATE INDEX ix_chengdu_deal ON cih_macro_chengdu_today_deal (district, type, data_time)',
+        ],
+        'house_test': [
+            'CREATE INDEX ix_temp_deal ON temp_cred_macro_deal_data (property_type, dimension_value, data_date)',
+            'CREATE INDEX ix_low_deal ON temp_CRED_LowDealData (property_type, dimension_value, data_date)',
+        ],
+    }
+
+    def __init__(self, data_dir: str) -> None:
+        """
+        :param data_dir: 替身库文件所在目录
+        """
+        self.data_dir = data_dir
+
+    def get_db_path(self, db_name: str) -> str:
+        """
+        获取替身库文件路径
+        :param db_name: 数据库名称
+        :return:
+        """
+        return os.path.join(self.data_dir, f'{db_name}.sqlite')
+
+    def exists(self) -> bool:
+        """
+        替身库文件是否均已生成
+        :return:
+        """
+        return all(os.path.exists(self.get_db_path(db_name)) for db_name in self.table_ddls)
+
+    def create(self, table_dfs: Dict[str, Dict[str, pd.DataFrame]]) -> None:
+        """
+        生成替身库：建表、写入数据后再建索引（先写后建索引，写入更快）
+        :param table_dfs: {数据库名称: {表名: 数据}}，数据列与建表语句一致
+        :return:
+        """
+        os.makedirs(self.data_dir, exist_ok=True)
+        for db_name, ddls in self.table_ddls.items():
+            db_path: str = self.get_db_path(db_name)
+            if os.path.exists(db_path):
+                os.remove(db_path)
+            with sqlite3.connect(db_path) as conn:
+                for table_name, ddl in ddls.items():
+                    conn.execute(ddl)
+                    table_df: pd.DataFrame = table_dfs.get(db_name, {}).get(table_name)
+                    if table_df is not None and not table_df.empty:
+                        table_df.to_sql(table_name, conn, if_exists='append', index=False)
+                for index_ddl in self.index_ddls[db_name]:
+                    conn.execute(index_ddl)
+            conn.close()
+
+    def get_conn_urls(self) -> Dict[str, str]:
+        """
+        获取替身库连接 URL，用于 DatabaseOp 的 conn_urls
+        :return:
+        """
+        return {db_name: f'sqlite:///{os.path.abspath(self.get_db_path(db_name))}' for db_name in self.table_ddls}
+
+    def get_database_op(self) -> DatabaseOp:
+        """
+        获取指向替身库的数据库操作对象
+        :return:
+        """
+        return DatabaseOp(conn_urls=self.get_conn_urls(), sql_translator=self.translate_sql)
+
+    @staticmethod
+    def find_open_paren(sql: str, close_index: int) -> int:
+        """
+        查找与指定右括号配对的左括号位置
+        :param sql: 查询语句
+        :param close_index: 右括号位置
+        :return:
+        """
+        depth: int = 0
+        for index in range(close_index, -1, -1):
+            if sql[index] == ')':
+                depth += 1
+            elif sql[index] == '(':
+                depth -= 1
+                if depth == 0:
+                    return index
+        raise ValueError(f'查询语句括号不匹配：{sql}')
+
+    @classmethod
+    def translate_sql(cls, sql: str) -> str:
+        """
+        将报告中用到的 T-SQL 语法改写为 SQLite 语法：去掉库名/架构前缀，CONVERT/ISNULL/DATEFROMPARTS/POWER 改为等价函数，
+        带列别名的派生表（FROM (...) AS t (a, b, c)）改为 WITH 公用表表达式
+        :param sql: T-SQL 查询语句
+        :return:
+        """
+        sql = re.sub(r'\b(?:Academe_DataSpider\.|Academe_Business\.)?dbo\.', '', sql)
+        sql = re.sub(r'CONVERT\(FLOAT, (\w+)\)', r'CAST(\1 AS REAL)', sql)
+        sql = re.sub(r'CONVERT\(INT, (\w+)\)', r'CAST(\1 AS INTEGER)', sql)
+        sql = re.sub(r'CONVERT\(DATE, (\w+)\)', r'date(\1)', sql)
+        sql = re.sub(r'DATEFROMPARTS\(YEAR\((\w+)\), MONTH\(\1\), 1\)', r"date(\1, 'start of month')", sql)
+        sql = re.sub(r'\bISNULL\(', 'IFNULL(', sql)
+        sql = re.sub(r'POWER\(CAST\(2 AS BIGINT\), DAY\((\w+)\) - 1\)',
+                     r"(1 << (CAST(strftime('%d', \1) AS INTEGER) - 1))", sql)
+
+        derived_match: re.Match | None = re.search(r'\)\s+AS\s+(\w+)\s*\(([\w\s,]+)\)', sql)
+        if derived_match is not None:
+            open_index: int = cls.find_open_paren(sql, derived_match.start())
+            inner_sql: str = sql[open_index + 1:derived_match.start()]
+            sql = (f'WITH {derived_match.group(1)} ({derived_match.group(2)}) AS ({inner_sql}) '
+                   f'{sql[:open_index]}{derived_match.group(1)}{sql[derived_match.end():]}')
+
+        return sql
@@ -0,0 +1,280 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+
+from Report_8am_morning import Report8AmMorning
+from benchmarks.synthetic_data import SyntheticDealData
+from deal_engine import DealQueryEngine
+from run_profiler import RunProfiler
+
+
+class ReportBenchmark(object):
+    """
+    报告性能基准：在合成数据的本地替身库上运行周度、月度报告（不访问生产数据库），每个场景重复多轮，
+    统计总耗时（min/max/mean/median/stddev，与 pytest-benchmark 一致）及各阶段耗时、内存峰值，结果写出为 JSON，
+    并可与上一次的结果对比，发现性能回退
+    """
+    scenario_names: Dict[str, str] = {'w': 'weekly', 'm': 'monthly'}
+    # 入口模块导入时不应加载的重型依赖（首次使用时才导入）
+    lazy_modules: Tuple[str, ...] = ('matplotlib', 'holidays', 'PIL', 'sqlalchemy', 'openpyxl')
+
+    def __init__(self, city_counts: List[int], time_flags: List[str], years: int = 2, missing_rate: float = 0.05,
+                 rounds: int = 3, warmup_rounds: int = 1, aggregate_in_sql: bool = False,
+                 data_root: str = r'benchmarks/data', engine: str = 'pandas') -> None:
+        """
+        :param city_counts: 各场景的城市数
+        :param time_flags: 时间维度（w--周；m--月）
+        :param years: 合成数据覆盖的自然年数
+        :param missing_rate: 合成数据缺数率
+        :param rounds: 每个场景计时的轮数
+        :param warmup_rounds: 每个场景计时前的预热轮数（不计入统计）
+        :param aggregate_in_sql: 月度报告是否启用服务端汇总模式
+        :param data_root: 合成数据集根目录
+        :param engine: 统计阶段的聚合引擎，见 DealQueryEngine
+        """
+        self.city_counts = city_counts
+        self.time_flags = time_flags
+        self.years = years
+        self.missing_rate = missing_rate
+        self.rounds = rounds
+        self.warmup_rounds = warmup_rounds
+        self.aggregate_in_sql = aggregate_in_sql
+        self.data_root = data_root
+        self.engine = engine
+
+    @staticmethod
+    def get_report_date(time_flag: str, end_date: str) -> str:
+        """
+        获取合成数据截止日期内的最后一期报告日期：周度为最后一个周日，月度为最后一个月末
+        :param time_flag: 时间维度标志
+        :param end_date: 合成数据截止日期
+        :return:
+        """
+        end_timestamp: pd.Timestamp = pd.Timestamp(end_date)
+        if time_flag == 'w':
+            report_timestamp: pd.Timestamp = end_timestamp - pd.Timedelta(days=(end_timestamp.weekday() + 1) % 7)
+        elif end_timestamp.is_month_end:
+            report_timestamp = end_timestamp
+        else:
+            report_timestamp = end_timestamp.replace(day=1) - pd.Timedelta(days=1)
+
+        return report_timestamp.strftime('%Y-%m-%d')
+
+    def run_once(self, dataset: SyntheticDealData, time_flag: str) -> Dict[str, Any]:
+        """
+        运行一轮报告：全部从替身库取数（不使用本地仓库）、不补数，输出至临时目录，运行结束后删除
+        :param dataset: 合成数据集
+        :param time_flag: 时间维度标志
+        :return: 本轮总耗时及运行报告
+        """
+        output_dir: str = tempfile.mkdtemp(prefix='morning8am_benchmark_')
+        try:
+            profiler: RunProfiler = RunProfiler()
+            report: Report8AmMorning = Report8AmMorning(
+                dataset.config_path, self.get_report_date(time_flag, dataset.end_date), time_flag,
+                use_local_store=False, fill_policy='none', output_dir=output_dir,
+                aggregate_in_sql=self.aggregate_in_sql, profiler=profiler, engine=self.engine)
+            report.database_op = dataset.standin.get_database_op()
+            start_time: float = time.perf_counter()
+            report.data_statistics()
+            wall_seconds: float = time.perf_counter() - start_time
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+        return {'wall_seconds': wall_seconds, 'run_report': profiler.get_report()}
+
+    def run_scenario(self, city_count: int, time_flag: str) -> Dict[str, Any]:
+        """
+        运行单个场景：准备（或复用）合成数据集，预热后计时多轮
+        :param city_count: 城市数
+        :param time_flag: 时间维度标志
+        :return: 场景结果，结构参照 pytest-benchmark 的 benchmarks 条目
+        """
+        dataset: SyntheticDealData = SyntheticDealData(city_count, self.years, self.missing_rate,
+                                                       data_root=self.data_root)
+        manifest: Dict[str, Any] = dataset.prepare()
+        for _ in range(self.warmup_rounds):
+            self.run_once(dataset, time_flag)
+        round_results: List[Dict[str, Any]] = [self.run_once(dataset, time_flag) for _ in range(self.rounds)]
+
+        wall_seconds: List[float] = [round_result['wall_seconds'] for round_result in round_results]
+        stage_seconds: Dict[str, float] = {
+            stage: round(statistics.median(round_result['run_report']['stage_seconds'][stage]
+                                           for round_result in round_results), 4)
+            for stage in RunProfiler.stages}
+
+        return {
+            'name': (f'{self.scenario_names[time_flag]}-{city_count}cities'
+                     f'{"-sql-aggregate" if self.aggregate_in_sql else ""}{"-duckdb" if self.engine == "duckdb" else ""}'),
+            'params': {'time_flag': time_flag, 'cities': city_count, 'years': self.years,
+                       'missing_rate': self.missing_rate, 'aggregate_in_sql': self.aggregate_in_sql,
+                       'engine': self.engine},
+            'dataset': manifest,
+            'stats': {
+                'min': round(min(wall_seconds), 4),
+                'max': round(max(wall_seconds), 4),
+                'mean': round(statistics.mean(wall_seconds), 4),
+                'median': round(statistics.median(wall_seconds), 4),
+                'stddev': round(statistics.stdev(wall_seconds), 4) if len(wall_seconds) > 1 else 0.0,
+                'rounds': len(wall_seconds),
+                'data': [round(seconds, 4) for seconds in wall_seconds],
+            },
+            'stage_seconds': stage_seconds,
+            'peak_memory_mb': max((round_result['run_report']['peak_memory_mb'] or 0) for round_result in round_results),
+        }
+
+    def run(self) -> Dict[str, Any]:
+        """
+        运行全部场景
+        :return: 基准结果
+        """
+        benchmark_results: List[Dict[str, Any]] = []
+        for city_count in self.city_counts:
+            for time_flag in self.time_flags:
+                benchmark_result: Dict[str, Any] = self.run_scenario(city_count, time_flag)
+                benchmark_results.append(benchmark_result)
+                print(f"{benchmark_result['name']:<24} median {benchmark_result['stats']['median']:>9.3f}s  "
+                      f"min {benchmark_result['stats']['min']:>9.3f}s  "
+                      f"stages {benchmark_result['stage_seconds']}")
+
+        return {
+            'machine_info': {'python_version': platform.python_version(), 'platform': platform.platform(),
+                             'processor': platform.processor(), 'cpu_count': os.cpu_count(),
+                             'pandas_version': pd.__version__},
+            'datetime': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'benchmarks': benchmark_results,
+        }
+
+    def measure_import(self, module_name: str = 'main', rounds: int = 5) -> Dict[str, Any]:
+        """
+        测量入口模块的导入耗时：每轮在新的解释器中以 -X importtime 导入，取累计耗时，并检查是否提前加载了 lazy_modules
+        :param module_name: 入口模块名称
+        :param rounds: 轮数
+        :return: 导入耗时（秒，min/median）及提前加载的重型依赖
+        """
+        check_code: str = (f'import json, sys, {module_name}; '
+                           f'print(json.dumps([name for name in {list(self.lazy_modules)!r} if name in sys.modules]))')
+        import_seconds: List[float] = []
+        eager_modules: List[str] = []
+        for _ in range(rounds):
+            completed: subprocess.CompletedProcess = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', check_code],
+                capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            # 每行格式：import time: 自身耗时(us) | 累计耗时(us) | 模块名，取入口模块所在行
+            for line in completed.stderr.splitlines():
+                fields: List[str] = line.split('|')
+                if len(fields) == 3 and fields[2].strip() == module_name:
+                    import_seconds.append(int(fields[1]) / 1e6)
+            eager_modules = json.loads(completed.stdout.strip().splitlines()[-1])
+
+        return {'module': module_name, 'min': round(min(import_seconds), 4),
+                'median': round(statistics.median(import_seconds), 4), 'rounds': len(import_seconds),
+                'eager_modules': eager_modules}
+
+    @staticmethod
+    def compare(results: Dict[str, Any], baseline_results: Dict[str, Any], max_regression: float) -> List[str]:
+        """
+        与基线结果对比各场景的耗时中位数
+        :param results: 本次基准结果
+        :param baseline_results: 基线基准结果
+        :param max_regression: 允许的最大回退比例（如 0.1 表示慢 10% 以内不视为回退）
+        :return: 发生回退的场景名称
+        """
+        baseline_medians: Dict[str, float] = {benchmark['name']: benchmark['stats']['median']
+                                              for benchmark in baseline_results['benchmarks']}
+        regressed_names: List[str] = []
+        for benchmark in results['benchmarks']:
+            baseline_median: float | None = baseline_medians.get(benchmark['name'])
+            if not baseline_median:
+                continue
+            ratio: float = benchmark['stats']['median'] / baseline_median
+            print(f"{benchmark['name']:<24} {baseline_median:>9.3f}s -> {benchmark['stats']['median']:>9.3f}s  "
+                  f"({ratio - 1:+.1%})")
+            if ratio > 1 + max_regression:
+                regressed_names.append(benchmark['name'])
+
+        return regressed_names
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """
+    解析命令行参数
+    :param argv: 命令行参数，为空时读取 sys.argv
+    :return:
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='早八点报告性能基准（合成数据 + 本地替身库）')
+    parser.add_argument('-c', '--cities', type=int, nargs='+', default=[30, 300, 1000], help='各场景的城市数')
+    parser.add_argument('-t', '--time-flags', nargs='+', choices=['w', 'm'], default=['w', 'm'],
+                        help='时间维度：w--周；m--月')
+    parser.add_argument('-y', '--years', type=int, default=2, help='合成数据覆盖的自然年数')
+    parser.add_argument('--missing-rate', type=float, default=0.05, help='合成数据缺数率')
+    parser.add_argument('-r', '--rounds', type=int, default=3, help='每个场景计时的轮数')
+    parser.add_argument('-w', '--warmup-rounds', type=int, default=1, help='每个场景计时前的预热轮数')
+    parser.add_argument('-a', '--sql-aggregate', action='store_true', help='月度报告启用服务端汇总模式')
+    parser.add_argument('-e', '--engine', choices=list(DealQueryEngine.engines), default='pandas',
+                        help='统计阶段的聚合引擎：pandas（默认）；duckdb（需安装 duckdb）')
+    parser.add_argument('--import-budget', type=float, default=1.0,
+                        help='入口模块（main）导入耗时上限（秒），超出或提前加载绘图库等重型依赖时退出码为 1')
+    parser.add_argument('--data-root', default=r'benchmarks/data', help='合成数据集根目录（按参数缓存）')
+    parser.add_argument('-o', '--output', help='基准结果 JSON 路径')
+    parser.add_argument('--compare', help='基线基准结果 JSON 路径，与之对比耗时中位数')
+    parser.add_argument('--max-regression', type=float, default=0.1, help='对比时允许的最大回退比例')
+
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> int:
+    """
+    性能基准入口
+    :param argv: 命令行参数
+    :return: 退出码：0--成功；1--存在性能回退或入口模块导入超出预算
+    """
+    args: argparse.Namespace = parse_args(argv)
+    # 合成城市名在无中文字体的环境下绘图会告警，不影响计时
+    warnings.filterwarnings('ignore', message='Glyph .* missing from font')
+    logging.getLogger('matplotlib.font_manager').setLevel(logging.ERROR)
+    benchmark: ReportBenchmark = ReportBenchmark(args.cities, args.time_flags, args.years, args.missing_rate,
+                                                 args.rounds, args.warmup_rounds, args.sql_aggregate, args.data_root,
+                                                 args.engine)
+    results: Dict[str, Any] = benchmark.run()
+    results['import'] = benchmark.measure_import()
+    print(f"import {results['import']['module']:<17} median {results['import']['median']:>9.3f}s  "
+          f"min {results['import']['min']:>9.3f}s  eager {results['import']['eager_modules']}")
+    if args.output:
+        output_dir: str = os.path.dirname(args.output)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f'基准结果已写出：{args.output}')
+    exit_code: int = 0
+    if results['import']['eager_modules'] or results['import']['median'] > args.import_budget:
+        print(f"入口模块导入超出预算：{results['import']['median']:.3f}s（上限 {args.import_budget:.3f}s），"
+              f"提前加载：{results['import']['eager_modules']}")
+        exit_code = 1
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline_results: Dict[str, Any] = json.load(f)
+        regressed_names: List[str] = benchmark.compare(results, baseline_results, args.max_regression)
+        if regressed_names:
+            print(f'性能回退超过 {args.max_regression:.0%}：{regressed_names}')
+            exit_code = 1
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,230 @@
+import json
+import os
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.db_standin import SqliteStandin
+
+
+class SyntheticDealData(object):
+    """
+    合成基准数据：按 城市数 × 年数 × 缺数率 生成配置文件及各数据源的日度成交表，写入本地 SQLite 替身库。
+    数据源构成与生产配置一致（官方发布商品住宅/商品房、项目汇总、成都采集表、测试表补充、新房可售），
+    相同参数的数据集只生成一次，之后直接复用
+    """
+    # 各梯队城市日均成交的量级：(新房成交面积 ㎡, 二手房成交套数)
+    level_deal_scales: Dict[str, tuple] = {
+        '一线': (30000.0, 600.0),
+        '二线': (12000.0, 250.0),
+        '三四线': (3000.0, 60.0),
+    }
+
+    def __init__(self, cities: int = 30, years: int = 2, missing_rate: float = 0.05,
+                 end_date: str = '2025-02-28', seed: int = 20250228, data_root: str = r'benchmarks/data') -> None:
+        """
+        :param cities: 城市数（不少于 10）
+        :param years: 数据覆盖的自然年数（截至 end_date 所在年），周度、月度报告至少需要 2 年（本年及去年同期）
+        :param missing_rate: 主数据源的缺数率，缺失日期中约一半可由测试表补充
+        :param end_date: 数据截止日期
+        :param seed: 随机数种子，相同参数生成的数据完全一致
+        :param data_root: 数据集根目录，每组参数一个子目录
+        """
+        if cities < 10:
+            raise ValueError(f'城市数不能少于 10：{cities}')
+        self.cities = cities
+        self.years = years
+        self.missing_rate = missing_rate
+        self.end_date = end_date
+        self.seed = seed
+        self.data_dir: str = os.path.join(
+            data_root, f'cities{cities}-years{years}-missing{missing_rate:g}-{end_date}-seed{seed}')
+        self.standin: SqliteStandin = SqliteStandin(self.data_dir)
+
+    @property
+    def config_path(self) -> str:
+        """
+        合成配置文件路径
+        :return:
+        """
+        return os.path.join(self.data_dir, 'config_file.xlsx')
+
+    @property
+    def manifest_path(self) -> str:
+        """
+        数据集清单路径（生成完成后写出，存在即表示数据集完整可用）
+        :return:
+        """
+        return os.path.join(self.data_dir, 'manifest.json')
+
+    def get_city_config(self) -> Dict[str, pd.DataFrame]:
+        """
+        生成城市配置，比例参照生产配置：一线 4 城、二线约 30%、其余三四线；新房约 10% 为商品房口径、约 3% 为项目汇总；
+        二手房约 2/3 城市，其中约 20% 为商品房口径；新房可售为一线、二线官方发布商品住宅城市。
+        固定包含成都（采集表）与衢州（节假日补零）
+        :return: {sheet 名称: 配置}，与生产配置文件的 sheet 一致
+        """
+        city_names: List[str] = [f'城市{index:04d}' for index in range(self.cities - 2)]
+        second_level_count: int = max(int(self.cities * 0.3), 2)
+        city_names = city_names[:4] + ['成都'] + city_names[4:4 + second_level_count - 1] + ['衢州'] \
+            + city_names[4 + second_level_count - 1:]
+        levels: List[str] = ['一线'] * 4 + ['二线'] * second_level_count + ['三四线'] * (self.cities - 4 - second_level_count)
+        level_df: pd.DataFrame = pd.DataFrame({'城市': city_names, '梯队': levels})
+
+        rng: np.random.Generator = np.random.default_rng(self.seed)
+        newhouse_df: pd.DataFrame = level_df[['梯队', '城市']].copy()
+        newhouse_df['物业类型'] = np.where(rng.random(self.cities) < 0.1, '商品房', '商品住宅')
+        newhouse_df['数据来源'] = '官方发布'
+        project_summary_count: int = max(self.cities * 3 // 100, 1)
+        project_summary_index: np.ndarray = rng.choice(
+            newhouse_df.index[(newhouse_df['梯队'] == '三四线') & (newhouse_df['城市'] != '衢州')],
+            project_summary_count, replace=False)
+        newhouse_df.loc[project_summary_index, ['物业类型', '数据来源']] = ['商品住宅', '项目汇总']
+        newhouse_df.loc[newhouse_df['城市'] == '成都', '物业类型'] = '商品住宅'
+
+        secondhouse_df: pd.DataFrame = level_df.loc[level_df.index % 3 != 2, ['梯队', '城市']].reset_index(drop=True)
+        secondhouse_df['物业类型'] = np.where(rng.random(len(secondhouse_df)) < 0.2, '二手商品房', '二手商品住宅')
+        secondhouse_df['数据来源'] = '官方发布'
+
+        available_df: pd.DataFrame = newhouse_df[newhouse_df['梯队'].isin(['一线', '二线'])
+                                                 & (newhouse_df['物业类型'] == '商品住宅')
+                                                 & (newhouse_df['数据来源'] == '官方发布')
+                                                 & (newhouse_df['城市'] != '成都')]
+
+        return {
+            '新房配置': newhouse_df,
+            '二手房配置': secondhouse_df,
+            '新房可售配置': available_df.reset_index(drop=True),
+            '城市梯队': level_df,
+        }
+
+    def gen_daily_values(self, rng: np.random.Generator, cities: pd.Series, levels: pd.Series,
+                         dates: pd.DatetimeIndex, scale_index: int) -> pd.DataFrame:
+        """
+        生成 城市×日期 的日度成交：城市基数 × 周末系数 × 随机波动，约 3% 的日期为零成交
+        :param rng: 随机数生成器
+        :param cities: 城市
+        :param levels: 城市对应梯队
+        :param dates: 日期
+        :param scale_index: 量级序号：0--新房成交面积；1--二手房成交套数
+        :return: 城市、数据日期、成交值
+        """
+        city_scales: np.ndarray = np.array([self.level_deal_scales[level][scale_index] for level in levels]) \
+            * rng.uniform(0.5, 1.5, len(cities))
+        weekday_factors: np.ndarray = np.where(dates.weekday >= 5, 0.6, 1.0)
+        values: np.ndarray = np.outer(city_scales, weekday_factors) * rng.lognormal(0, 0.35, (len(cities), len(dates)))
+        values[rng.random(values.shape) < 0.03] = 0
+        values = np.round(values, 2) if scale_index == 0 else np.round(values)
+
+        return pd.DataFrame({
+            'city': np.repeat(cities.to_numpy(), len(dates)),
+            'data_date': np.tile(dates.strftime('%Y-%m-%d').to_numpy(), len(cities)),
+            'value': values.ravel(),
+        })
+
+    def split_missing(self, rng: np.random.Generator, values_df: pd.DataFrame) -> tuple:
+        """
+        按缺数率拆分主数据源与测试表：主数据源缺失的日期中约一半写入测试表（测试表优先级低于主数据源）
+        :param rng: 随机数生成器
+        :param values_df: 日度成交
+        :return: (主数据源部分, 测试表部分)
+        """
+        missing_mask: np.ndarray = rng.random(len(values_df)) < self.missing_rate
+        backup_mask: np.ndarray = missing_mask & (rng.random(len(values_df)) < 0.5)
+
+        return values_df[~missing_mask], values_df[backup_mask]
+
+    def gen_tables(self) -> Dict[str, Dict[str, pd.DataFrame]]:
+        """
+        生成各数据源的日度成交表
+        :return: {数据库名称: {表名: 数据}}，见 SqliteStandin.table_ddls
+        """
+        rng: np.random.Generator = np.random.default_rng(self.seed)
+        config_dfs: Dict[str, pd.DataFrame] = self.get_city_config()
+        dates: pd.DatetimeIndex = pd.date_range(f'{pd.Timestamp(self.end_date).year - self.years + 1}-01-01',
+                                                self.end_date)
+        macro_dfs: List[pd.DataFrame] = []
+        temp_dfs: List[pd.DataFrame] = []
+
+        # 新房：官方发布城市写入主数据源（成都除外，成都来自采集表），项目汇总城市写入 LowDealData
+        newhouse_df: pd.DataFrame = config_dfs['新房配置']
+        official_df: pd.DataFrame = newhouse_df[(newhouse_df['数据来源'] == '官方发布') & (newhouse_df['城市'] != '成都')]
+        values_df: pd.DataFrame = self.gen_daily_values(rng, official_df['城市'], official_df['梯队'], dates, 0)
+        values_df['property_type'] = values_df['city'].map(official_df.set_index('城市')['物业类型'])
+        main_df, backup_df = self.split_missing(rng, values_df)
+        # 新房可售与成交同行存储：可售城市每日一条存量
+        available_mask: pd.Series = main_df['city'].isin(config_dfs['新房可售配置']['城市'])
+        available_sets: np.ndarray = np.round(rng.uniform(20000, 120000, int(available_mask.sum())))
+        main_df = main_df.assign(keshou_set=np.nan, keshou_area=np.nan)
+        main_df.loc[available_mask, 'keshou_set'] = available_sets
+        main_df.loc[available_mask, 'keshou_area'] = np.round(
+            available_sets * rng.uniform(90, 130, len(available_sets)), 2)
+        macro_dfs.append(main_df.rename(columns={'city': 'city_name', 'property_type': 'index_name1',
+                                                 'value': 'chengjiao_area'}))
+        temp_dfs.append(backup_df.rename(columns={'city': 'dimension_value', 'value': 'deal_area'}))
+
+        project_summary_df: pd.DataFrame = newhouse_df[newhouse_df['数据来源'] == '项目汇总']
+        low_deal_df: pd.DataFrame = self.gen_daily_values(rng, project_summary_df['城市'], project_summary_df['梯队'],
+                                                          dates, 0)
+        low_deal_df = low_deal_df.rename(columns={'city': 'dimension_value', 'value': 'deal_area'}).assign(
+            date_type='day', dimension_type='城市', property_type='商品住宅')
+
+        # 成都采集表：每日采集两次，取数时保留最新一次
+        chengdu_df: pd.DataFrame = self.gen_daily_values(rng, pd.Series(['成都']), pd.Series(['二线']), dates, 0)
+        chengdu_df = pd.concat([
+            pd.DataFrame({'data_time': chengdu_df['data_date'], 'zz_area': chengdu_df['value'] * 0.9,
+                          'create_time': chengdu_df['data_date'] + ' 18:00:00'}),
+            pd.DataFrame({'data_time': chengdu_df['data_date'], 'zz_area': chengdu_df['value'],
+                          'create_time': chengdu_df['data_date'] + ' 23:00:00'}),
+        ], ignore_index=True).assign(district='全市', type='spf')
+
+        # 二手房
+        secondhouse_df: pd.DataFrame = config_dfs['二手房配置']
+        values_df = self.gen_daily_values(rng, secondhouse_df['城市'], secondhouse_df['梯队'], dates, 1)
+        values_df['property_type'] = values_df['city'].map(secondhouse_df.set_index('城市')['物业类型'])
+        main_df, backup_df = self.split_missing(rng, values_df)
+        macro_dfs.append(main_df.rename(columns={'city': 'city_name', 'property_type': 'index_name1',
+                                                 'value': 'chengjiao_set'}))
+        temp_dfs.append(backup_df.rename(columns={'city': 'dimension_value', 'value': 'deal_num'}))
+
+        macro_df: pd.DataFrame = pd.concat(macro_dfs, ignore_index=True).assign(
+            date_type='day', dimension_type='城市', index_name2='总体')
+        temp_df: pd.DataFrame = pd.concat(temp_dfs, ignore_index=True).assign(
+            date_type='day', dimension_type='城市', index_name='总体')
+
+        return {
+            'academe_dataspider': {'CRED_Macro_Deal_Data': macro_df, 'cih_macro_chengdu_today_deal': chengdu_df},
+            'house_test': {'temp_cred_macro_deal_data': temp_df, 'temp_CRED_LowDealData': low_deal_df},
+        }
+
+    def prepare(self) -> Dict[str, Any]:
+        """
+        准备数据集：已生成过的直接复用，否则生成配置文件与替身库
+        :return: 数据集清单（参数、配置文件路径、各表行数）
+        """
+        if os.path.exists(self.manifest_path) and self.standin.exists():
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+
+        os.makedirs(self.data_dir, exist_ok=True)
+        with pd.ExcelWriter(self.config_path) as writer:
+            for sheet_name, config_df in self.get_city_config().items():
+                config_df.to_excel(writer, sheet_name=sheet_name, index=False)
+        table_dfs: Dict[str, Dict[str, pd.DataFrame]] = self.gen_tables()
+        self.standin.create(table_dfs)
+
+        manifest: Dict[str, Any] = {
+            'cities': self.cities,
+            'years': self.years,
+            'missing_rate': self.missing_rate,
+            'end_date': self.end_date,
+            'seed': self.seed,
+            'config_path': self.config_path,
+            'table_rows': {table_name: len(table_df)
+                           for db_tables in table_dfs.values() for table_name, table_df in db_tables.items()},
+        }
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        return manifest
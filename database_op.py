@@ -1,9 +1,26 @@
-from typing import Dict
+import copy
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Tuple
 
-from sqlalchemy import create_engine, Engine, Connection
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from query_cache import QueryCache
+
+if TYPE_CHECKING:
+    from sqlalchemy import Engine, Connection, TextClause
 
 
 class DatabaseOp(object):
+    # 进程级引擎注册表：每个数据库（连接 URL + 连接池参数）只创建一个带连接池的 Engine，多次取数复用已建立的连接；
+    # 连接池参数不同的 DatabaseOp 使用各自的 Engine，不会沿用先创建者的参数
+    # sqlalchemy（及 pyodbc 方言）在首次建立引擎、构建语句时才导入，只读本地仓库/缓存的运行不加载
+    engine_registry: Dict[Tuple[str, int, int, bool, int], 'Engine'] = {}
+    engine_registry_lock: threading.Lock = threading.Lock()
+
     database_conf: Dict[str, Dict[str, str]] = {
         "academe_dataspider": {
             "username": "Academe_bc_r",
@@ -25,25 +42,233 @@ class DatabaseOp(object):
         },
     }
 
-    def __init__(self) -> None:
-        pass
+    def __init__(self, pool_size: int = 5, max_overflow: int = 10,
+                 pool_pre_ping: bool = True, pool_recycle: int = 3600, chunksize: int = 50000,
+                 conn_urls: Dict[str, str] | None = None, sql_translator: Callable[[str], str] | None = None,
+                 query_cache: QueryCache | None = None) -> None:
+        """
+        :param pool_size: 每个数据库连接池保持的连接数
+        :param max_overflow: 连接池满时允许额外创建的连接数
+        :param pool_pre_ping: 取出连接前是否先探活（避免使用被服务端断开的连接）
+        :param pool_recycle: 连接最长复用时间（秒），超时后重建连接
+        :param chunksize: 指定列类型读取时每块的行数
+        :param conn_urls: 按数据库名称覆盖连接 URL（如指向本地 SQLite 替身库），未覆盖的数据库仍连接 database_conf
+        :param sql_translator: 查询语句改写函数（如 T-SQL 改写为替身库方言），在绑定参数前调用
+        :param query_cache: 查询结果缓存（录制/回放），为空时每次都查询数据库
+        """
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_pre_ping = pool_pre_ping
+        self.pool_recycle = pool_recycle
+        self.chunksize = chunksize
+        self.conn_urls: Dict[str, str] = conn_urls or {}
+        self.sql_translator = sql_translator
+        self.query_cache = query_cache
+
+    def with_query_cache(self, query_cache: QueryCache | None) -> 'DatabaseOp':
+        """
+        返回使用指定查询结果缓存的副本（浅拷贝），连接地址覆盖、语句改写、连接池参数均与原对象一致
+        :param query_cache: 查询结果缓存
+        :return:
+        """
+        database_op: DatabaseOp = copy.copy(self)
+        database_op.query_cache = query_cache
+
+        return database_op
 
     def get_db_conn_url(self, db_name: str) -> str:
         """
-        获取数据库连接 URL
+        获取数据库连接 URL：优先使用 conn_urls 中的覆盖地址
         :return:
         """
+        if db_name in self.conn_urls:
+            return self.conn_urls[db_name]
         db_conn_info: Dict[str, str] = self.database_conf[db_name]
         conn_url: str = f"mssql+pyodbc://{db_conn_info['username']}:{db_conn_info['passw']}@{db_conn_info['server']}/{db_conn_info['database']}?charset=utf8&driver=ODBC Driver 17 for SQL Server&TrustServerCertificate=yes"
 
         return conn_url
 
-    def get_db_connection(self, conn_url: str) -> Connection:
+    def get_engine_by_url(self, conn_url: str) -> 'Engine':
+        """
+        根据连接 URL 获取带连接池的数据库引擎，同一 URL 及连接池参数在进程内只创建一次
+        :param conn_url: 数据库连接 URL
+        :return:
+        """
+        from sqlalchemy import create_engine
+
+        engine_key: Tuple[str, int, int, bool, int] = (conn_url, self.pool_size, self.max_overflow,
+                                                       self.pool_pre_ping, self.pool_recycle)
+        with self.engine_registry_lock:
+            engine: Engine | None = self.engine_registry.get(engine_key)
+            if engine is None:
+                engine = create_engine(conn_url,
+                                       pool_size=self.pool_size,
+                                       max_overflow=self.max_overflow,
+                                       pool_pre_ping=self.pool_pre_ping,
+                                       pool_recycle=self.pool_recycle)
+                self.engine_registry[engine_key] = engine
+
+        return engine
+
+    def get_engine(self, db_name: str) -> 'Engine':
+        """
+        获取数据库引擎
+        :param db_name: 数据库名称（database_conf 中的键）
+        :return:
+        """
+        return self.get_engine_by_url(self.get_db_conn_url(db_name))
+
+    @contextmanager
+    def connect(self, db_name: str) -> Iterator['Connection']:
+        """
+        从连接池中取出一个数据库连接，退出上下文时归还连接池
+        :param db_name: 数据库名称（database_conf 中的键）
+        :return:
         """
-        获取数据库连接
+        conn: Connection = self.get_engine(db_name).connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def get_db_connection(self, conn_url: str) -> 'Connection':
+        """
+        获取数据库连接（复用连接池中的引擎）。使用完毕后需调用 close() 归还连接，推荐使用 connect()
         :param conn_url: 数据库连接 URL
         :return:
         """
-        engine: Engine = create_engine(conn_url)
+        engine: Engine = self.get_engine_by_url(conn_url)
         conn: Connection = engine.connect()
         return conn
+
+    @staticmethod
+    def bind_sql(sql: str, params: Dict[str, Any] | None = None) -> 'TextClause':
+        """
+        构建参数化查询语句：日期等标量以绑定参数传递，列表参数（如城市列表）展开为 IN (?, ?, ...)。
+        语句文本不随参数值变化，数据库服务端可复用已编译的执行计划
+        :param sql: 查询语句，参数以 :name 占位
+        :param params: 参数值
+        :return:
+        """
+        from sqlalchemy import bindparam, text
+
+        statement: TextClause = text(sql)
+        # 多条语句可共用一组参数值，只绑定语句中实际引用的列表参数
+        expanding_params = [bindparam(name, expanding=True) for name, value in (params or {}).items()
+                            if isinstance(value, (list, tuple)) and re.search(rf':{name}\b', sql)]
+        if expanding_params:
+            statement = statement.bindparams(*expanding_params)
+
+        return statement
+
+    @staticmethod
+    def cast_columns(data_df: pd.DataFrame, dtypes: List[str]) -> pd.DataFrame:
+        """
+        按列位置转换数据类型
+        :param data_df: 数据
+        :param dtypes: 按列位置指定的数据类型，如 ['category', 'datetime64[ns]', 'float64']
+        :return:
+        """
+        for column, dtype in zip(data_df.columns, dtypes):
+            if dtype.startswith('datetime64'):
+                data_df[column] = pd.to_datetime(data_df[column]).astype(dtype)
+            else:
+                data_df[column] = data_df[column].astype(dtype)
+
+        return data_df
+
+    @staticmethod
+    def concat_chunks(chunks: List[pd.DataFrame], columns: List[str] | None = None,
+                      dtypes: List[str] | None = None) -> pd.DataFrame:
+        """
+        合并分块读取的结果：分类列先统一为各块类别的并集，合并后仍为分类编码。
+        没有分块时（如各数据源在查询区间内均无数据）返回指定列名、列类型的空数据
+        :param chunks: 已转换类型的分块数据
+        :param columns: 没有分块时空数据的列名
+        :param dtypes: 没有分块时空数据的列类型，见 cast_columns
+        :return:
+        """
+        if not chunks:
+            if columns is None:
+                raise ValueError('没有可合并的分块数据，且未指定空数据的列名')
+            return DatabaseOp.cast_columns(pd.DataFrame(columns=columns), dtypes or ['object'] * len(columns))
+        if len(chunks) == 1:
+            return chunks[0]
+        for column in chunks[0].columns:
+            if isinstance(chunks[0][column].dtype, pd.CategoricalDtype):
+                # 类别按字典序排列，与 object 列排序结果一致
+                categories: pd.Index = union_categoricals([chunk[column] for chunk in chunks],
+                                                          sort_categories=True).categories
+                for chunk in chunks:
+                    chunk[column] = chunk[column].cat.set_categories(categories)
+
+        return pd.concat(chunks, ignore_index=True)
+
+    def read_sql(self, db_name: str, sql: str, params: Dict[str, Any] | None = None,
+                 dtypes: List[str] | None = None) -> pd.DataFrame:
+        """
+        执行参数化查询并返回 DataFrame（连接从连接池取出，查询结束后归还）。
+        指定列类型时按块流式读取，每块读取后立即转换为目标类型（城市为分类编码、日期为 datetime64、指标为数值），
+        峰值内存约为最终结果加一块 object 数据，不随结果集整体以 object 类型驻留。
+        配置了查询结果缓存时，相同的 数据库 + 查询语句 + 参数 + 列类型 优先从缓存读取
+        :param db_name: 数据库名称（database_conf 中的键）
+        :param sql: 查询语句，参数以 :name 占位
+        :param params: 参数值，列表参数展开为 IN 列表
+        :param dtypes: 按列位置指定的数据类型，为空时不分块、不转换
+        :return:
+        """
+        if self.query_cache is None:
+            return self.query_sql(db_name, sql, params, dtypes)
+
+        # 指向替身库的数据库以连接 URL 区分，不与生产库的缓存混用
+        return self.query_cache.fetch(self.conn_urls.get(db_name, db_name), sql, params, dtypes,
+                                      lambda: self.query_sql(db_name, sql, params, dtypes))
+
+    def query_sql(self, db_name: str, sql: str, params: Dict[str, Any] | None = None,
+                  dtypes: List[str] | None = None) -> pd.DataFrame:
+        """
+        查询数据库（不经过查询结果缓存），参数见 read_sql
+        :param db_name:
+        :param sql:
+        :param params:
+        :param dtypes:
+        :return:
+        """
+        if self.sql_translator is not None:
+            sql = self.sql_translator(sql)
+        with self.connect(db_name) as conn:
+            if dtypes is None:
+                data_df: pd.DataFrame = pd.read_sql(self.bind_sql(sql, params), conn, params=params)
+            else:
+                data_df = self.concat_chunks([
+                    self.cast_columns(chunk, dtypes)
+                    for chunk in pd.read_sql(self.bind_sql(sql, params), conn, params=params,
+                                             chunksize=self.chunksize)])
+
+        return data_df
+
+    def read_sql_concurrently(self, queries: Dict[str, Tuple]) -> Dict[str, pd.DataFrame]:
+        """
+        并发执行多条相互独立的查询，总耗时取决于最慢的一条查询。并发数不超过连接池的常驻连接数
+        （本方法常在取数线程池中被并发调用，避免同一引擎的连接占用超出连接池容量而等待超时）
+        :param queries: {查询名称: (数据库名称, 查询语句[, 参数值[, 列类型]])}，见 read_sql
+        :return: {查询名称: 查询结果}
+        """
+        if not queries:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(len(queries), self.pool_size)) as executor:
+            futures: Dict[str, Future] = {name: executor.submit(self.read_sql, *query)
+                                          for name, query in queries.items()}
+            data_dfs: Dict[str, pd.DataFrame] = {name: future.result() for name, future in futures.items()}
+
+        return data_dfs
+
+    def dispose_all(self) -> None:
+        """
+        释放所有引擎及其连接池
+        :return:
+        """
+        with self.engine_registry_lock:
+            for engine in self.engine_registry.values():
+                engine.dispose()
+            self.engine_registry.clear()
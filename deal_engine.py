@@ -0,0 +1,173 @@
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+
+class DealQueryEngine(object):
+    """
+    日度成交聚合引擎：统计阶段的期间合计（按周度数、月份、梯队等分组，附带有数天数、零成交天数）统一由本引擎计算。
+    pandas 引擎逐次筛选后分组；可选的 DuckDB 引擎（需安装 duckdb）将日度数据零拷贝注册为表，
+    日期条件下推至扫描、多个统计窗口以条件聚合一次扫描完成，适合历史较长、城市较多时的按月汇总
+    """
+    engines: Tuple[str, ...] = ('pandas', 'duckdb')
+
+    def __init__(self, engine: str = 'pandas') -> None:
+        """
+        :param engine: 聚合引擎：pandas--默认；duckdb--进程内列式查询引擎，未安装 duckdb 时回退为 pandas
+        """
+        if engine not in self.engines:
+            raise ValueError(f'不支持的聚合引擎：{engine}，可选：{self.engines}')
+        if engine == 'duckdb' and not self.is_duckdb_available():
+            print('未安装 duckdb，聚合引擎回退为 pandas')
+            engine = 'pandas'
+        self.engine = engine
+
+    @staticmethod
+    def is_duckdb_available() -> bool:
+        """
+        是否已安装 duckdb
+        :return:
+        """
+        try:
+            import duckdb  # noqa: F401
+        except ImportError:
+            return False
+
+        return True
+
+    @staticmethod
+    def quote(column: str) -> str:
+        """
+        SQL 标识符加引号（列名为中文）
+        :param column: 列名
+        :return:
+        """
+        return '"' + column.replace('"', '""') + '"'
+
+    def query_duckdb(self, sql: str, deal_df: pd.DataFrame, params: List[object] | None = None) -> pd.DataFrame:
+        """
+        在 DuckDB 中查询日度数据：数据框注册为视图 deal（零拷贝扫描），每次查询使用独立的内存连接，可在多线程中调用
+        :param sql: 查询语句，日度数据表名为 deal，参数以 ? 占位
+        :param deal_df: 日度数据
+        :param params: 参数值
+        :return:
+        """
+        import duckdb
+
+        with duckdb.connect() as conn:
+            conn.register('deal', deal_df)
+            result_df: pd.DataFrame = conn.execute(sql, params or []).df()
+
+        # 分组列恢复为原数据类型（分类编码、datetime64[ns]）
+        for column in result_df.columns.intersection(deal_df.columns):
+            if result_df[column].dtype != deal_df[column].dtype:
+                result_df[column] = result_df[column].astype(deal_df[column].dtype)
+
+        return result_df
+
+    def aggregate(self, deal_df: pd.DataFrame, value_column: str, group_columns: List[str],
+                  start_date: str | None = None, end_date: str | None = None) -> pd.DataFrame:
+        """
+        期间合计：按分组列汇总日期区间内的指标合计、有数天数、零成交天数（分组列为分类编码时只保留出现过的类别）
+        :param deal_df: 日度数据（须包含"数据日期"、分组列、指标列）
+        :param value_column: 指标列名
+        :param group_columns: 分组列
+        :param start_date: 开始日期（含），为空时不限
+        :param end_date: 结束日期（含），为空时不限
+        :return: 分组列、指标合计、有数天数、零成交天数，按分组列排序
+        """
+        if self.engine == 'duckdb':
+            conditions: List[str] = []
+            params: List[object] = []
+            for operator, date_value in (('>=', start_date), ('<=', end_date)):
+                if date_value is not None:
+                    conditions.append(f'"数据日期" {operator} ?')
+                    params.append(pd.Timestamp(date_value).to_pydatetime())
+            group_sql: str = ', '.join(self.quote(column) for column in group_columns)
+            value_sql: str = self.quote(value_column)
+            return self.query_duckdb(f"""
+                SELECT {group_sql},
+                       COALESCE(FSUM({value_sql}), 0)          AS {value_sql},
+                       COUNT({value_sql})                      AS "有数天数",
+                       COUNT(*) FILTER (WHERE {value_sql} = 0) AS "零成交天数"
+                FROM deal
+                {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+                GROUP BY {group_sql}
+                ORDER BY {group_sql}
+            """, deal_df, params)
+
+        if start_date is not None:
+            deal_df = deal_df[deal_df['数据日期'] >= start_date]
+        if end_date is not None:
+            deal_df = deal_df[deal_df['数据日期'] <= end_date]
+        deal_values: pd.Series = deal_df[value_column]
+
+        return (deal_df[group_columns]
+                .assign(**{value_column: deal_values,
+                           '有数天数': deal_values.notnull().astype(int),
+                           '零成交天数': deal_values.eq(0).astype(int)})
+                .groupby(group_columns, observed=True)[[value_column, '有数天数', '零成交天数']].sum()
+                .reset_index())
+
+    def aggregate_windows(self, deal_df: pd.DataFrame, value_column: str, group_column: str,
+                          windows: Dict[str, Tuple[str, str]]) -> pd.DataFrame:
+        """
+        多窗口期间合计：同一份日度数据按多个日期窗口分别汇总指标合计，每个窗口输出一列。
+        DuckDB 引擎以条件聚合一次扫描完成，pandas 引擎逐个窗口筛选汇总后合并
+        :param deal_df: 日度数据（须包含"数据日期"、分组列、指标列）
+        :param value_column: 指标列名
+        :param group_column: 分组列，如 梯队
+        :param windows: {输出列名: (开始日期, 结束日期)}，日期均包含在内
+        :return: 分组列 + 各窗口的指标合计，按分组列排序
+        """
+        if self.engine == 'duckdb':
+            window_sqls: List[str] = []
+            params: List[object] = []
+            for window_column, (start_date, end_date) in windows.items():
+                window_sqls.append(f'COALESCE(FSUM({self.quote(value_column)}) FILTER '
+                                   f'(WHERE "数据日期" BETWEEN ? AND ?), 0) AS {self.quote(window_column)}')
+                params.extend([pd.Timestamp(start_date).to_pydatetime(), pd.Timestamp(end_date).to_pydatetime()])
+            window_start: str = min(start_date for start_date, _ in windows.values())
+            window_end: str = max(end_date for _, end_date in windows.values())
+            params.extend([pd.Timestamp(window_start).to_pydatetime(), pd.Timestamp(window_end).to_pydatetime()])
+            return self.query_duckdb(f"""
+                SELECT {self.quote(group_column)}, {', '.join(window_sqls)}
+                FROM deal
+                WHERE "数据日期" BETWEEN ? AND ?
+                GROUP BY {self.quote(group_column)}
+                ORDER BY {self.quote(group_column)}
+            """, deal_df, params)
+
+        window_df: pd.DataFrame | None = None
+        for window_column, (start_date, end_date) in windows.items():
+            sum_df: pd.DataFrame = (self.aggregate(deal_df, value_column, [group_column], start_date, end_date)
+                                    [[group_column, value_column]].rename(columns={value_column: window_column}))
+            window_df = sum_df if window_df is None else window_df.merge(sum_df, on=group_column, how='left')
+
+        return window_df
+
+    def summarize_monthly(self, deal_df: pd.DataFrame, value_column: str) -> pd.DataFrame:
+        """
+        按 城市×月份 汇总日度成交：指标合计、有数天数、零成交天数，与服务端汇总取数的结果结构一致
+        :param deal_df: 日度数据（须包含"城市"、"数据日期"列）
+        :param value_column: 指标列名
+        :return: 城市、数据日期（月初）、指标合计、有数天数、零成交天数
+        """
+        if self.engine == 'duckdb':
+            value_sql: str = self.quote(value_column)
+            summary_df: pd.DataFrame = self.query_duckdb(f"""
+                SELECT "城市",
+                       DATE_TRUNC('month', "数据日期")         AS "数据日期",
+                       COALESCE(FSUM({value_sql}), 0)          AS {value_sql},
+                       COUNT({value_sql})                      AS "有数天数",
+                       COUNT(*) FILTER (WHERE {value_sql} = 0) AS "零成交天数"
+                FROM deal
+                GROUP BY ALL
+                ORDER BY ALL
+            """, deal_df)
+            summary_df['数据日期'] = pd.to_datetime(summary_df['数据日期']).astype(deal_df['数据日期'].dtype)
+            return summary_df
+
+        month_first_days: pd.Series = pd.to_datetime(deal_df['数据日期']).dt.to_period('M').dt.to_timestamp()
+
+        return self.aggregate(deal_df.assign(数据日期=month_first_days), value_column, ['城市', '数据日期'])
@@ -0,0 +1,220 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, List
+
+import pandas as pd
+
+
+class DealDataStore(object):
+    """
+    本地日度成交数据仓库：按 数据源/城市/数据日期 持久化已从数据库拉取的日度成交数据（SQLite），
+    报告取数时优先从本地读取，只有本地从未见过的日期才需要访问数据库。
+    同时登记各城市的取数口径（配置中的物业类型、数据来源），口径变更的城市删除已存数据后按新口径重新拉取。
+    """
+    def __init__(self, store_path: str = r'data_files/deal_store.sqlite', settle_days: int = 7) -> None:
+        """
+        :param store_path: 本地仓库文件路径
+        :param settle_days: 数据稳定天数。距今超过该天数仍无数据的日期视为"已确认缺数"，不再重复查询数据库；
+                            距今不足该天数的缺数日期下次取数时会重新查询（数据可能延迟发布）
+        """
+        self.store_path = store_path
+        self.settle_days = settle_days
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        获取本地仓库连接，首次使用时建表
+        :return:
+        """
+        if not self._initialized:
+            store_dir: str = os.path.dirname(self.store_path)
+            if store_dir:
+                os.makedirs(store_dir, exist_ok=True)
+        conn: sqlite3.Connection = sqlite3.connect(self.store_path)
+        if not self._initialized:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS deal_data (
+                    source    TEXT NOT NULL,
+                    city      TEXT NOT NULL,
+                    data_date TEXT NOT NULL,
+                    value     REAL,
+                    PRIMARY KEY (source, city, data_date)
+                );
+                CREATE TABLE IF NOT EXISTS deal_coverage (
+                    source    TEXT NOT NULL,
+                    city      TEXT NOT NULL,
+                    data_date TEXT NOT NULL,
+                    PRIMARY KEY (source, city, data_date)
+                );
+                CREATE TABLE IF NOT EXISTS deal_city_spec (
+                    source TEXT NOT NULL,
+                    city   TEXT NOT NULL,
+                    spec   TEXT NOT NULL,
+                    PRIMARY KEY (source, city)
+                );
+            """)
+            self._initialized = True
+        return conn
+
+    def sync_city_specs(self, source: str, city_specs: Dict[str, str]) -> List[str]:
+        """
+        登记各城市的取数口径：与已登记口径不一致（配置变更）的城市删除已存数据及覆盖范围，之后按新口径重新从数据库拉取
+        :param source: 数据源标识
+        :param city_specs: {城市: 取数口径}，见 ReportConfig.get_deal_city_specs
+        :return: 口径变更的城市
+        """
+        with self._lock:
+            conn: sqlite3.Connection = self._connect()
+            try:
+                stored_specs: Dict[str, str] = dict(
+                    conn.execute('SELECT city, spec FROM deal_city_spec WHERE source = ?', (source,)).fetchall())
+                changed_cities: List[str] = [city for city, spec in city_specs.items()
+                                             if city in stored_specs and stored_specs[city] != spec]
+                with conn:
+                    for table in ('deal_data', 'deal_coverage'):
+                        conn.executemany(f'DELETE FROM {table} WHERE source = ? AND city = ?',
+                                         [(source, city) for city in changed_cities])
+                    conn.executemany('INSERT OR REPLACE INTO deal_city_spec (source, city, spec) VALUES (?, ?, ?)',
+                                     [(source, city, spec) for city, spec in city_specs.items()
+                                      if stored_specs.get(city) != spec])
+            finally:
+                conn.close()
+
+        return changed_cities
+
+    def get_missing_dates(self, source: str, city_list: List[str], start_date: str, end_date: str) -> List[str]:
+        """
+        获取本地仓库中尚未覆盖的日期：只要有一个城市在该日期未被覆盖，即视为该日期需要从数据库拉取
+        :param source: 数据源标识
+        :param city_list: 城市列表
+        :param start_date: 开始日期
+        :param end_date: 结束日期
+        :return:
+        """
+        date_list: List[str] = pd.date_range(start_date, end_date).strftime('%Y-%m-%d').tolist()
+        if not city_list:
+            return []
+        with self._lock:
+            conn: sqlite3.Connection = self._connect()
+            try:
+                coverage_df: pd.DataFrame = pd.read_sql(
+                    'SELECT city, data_date FROM deal_coverage WHERE source = ? AND data_date BETWEEN ? AND ?',
+                    conn, params=(source, start_date, end_date))
+            finally:
+                conn.close()
+        coverage_df = coverage_df[coverage_df['city'].isin(city_list)]
+        covered_city_count: pd.Series = coverage_df.groupby('data_date')['city'].nunique()
+        missing_dates: List[str] = [date_i for date_i in date_list
+                                    if covered_city_count.get(date_i, 0) < len(set(city_list))]
+
+        return missing_dates
+
+    def save(self, source: str, data_df: pd.DataFrame, city_list: List[str], start_date: str, end_date: str) -> None:
+        """
+        保存从数据库拉取的日度数据，并登记覆盖范围：本次查询的城市、日期区间以数据库为准，先删除本地已存的数据及覆盖范围
+        （数据源修正或删除的历史数据不会残留）
+        :param source: 数据源标识
+        :param data_df: 日度数据（城市、数据日期、指标值三列）
+        :param city_list: 本次查询的城市列表
+        :param start_date: 本次查询的开始日期
+        :param end_date: 本次查询的结束日期
+        :return:
+        """
+        rows_df: pd.DataFrame = data_df.iloc[:, :3].copy()
+        rows_df.columns = ['city', 'data_date', 'value']
+        rows_df['data_date'] = pd.to_datetime(rows_df['data_date']).dt.strftime('%Y-%m-%d')
+        rows_df = rows_df.drop_duplicates(subset=['city', 'data_date'])
+        rows_df['value'] = rows_df['value'].astype(float)
+        data_rows = [(source, city, data_date, None if pd.isnull(value) else value)
+                     for city, data_date, value in rows_df.itertuples(index=False)]
+
+        # 覆盖范围：有数据的（城市, 日期），以及已超过稳定天数的全部（城市, 日期）
+        settled_end_date: str = (pd.Timestamp.now().normalize()
+                                 - pd.Timedelta(days=self.settle_days)).strftime('%Y-%m-%d')
+        coverage_rows = {(source, city, data_date) for city, data_date, value in rows_df.itertuples(index=False)
+                         if pd.notnull(value)}
+        settled_date_list: List[str] = pd.date_range(start_date, min(end_date, settled_end_date)).strftime(
+            '%Y-%m-%d').tolist()
+        coverage_rows.update((source, city, data_date) for city in city_list for data_date in settled_date_list)
+
+        with self._lock:
+            conn: sqlite3.Connection = self._connect()
+            try:
+                with conn:
+                    for table in ('deal_data', 'deal_coverage'):
+                        conn.executemany(f'DELETE FROM {table} WHERE source = ? AND city = ? AND data_date BETWEEN ? AND ?',
+                                         [(source, city, start_date, end_date) for city in city_list])
+                    conn.executemany('INSERT OR REPLACE INTO deal_data (source, city, data_date, value) '
+                                     'VALUES (?, ?, ?, ?)', data_rows)
+                    conn.executemany('INSERT OR IGNORE INTO deal_coverage (source, city, data_date) '
+                                     'VALUES (?, ?, ?)', sorted(coverage_rows))
+            finally:
+                conn.close()
+
+    def load(self, source: str, city_list: List[str], start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        从本地仓库读取日度数据
+        :param source: 数据源标识
+        :param city_list: 城市列表
+        :param start_date: 开始日期
+        :param end_date: 结束日期
+        :return: 城市、数据日期、指标值三列，按城市、数据日期排序
+        """
+        with self._lock:
+            conn: sqlite3.Connection = self._connect()
+            try:
+                data_df: pd.DataFrame = pd.read_sql(
+                    'SELECT city, data_date, value FROM deal_data '
+                    'WHERE source = ? AND data_date BETWEEN ? AND ? ORDER BY city, data_date',
+                    conn, params=(source, start_date, end_date))
+            finally:
+                conn.close()
+        data_df = data_df[data_df['city'].isin(city_list)].reset_index(drop=True)
+        data_df['data_date'] = pd.to_datetime(data_df['data_date'])
+
+        return data_df
+
+    def load_monthly_summary(self, source: str, city_list: List[str], start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        在本地仓库中按 城市×月份 汇总日度数据（GROUP BY），只读取汇总结果
+        :param source: 数据源标识
+        :param city_list: 城市列表
+        :param start_date: 开始日期
+        :param end_date: 结束日期
+        :return: 城市、月初日期、指标合计、有数天数、零成交天数五列，按城市、月份排序
+        """
+        with self._lock:
+            conn: sqlite3.Connection = self._connect()
+            try:
+                summary_df: pd.DataFrame = pd.read_sql(
+                    "SELECT city, substr(data_date, 1, 7) || '-01' AS month_first_day, TOTAL(value) AS value, "
+                    'COUNT(value) AS data_days, SUM(CASE WHEN value = 0 THEN 1 ELSE 0 END) AS zero_days '
+                    'FROM deal_data WHERE source = ? AND data_date BETWEEN ? AND ? '
+                    'GROUP BY city, substr(data_date, 1, 7) ORDER BY city, month_first_day',
+                    conn, params=(source, start_date, end_date))
+            finally:
+                conn.close()
+        summary_df = summary_df[summary_df['city'].isin(city_list)].reset_index(drop=True)
+        summary_df['month_first_day'] = pd.to_datetime(summary_df['month_first_day'])
+
+        return summary_df
+
+    def clear(self, source: str | None = None) -> None:
+        """
+        清空本地仓库（数据源修正历史数据后使用）
+        :param source: 数据源标识，为空时清空全部
+        :return:
+        """
+        with self._lock:
+            conn: sqlite3.Connection = self._connect()
+            try:
+                with conn:
+                    for table in ('deal_data', 'deal_coverage', 'deal_city_spec'):
+                        if source is None:
+                            conn.execute(f'DELETE FROM {table}')
+                        else:
+                            conn.execute(f'DELETE FROM {table} WHERE source = ?', (source,))
+            finally:
+                conn.close()
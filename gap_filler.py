@@ -0,0 +1,139 @@
+import os
+import threading
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from utils import CommonUtils
+
+
+class GapFiller(object):
+    """
+    自动补数引擎：按补数规则级联填充日度数据中缺失的（城市, 日期）指标值，前一规则未能填充的单元格交由下一规则处理；
+    每个被填充的单元格在"补数来源"列中标记所用规则
+    """
+    common_utils: CommonUtils = CommonUtils()
+    # 补数规则 -> 补数来源标记
+    fill_method_labels: Dict[str, str] = {
+        'cric': 'CRIC官方发布',
+        'holiday_zero': '节假日周末补0',
+        'weekday_mean': '近期同星期均值',
+        'interpolate': '线性插值',
+    }
+    # CRIC官方发布日度数据缓存：文件路径 -> (修改时间, 数据)
+    cric_data_cache: Dict[str, Tuple[int, pd.DataFrame]] = {}
+    cric_data_cache_lock: threading.Lock = threading.Lock()
+
+    def __init__(self, cric_data_path: str = r'data_files/克而瑞官方发布日度数据.xlsx',
+                 fill_methods: List[str] | None = None, trailing_weeks: int = 4,
+                 provenance_column: str = '补数来源') -> None:
+        """
+        :param cric_data_path: CRIC官方发布日度数据文件路径
+        :param fill_methods: 补数规则及顺序，默认 CRIC官方发布 -> 节假日周末补0 -> 近期同星期均值 -> 线性插值
+        :param trailing_weeks: 同星期均值取最近的周数
+        :param provenance_column: 补数来源列名
+        """
+        self.cric_data_path = cric_data_path
+        self.fill_methods = fill_methods or ['cric', 'holiday_zero', 'weekday_mean', 'interpolate']
+        self.trailing_weeks = trailing_weeks
+        self.provenance_column = provenance_column
+
+    def load_cric_data(self) -> pd.DataFrame:
+        """
+        读取CRIC官方发布日度数据（进程内缓存，文件修改后自动重新加载）
+        :return: 城市、数据日期、数据类型、成交面积/套数
+        """
+        if not os.path.exists(self.cric_data_path):
+            return pd.DataFrame(columns=['城市', '数据日期', '数据类型', '成交面积/套数'])
+        cric_mtime: int = os.stat(self.cric_data_path).st_mtime_ns
+        with self.cric_data_cache_lock:
+            cached: Tuple[int, pd.DataFrame] | None = self.cric_data_cache.get(self.cric_data_path)
+            if cached is not None and cached[0] == cric_mtime:
+                return cached[1]
+            cric_data_df: pd.DataFrame = pd.read_excel(self.cric_data_path)
+            cric_data_df['数据日期'] = pd.to_datetime(cric_data_df['数据日期'])
+            self.cric_data_cache[self.cric_data_path] = (cric_mtime, cric_data_df)
+
+        return cric_data_df
+
+    def get_cric_values(self, data_df: pd.DataFrame, value_column: str, data_type: str,
+                        holiday_zero_fill_cities: List[str]) -> pd.Series:
+        """
+        CRIC官方发布数据：按（城市, 数据日期）一次性对齐
+        """
+        cric_data_df: pd.DataFrame = self.load_cric_data()
+        cric_values: pd.Series = (cric_data_df[cric_data_df['数据类型'] == data_type]
+                                  .drop_duplicates(subset=['城市', '数据日期'], keep='last')
+                                  .set_index(['城市', '数据日期'])['成交面积/套数'])
+        lookup_index: pd.MultiIndex = pd.MultiIndex.from_arrays([data_df['城市'].astype(str),
+                                                                 pd.to_datetime(data_df['数据日期'])])
+
+        return pd.Series(cric_values.reindex(lookup_index).to_numpy(), index=data_df.index, dtype=float)
+
+    def get_holiday_zero_values(self, data_df: pd.DataFrame, value_column: str, data_type: str,
+                                holiday_zero_fill_cities: List[str]) -> pd.Series:
+        """
+        节假日周末补0：适用城市（配置"补数规则"）在节假日或周末默认成交为0
+        """
+        zero_mask: pd.Series = (data_df['城市'].isin(holiday_zero_fill_cities)
+                                & self.common_utils.is_holiday_or_weekend(data_df['数据日期']))
+
+        return pd.Series(0.0, index=data_df.index).where(zero_mask)
+
+    def get_weekday_mean_values(self, data_df: pd.DataFrame, value_column: str, data_type: str,
+                                holiday_zero_fill_cities: List[str]) -> pd.Series:
+        """
+        近期同星期均值：同一城市此前最近 trailing_weeks 个相同星期的非空值均值
+        """
+        ordered_df: pd.DataFrame = data_df.sort_values(by=['城市', '数据日期'])
+        weekday: pd.Series = pd.to_datetime(ordered_df['数据日期']).dt.weekday
+        mean_values: pd.Series = (ordered_df.groupby([ordered_df['城市'], weekday], observed=True)[value_column]
+                                  .transform(lambda x: x.shift(1).rolling(self.trailing_weeks, min_periods=1).mean()))
+
+        return mean_values.reindex(data_df.index)
+
+    def get_interpolate_values(self, data_df: pd.DataFrame, value_column: str, data_type: str,
+                               holiday_zero_fill_cities: List[str]) -> pd.Series:
+        """
+        线性插值：同一城市前后均有数据的缺数日期按相邻数据线性插值
+        """
+        ordered_df: pd.DataFrame = data_df.sort_values(by=['城市', '数据日期'])
+        interpolated_values: pd.Series = (ordered_df.groupby('城市', observed=True)[value_column]
+                                          .transform(lambda x: x.interpolate(limit_area='inside')))
+
+        return interpolated_values.reindex(data_df.index)
+
+    def fill(self, data_df: pd.DataFrame, value_column: str, data_type: str,
+             holiday_zero_fill_cities: List[str] | None = None,
+             fill_methods: List[str] | None = None) -> pd.DataFrame:
+        """
+        按补数规则级联填充缺失值
+        :param data_df: 日度数据（须包含"城市"、"数据日期"列）
+        :param value_column: 指标列名
+        :param data_type: 数据类型（新房、二手房），用于匹配CRIC官方发布数据
+        :param holiday_zero_fill_cities: 节假日周末补0的城市列表
+        :param fill_methods: 本次使用的补数规则及顺序，为空时使用默认规则
+        :return: 填充后的日度数据，补数来源列标记被填充单元格所用的规则
+        """
+        data_df = data_df.copy()
+        if self.provenance_column not in data_df.columns:
+            data_df[self.provenance_column] = None
+        if data_df.empty:
+            return data_df
+        method_funcs: Dict[str, Callable[..., pd.Series]] = {
+            'cric': self.get_cric_values,
+            'holiday_zero': self.get_holiday_zero_values,
+            'weekday_mean': self.get_weekday_mean_values,
+            'interpolate': self.get_interpolate_values,
+        }
+        for fill_method in fill_methods or self.fill_methods:
+            missing_mask: pd.Series = data_df[value_column].isnull()
+            if not missing_mask.any():
+                break
+            fill_values: pd.Series = method_funcs[fill_method](data_df, value_column, data_type,
+                                                               holiday_zero_fill_cities or [])
+            fill_mask: pd.Series = missing_mask & fill_values.notnull()
+            data_df.loc[fill_mask, value_column] = fill_values[fill_mask]
+            data_df.loc[fill_mask, self.provenance_column] = self.fill_method_labels[fill_method]
+
+        return data_df
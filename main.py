@@ -1,10 +1,20 @@
+import argparse
 import sys
+import traceback
 from datetime import datetime, timedelta
+from typing import List
+
+import pandas as pd
 
 from Report_8am_morning import Report8AmMorning
+from backfill import ReportBackfill
+from deal_engine import DealQueryEngine
+from query_cache import QueryCache
+from run_profiler import RunProfiler
 
 
-def task_exec(config_path: str):
+def task_exec(config_path: str, checkpoint_dir: str | None = None, resume: bool = False,
+              keep_checkpoints: bool = False):
     date_flag: int | None = None
     time_flag: str | None = None
     time_message: str = '请输入时间维度标志（w--周；m--月）：'
@@ -15,12 +25,16 @@ def task_exec(config_path: str):
         if date_flag == 1:
             # 用当天日期作为报告日期
             report_date = datetime.now().strftime('%Y-%m-%d')
-            report: Report8AmMorning = Report8AmMorning(config_path, report_date, time_flag='w')
+            report: Report8AmMorning = Report8AmMorning(config_path, report_date, time_flag='w',
+                                                        checkpoint_dir=checkpoint_dir, resume=resume,
+                                                        keep_checkpoints=keep_checkpoints)
             report.data_statistics()
         elif date_flag == 2:
             # 输入报告日期
             report_date = input('请输入报告日期-某个周日（yyyy-mm-dd）：')
-            report: Report8AmMorning = Report8AmMorning(config_path, report_date, time_flag='w')
+            report: Report8AmMorning = Report8AmMorning(config_path, report_date, time_flag='w',
+                                                        checkpoint_dir=checkpoint_dir, resume=resume,
+                                                        keep_checkpoints=keep_checkpoints)
             report.data_statistics()
         else:
             print('输入错误，请重新输入！')
@@ -30,12 +44,16 @@ def task_exec(config_path: str):
         if date_flag == 1:
             # 用报告数据所在月份最后一天作为报告日期
             report_date = (datetime.now().replace(day=1) - timedelta(days=1)).strftime('%Y-%m-%d')
-            report: Report8AmMorning = Report8AmMorning(config_path, report_date, time_flag='m')
+            report: Report8AmMorning = Report8AmMorning(config_path, report_date, time_flag='m',
+                                                        checkpoint_dir=checkpoint_dir, resume=resume,
+                                                        keep_checkpoints=keep_checkpoints)
             report.data_statistics()
         elif date_flag == 2:
             # 输入报告日期
             report_date = input('请输入报告日期-某个月最后一天（yyyy-mm-dd）：')
-            report: Report8AmMorning = Report8AmMorning(config_path, report_date, time_flag='m')
+            report: Report8AmMorning = Report8AmMorning(config_path, report_date, time_flag='m',
+                                                        checkpoint_dir=checkpoint_dir, resume=resume,
+                                                        keep_checkpoints=keep_checkpoints)
             report.data_statistics()
         else:
             print('输入错误，请重新输入！')
@@ -45,6 +63,150 @@ def task_exec(config_path: str):
         sys.exit(0)
 
 
+def get_default_report_date(time_flag: str) -> str:
+    """
+    获取默认报告日期：周度为最近一个周日（含当天），月度为上月最后一天
+    :param time_flag: 时间维度标志（w--周；m--月）
+    :return:
+    """
+    today: datetime = datetime.now()
+    if time_flag == 'w':
+        return (today - timedelta(days=(today.weekday() + 1) % 7)).strftime('%Y-%m-%d')
+
+    return (today.replace(day=1) - timedelta(days=1)).strftime('%Y-%m-%d')
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """
+    解析命令行参数
+    :param argv: 命令行参数，为空时读取 sys.argv
+    :return:
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description='早八点报告数据统计（不带参数运行时进入交互模式）')
+    parser.add_argument('-t', '--time-flag', choices=['w', 'm'], help='时间维度：w--周；m--月')
+    parser.add_argument('-d', '--report-date',
+                        help='报告日期（yyyy-mm-dd），周度须为周日、月度须为月末；默认为最近一个周日/上月最后一天')
+    parser.add_argument('-s', '--start-date', help='批量回溯开始日期（yyyy-mm-dd），与 --end-date 同时指定时回溯区间内的每一期报告')
+    parser.add_argument('-e', '--end-date', help='批量回溯结束日期（yyyy-mm-dd）')
+    parser.add_argument('-f', '--fill-policy', choices=list(Report8AmMorning.fill_policies), default='none',
+                        help='补数策略：prompt--交互确认；auto--程序自动补数；none--不补数直接继续（默认）')
+    parser.add_argument('-r', '--raw-format', choices=['xlsx', 'parquet', 'csv'],
+                        help='原始日度数据输出格式，默认交互补数（prompt）时为 xlsx，否则为 parquet')
+    parser.add_argument('-a', '--sql-aggregate', action='store_true',
+                        help='服务端汇总：月度报告中只需期间合计的历史月份按 城市×月份 在数据库中汇总后取数，只逐日拉取需核对的月份')
+    parser.add_argument('-p', '--profile', action='store_true',
+                        help='性能分析：对整个运行开启 cProfile，结果导出至输出目录下的 运行分析.pstats')
+    parser.add_argument('-g', '--engine', choices=list(DealQueryEngine.engines), default='pandas',
+                        help='统计阶段的聚合引擎：pandas（默认）；duckdb--进程内列式查询引擎（需安装 duckdb，未安装时回退为 pandas）')
+    parser.add_argument('-q', '--query-cache', choices=list(QueryCache.modes), default='off',
+                        help='查询结果缓存：off--不缓存（默认）；record--优先读取有效缓存，未命中时查询数据库并写入缓存；'
+                             'replay--仅回放缓存，不访问数据库，未命中时运行失败')
+    parser.add_argument('--cache-ttl', type=float, default=12,
+                        help='查询结果缓存有效期（小时），默认 12，0 表示永不过期')
+    parser.add_argument('--cache-dir', default=r'data_files/query_cache', help='查询结果缓存目录')
+    parser.add_argument('--refresh-store', action='store_true',
+                        help='刷新本地仓库：本次取数区间忽略本地已存数据，全部重新从数据库拉取并覆盖（数据源修正历史数据后使用）')
+    parser.add_argument('--resume', action='store_true',
+                        help='续跑：读取上次运行的阶段检查点，跳过参数及输入均未变化的阶段（如取数、补数确认）')
+    parser.add_argument('--checkpoint-dir',
+                        help='阶段检查点目录并在运行成功后保留检查点；默认为 输出目录/checkpoints，运行成功后删除')
+    parser.add_argument('-o', '--output-dir', default=r'data_files', help='报告输出目录，默认 data_files')
+    parser.add_argument('-c', '--config-path', default=r'data_files/config_file.xlsx', help='配置文件路径')
+    args: argparse.Namespace = parser.parse_args(argv)
+    # 显式指定检查点目录时运行成功后保留检查点
+    args.keep_checkpoints = args.checkpoint_dir is not None
+    if args.checkpoint_dir is None:
+        args.checkpoint_dir = f'{args.output_dir}/checkpoints'
+
+    if (args.start_date is None) != (args.end_date is None):
+        parser.error('批量回溯须同时指定 --start-date 和 --end-date')
+    if args.start_date is not None:
+        if args.time_flag is None:
+            parser.error('批量回溯须指定 --time-flag')
+        if args.report_date is not None:
+            parser.error('--report-date 不能与 --start-date/--end-date 同时使用')
+        try:
+            start_date: pd.Timestamp = pd.to_datetime(args.start_date, format='%Y-%m-%d')
+            end_date: pd.Timestamp = pd.to_datetime(args.end_date, format='%Y-%m-%d')
+        except ValueError:
+            parser.error(f'回溯日期格式错误：{args.start_date} ~ {args.end_date}，应为 yyyy-mm-dd')
+        if start_date > end_date:
+            parser.error(f'回溯开始日期晚于结束日期：{args.start_date} ~ {args.end_date}')
+    elif args.time_flag is not None:
+        if args.report_date is None:
+            args.report_date = get_default_report_date(args.time_flag)
+        try:
+            report_date: pd.Timestamp = pd.to_datetime(args.report_date, format='%Y-%m-%d')
+        except ValueError:
+            parser.error(f'报告日期格式错误：{args.report_date}，应为 yyyy-mm-dd')
+        if args.time_flag == 'w' and report_date.weekday() != 6:
+            parser.error(f'周度报告日期须为周日：{args.report_date}')
+        if args.time_flag == 'm' and not report_date.is_month_end:
+            parser.error(f'月度报告日期须为某个月最后一天：{args.report_date}')
+
+    return args
+
+
+def main(argv: List[str] | None = None) -> int:
+    """
+    命令行入口：指定时间维度时以批处理方式运行（无需任何输入），同时指定回溯区间时批量回溯多期报告，否则进入交互模式
+    :param argv: 命令行参数
+    :return: 退出码，0--成功；1--运行失败
+    """
+    args: argparse.Namespace = parse_args(argv)
+    if args.time_flag is None:
+        task_exec(args.config_path, args.checkpoint_dir, args.resume, args.keep_checkpoints)
+        return 0
+
+    # 可选：对整个批处理运行开启 cProfile
+    with RunProfiler.profile_run(f'{args.output_dir}/运行分析.pstats' if args.profile else None):
+        return run_batch(args)
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """
+    批处理运行：单期报告或批量回溯
+    :param args: 命令行参数，见 parse_args
+    :return: 退出码，0--成功；1--运行失败
+    """
+    query_cache: QueryCache | None = None
+    if args.query_cache != 'off':
+        query_cache = QueryCache(args.cache_dir, args.query_cache, args.cache_ttl * 3600 if args.cache_ttl > 0 else None)
+    if args.start_date is not None:
+        backfill: ReportBackfill = ReportBackfill(args.config_path, args.time_flag, args.start_date, args.end_date,
+                                                  fill_policy=args.fill_policy, output_dir=args.output_dir,
+                                                  raw_format=args.raw_format, aggregate_in_sql=args.sql_aggregate,
+                                                  query_cache=query_cache, engine=args.engine,
+                                                  checkpoint_dir=args.checkpoint_dir, resume=args.resume,
+                                                  keep_checkpoints=args.keep_checkpoints, refresh_store=args.refresh_store)
+        failed_report_dates: List[str] = backfill.run()
+        if failed_report_dates:
+            print(f'批量回溯部分报告生成失败：{failed_report_dates}，可加 --resume 重新运行以跳过已完成的阶段', file=sys.stderr)
+            return 1
+        print(f'批量回溯完成：time_flag={args.time_flag}, {args.start_date} ~ {args.end_date}, '
+              f'output_dir={args.output_dir}')
+        return 0
+
+    try:
+        report: Report8AmMorning = Report8AmMorning(args.config_path, args.report_date, time_flag=args.time_flag,
+                                                    fill_policy=args.fill_policy, output_dir=args.output_dir,
+                                                    raw_format=args.raw_format,
+                                                    aggregate_in_sql=args.sql_aggregate, query_cache=query_cache,
+                                                    engine=args.engine, checkpoint_dir=args.checkpoint_dir,
+                                                    resume=args.resume, keep_checkpoints=args.keep_checkpoints,
+                                                    refresh_store=args.refresh_store)
+        report.data_statistics()
+    except Exception:
+        traceback.print_exc()
+        print(f'报告生成失败：time_flag={args.time_flag}, report_date={args.report_date}，'
+              f'可加 --resume 重新运行以跳过已完成的阶段', file=sys.stderr)
+        return 1
+    print(f'报告生成完成：time_flag={args.time_flag}, report_date={args.report_date}, '
+          f'output_dir={args.output_dir}')
+
+    return 0
+
+
 if __name__ == '__main__':
-    config_path: str = r'data_files/config_file.xlsx'
-    task_exec(config_path)
+    sys.exit(main())
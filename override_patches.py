@@ -0,0 +1,121 @@
+import os
+import threading
+from typing import List, Tuple
+
+import pandas as pd
+
+
+class OverridePatchStore(object):
+    """
+    人工修正数据：以（数据类型, 城市, 数据日期, 指标值）记录人工补数/修正的单元格并持久化为 CSV，
+    每次运行时一次性对齐应用到内存中的日度数据，修正过的数据无需在后续报告中重复编辑。
+    修正文件既可由人工补数后的原始数据与程序存储的快照比对自动生成，也可直接编辑。
+    """
+    patch_columns: List[str] = ['数据类型', '城市', '数据日期', '指标值', '修正时间']
+    key_columns: List[str] = ['数据类型', '城市', '数据日期']
+
+    def __init__(self, patch_path: str = r'data_files/人工修正数据.csv', provenance_column: str = '补数来源',
+                 provenance_label: str = '人工修正') -> None:
+        """
+        :param patch_path: 修正文件路径
+        :param provenance_column: 补数来源列名，与自动补数一致
+        :param provenance_label: 被修正单元格的补数来源标记
+        """
+        self.patch_path = patch_path
+        self.provenance_column = provenance_column
+        self.provenance_label = provenance_label
+        self._lock = threading.Lock()
+        self._cache: Tuple[int, pd.DataFrame] | None = None
+
+    def load(self) -> pd.DataFrame:
+        """
+        读取修正文件（文件修改后自动重新加载）
+        :return:
+        """
+        if not os.path.exists(self.patch_path):
+            return pd.DataFrame(columns=self.patch_columns)
+        patch_mtime: int = os.stat(self.patch_path).st_mtime_ns
+        with self._lock:
+            if self._cache is not None and self._cache[0] == patch_mtime:
+                return self._cache[1]
+            patch_df: pd.DataFrame = pd.read_csv(self.patch_path, encoding='utf-8-sig')
+            patch_df['数据日期'] = pd.to_datetime(patch_df['数据日期'])
+            patch_df = patch_df.drop_duplicates(subset=self.key_columns, keep='last')
+            self._cache = (patch_mtime, patch_df)
+
+        return patch_df
+
+    def save(self, patch_df: pd.DataFrame) -> None:
+        """
+        追加修正数据，同一（数据类型, 城市, 数据日期）以最新一次修正为准
+        :param patch_df: 修正数据
+        :return:
+        """
+        if patch_df.empty:
+            return
+        patch_dir: str = os.path.dirname(self.patch_path)
+        if patch_dir:
+            os.makedirs(patch_dir, exist_ok=True)
+        merged_patch_df: pd.DataFrame = pd.concat([self.load(), patch_df[self.patch_columns]], ignore_index=True)
+        merged_patch_df = merged_patch_df.drop_duplicates(subset=self.key_columns, keep='last')
+        merged_patch_df['数据日期'] = pd.to_datetime(merged_patch_df['数据日期']).dt.strftime('%Y-%m-%d')
+        with self._lock:
+            merged_patch_df.to_csv(self.patch_path, index=False, encoding='utf-8-sig')
+            self._cache = None
+
+    def diff(self, original_df: pd.DataFrame, edited_df: pd.DataFrame,
+             value_column: str, data_type: str) -> pd.DataFrame:
+        """
+        比对程序存储的原始数据快照与人工编辑后的数据，提取被修改的单元格
+        :param original_df: 原始数据快照（城市、数据日期、指标列）
+        :param edited_df: 人工编辑后的数据
+        :param value_column: 指标列名
+        :param data_type: 数据类型（新房、二手房）
+        :return: 修正数据
+        """
+        key_columns: List[str] = ['城市', '数据日期']
+        original_values_df: pd.DataFrame = original_df[key_columns + [value_column]].astype({'城市': str})
+        edited_values_df: pd.DataFrame = edited_df[key_columns + [value_column]].astype({'城市': str})
+        original_values_df['数据日期'] = pd.to_datetime(original_values_df['数据日期'])
+        edited_values_df['数据日期'] = pd.to_datetime(edited_values_df['数据日期'])
+        merged_df: pd.DataFrame = original_values_df.merge(edited_values_df, on=key_columns, how='inner',
+                                                           suffixes=('', '_edited'))
+        original_values: pd.Series = merged_df[value_column]
+        edited_values: pd.Series = merged_df[f'{value_column}_edited']
+        changed_mask: pd.Series = ~((original_values == edited_values)
+                                    | (original_values.isnull() & edited_values.isnull()))
+        patch_df: pd.DataFrame = merged_df.loc[changed_mask, key_columns].copy()
+        patch_df.insert(0, '数据类型', data_type)
+        patch_df['指标值'] = edited_values[changed_mask]
+        patch_df['修正时间'] = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        return patch_df.reset_index(drop=True)
+
+    def apply(self, data_df: pd.DataFrame, value_column: str, data_type: str,
+              patch_df: pd.DataFrame | None = None) -> pd.DataFrame:
+        """
+        将修正数据按（城市, 数据日期）一次性对齐应用到日度数据，被修正的单元格在补数来源列中标记
+        :param data_df: 日度数据（须包含"城市"、"数据日期"列）
+        :param value_column: 指标列名
+        :param data_type: 数据类型（新房、二手房）
+        :param patch_df: 修正数据，为空时读取修正文件
+        :return:
+        """
+        patch_df = self.load() if patch_df is None else patch_df
+        patch_df = patch_df[patch_df['数据类型'] == data_type]
+        if patch_df.empty or data_df.empty:
+            return data_df
+        patch_values: pd.Series = patch_df.set_index(['城市', '数据日期'])['指标值']
+        lookup_index: pd.MultiIndex = pd.MultiIndex.from_arrays([data_df['城市'].astype(str),
+                                                                 pd.to_datetime(data_df['数据日期'])])
+        patch_mask: pd.Series = pd.Series(lookup_index.isin(patch_values.index), index=data_df.index)
+        if not patch_mask.any():
+            return data_df
+
+        data_df = data_df.copy()
+        data_df.loc[patch_mask, value_column] = patch_values.reindex(lookup_index[patch_mask.to_numpy()]).to_numpy()
+        if self.provenance_column not in data_df.columns:
+            data_df[self.provenance_column] = None
+        data_df.loc[patch_mask, self.provenance_column] = self.provenance_label
+
+        return data_df
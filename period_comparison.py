@@ -0,0 +1,85 @@
+from typing import Dict, List
+
+import pandas as pd
+
+
+class PeriodComparison(object):
+    """
+    同环比计算引擎：按 城市 -> 梯队 -> 全线 的层级汇总多个统计周期（周度数、月份等）的指标，
+    并计算本期环比、同比。只对最细层级做一次分组聚合，上层汇总均由最细层级结果逐级累加得到。
+    """
+    def __init__(self,
+                 hierarchy: List[str] | None = None,
+                 rollup_labels: Dict[str, str] | None = None,
+                 level_sort_order: List[str] | None = None) -> None:
+        """
+        :param hierarchy: 层级列（从粗到细），默认 ["梯队", "城市"]
+        :param rollup_labels: 汇总行在各层级列上的取值，默认 梯队="全线"、城市="整体"
+        :param level_sort_order: 最粗层级列的自定义排序
+        """
+        self.hierarchy = hierarchy or ['梯队', '城市']
+        self.rollup_labels = rollup_labels or {'梯队': '全线', '城市': '整体'}
+        self.level_sort_order = level_sort_order or ['一线', '二线', '三四线', '全线']
+
+    def compare(self,
+                current_df: pd.DataFrame,
+                last_year_df: pd.DataFrame,
+                value_column: str,
+                period_column: str,
+                periods: List[str],
+                last_year_column: str,
+                period_labels: Dict[str, str] | None = None) -> pd.DataFrame:
+        """
+        计算各层级、各统计周期的指标及本期环比、同比
+        :param current_df: 本年日度数据（须包含层级列、统计周期列、指标列）
+        :param last_year_df: 去年同期日度数据（须包含层级列、指标列）
+        :param value_column: 指标列名，如 成交面积、成交套数
+        :param period_column: 统计周期列名，如 周度数、月份
+        :param periods: 统计周期列表（从早到晚），最后两个分别为本期、上期
+        :param last_year_column: 去年同期指标的输出列名
+        :param period_labels: 统计周期 -> 输出列名，如 "第08周" -> "08周"
+        :return: 层级列 + 各统计周期 + 环比、同比、去年同期，按最粗层级自定义排序
+        """
+        period_labels = period_labels or {}
+        current_period: str = periods[-1]
+        last_period: str = periods[-2]
+        mom_column: str = f'{period_labels.get(current_period, current_period)}环比'
+        yoy_column: str = f'{period_labels.get(current_period, current_period)}同比'
+        value_columns: List[str] = periods + [last_year_column]
+
+        # 最细层级：一次分组得到 层级 x 统计周期 的指标，以及去年同期指标
+        period_df: pd.DataFrame = current_df[current_df[period_column].isin(periods)]
+        detail_df: pd.DataFrame = (period_df.groupby(self.hierarchy + [period_column], observed=True)[value_column]
+                                   .sum().unstack(period_column).reindex(columns=periods))
+        detail_df.columns.name = None
+        last_year_detail_df: pd.DataFrame = (last_year_df.groupby(self.hierarchy, observed=True)[value_column]
+                                             .sum().rename(last_year_column).reset_index())
+        detail_df = detail_df.reset_index().merge(last_year_detail_df, on=self.hierarchy, how='left')
+
+        # 上层汇总：由最细层级结果逐级累加
+        level_dfs: List[pd.DataFrame] = [detail_df]
+        for depth in range(len(self.hierarchy) - 1, -1, -1):
+            group_columns: List[str] = self.hierarchy[:depth]
+            if group_columns:
+                rollup_df: pd.DataFrame = (detail_df.groupby(group_columns, observed=True)[value_columns]
+                                           .sum().reset_index())
+            else:
+                rollup_df = detail_df[value_columns].sum().to_frame().T
+            for column in self.hierarchy[depth:]:
+                rollup_df[column] = self.rollup_labels[column]
+            level_dfs.append(rollup_df[self.hierarchy + value_columns])
+        compare_df: pd.DataFrame = pd.concat(level_dfs, ignore_index=True)
+
+        compare_df[mom_column] = ((compare_df[current_period] - compare_df[last_period])
+                                  / compare_df[last_period])
+        compare_df[yoy_column] = ((compare_df[current_period] - compare_df[last_year_column])
+                                  / compare_df[last_year_column])
+        compare_df = compare_df[self.hierarchy + periods + [mom_column, yoy_column, last_year_column]]
+
+        # 自定义排序
+        top_column: str = self.hierarchy[0]
+        category_type = pd.CategoricalDtype(categories=self.level_sort_order, ordered=True)
+        compare_df[top_column] = compare_df[top_column].astype(category_type)
+        compare_df = compare_df.sort_values(by=top_column)
+
+        return compare_df.rename(columns=period_labels)
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+import pandas as pd
+
+
+class QueryCacheMiss(LookupError):
+    """
+    仅回放模式下查询结果未缓存（或已过期）
+    """
+
+
+class QueryCache(object):
+    """
+    查询结果缓存（录制/回放）：以 数据库名称 + 规范化查询语句 + 绑定参数 + 列类型 的指纹为键，
+    查询结果以压缩列式文件（Parquet zstd，未安装 pyarrow 时为压缩 pickle）存储，超过有效期的结果视为未缓存。
+    同一报告日期反复运行时直接读取缓存；仅回放模式下完全不访问数据库，可离线复现整次运行
+    """
+    modes: Tuple[str, ...] = ('off', 'record', 'replay')
+
+    def __init__(self, cache_dir: str = r'data_files/query_cache', mode: str = 'record',
+                 ttl_seconds: float | None = 12 * 3600) -> None:
+        """
+        :param cache_dir: 缓存目录
+        :param mode: 缓存模式：off--不缓存；record--命中有效缓存时直接返回，否则查询数据库并写入缓存；
+                     replay--仅回放，未命中时抛出 QueryCacheMiss，不访问数据库
+        :param ttl_seconds: 缓存有效期（秒），为空时永不过期
+        """
+        if mode not in self.modes:
+            raise ValueError(f'不支持的查询缓存模式：{mode}，可选：{self.modes}')
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.ttl_seconds = ttl_seconds
+        self.file_format: str = self.get_file_format()
+        self.hits: int = 0
+        self.misses: int = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_file_format() -> str:
+        """
+        获取缓存文件格式：已安装 pyarrow 时为 Parquet（列式、zstd 压缩，分类/日期类型原样保留），否则为压缩 pickle
+        :return:
+        """
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return 'pkl.xz'
+
+        return 'parquet'
+
+    @staticmethod
+    def normalize_sql(sql: str) -> str:
+        """
+        规范化查询语句：合并空白、去掉末尾分号，仅缩进、换行不同的语句视为同一查询
+        :param sql: 查询语句
+        :return:
+        """
+        return re.sub(r'\s+', ' ', sql).strip().rstrip(';').strip()
+
+    def get_key(self, db_name: str, sql: str, params: Dict[str, Any] | None = None,
+                dtypes: List[str] | None = None) -> str:
+        """
+        计算查询指纹
+        :param db_name: 数据库名称
+        :param sql: 查询语句
+        :param params: 绑定参数
+        :param dtypes: 列类型
+        :return:
+        """
+        fingerprint: str = json.dumps([db_name, self.normalize_sql(sql), params or {}, dtypes],
+                                      ensure_ascii=False, sort_keys=True, default=str)
+
+        return hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()
+
+    def get_path(self, key: str) -> str:
+        """
+        获取缓存文件路径
+        :param key: 查询指纹
+        :return:
+        """
+        return os.path.join(self.cache_dir, f'{key}.{self.file_format}')
+
+    def is_fresh(self, cache_path: str) -> bool:
+        """
+        缓存文件是否存在且在有效期内
+        :param cache_path: 缓存文件路径
+        :return:
+        """
+        if not os.path.exists(cache_path):
+            return False
+
+        return self.ttl_seconds is None or time.time() - os.path.getmtime(cache_path) <= self.ttl_seconds
+
+    def load(self, cache_path: str) -> pd.DataFrame:
+        """
+        读取缓存的查询结果
+        :param cache_path: 缓存文件路径
+        :return:
+        """
+        if self.file_format == 'parquet':
+            return pd.read_parquet(cache_path)
+
+        return pd.read_pickle(cache_path, compression='xz')
+
+    def save(self, cache_path: str, data_df: pd.DataFrame, db_name: str, sql: str,
+             params: Dict[str, Any] | None) -> None:
+        """
+        写入查询结果（先写临时文件再替换，并发写入同一查询时不会读到半个文件），查询语句、参数另存为同名 JSON 便于排查
+        :param cache_path: 缓存文件路径
+        :param data_df: 查询结果
+        :param db_name: 数据库名称
+        :param sql: 查询语句
+        :param params: 绑定参数
+        :return:
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path: str = f'{cache_path}.{threading.get_ident()}.tmp'
+        if self.file_format == 'parquet':
+            data_df.to_parquet(temp_path, compression='zstd', index=False)
+        else:
+            data_df.to_pickle(temp_path, compression='xz')
+        os.replace(temp_path, cache_path)
+        with open(f'{os.path.splitext(cache_path)[0]}.json', 'w', encoding='utf-8') as f:
+            json.dump({'db_name': db_name, 'sql': self.normalize_sql(sql), 'params': params or {},
+                       'rows': len(data_df), 'recorded_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')},
+                      f, ensure_ascii=False, indent=2, default=str)
+
+    def fetch(self, db_name: str, sql: str, params: Dict[str, Any] | None, dtypes: List[str] | None,
+              query_func: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """
+        按缓存模式获取查询结果
+        :param db_name: 数据库名称
+        :param sql: 查询语句
+        :param params: 绑定参数
+        :param dtypes: 列类型
+        :param query_func: 实际查询数据库的函数
+        :return:
+        """
+        if self.mode == 'off':
+            return query_func()
+        cache_path: str = self.get_path(self.get_key(db_name, sql, params, dtypes))
+        if self.is_fresh(cache_path):
+            with self._lock:
+                self.hits += 1
+            return self.load(cache_path)
+        with self._lock:
+            self.misses += 1
+        if self.mode == 'replay':
+            raise QueryCacheMiss(f'仅回放模式下查询未缓存或已过期（{db_name}）：{cache_path}\n{self.normalize_sql(sql)}')
+        data_df: pd.DataFrame = query_func()
+        self.save(cache_path, data_df, db_name, sql, params)
+
+        return data_df
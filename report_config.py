@@ -0,0 +1,191 @@
+import os
+import pickle
+import threading
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+
+@dataclass
+class ReportConfig(object):
+    """
+    报告配置：config_file.xlsx 解析后的配置对象
+    """
+    # 新房成交：全部城市，以及按 物业类型+数据来源 划分的城市列表
+    newhouse_deal_cities: List[str]
+    newhouse_official_house_cities: List[str]
+    newhouse_official_all_cities: List[str]
+    newhouse_project_summary_cities: List[str]
+    # 二手房成交：全部城市，以及按物业类型划分的城市列表
+    secondhouse_deal_cities: List[str]
+    secondhouse_house_cities: List[str]
+    secondhouse_all_cities: List[str]
+    # 新房可售城市
+    newhouse_available_cities: List[str]
+    # 城市 -> 梯队
+    city_level_dict: Dict[str, str]
+    # 节假日、周末缺数默认补 0 的城市（可选 sheet "补数规则"，默认仅衢州）
+    holiday_zero_fill_cities: List[str]
+    # 原始配置表（sheet 名称 -> DataFrame）
+    sheets: Dict[str, pd.DataFrame] = field(repr=False)
+
+    @staticmethod
+    def from_sheets(sheets: Dict[str, pd.DataFrame]) -> 'ReportConfig':
+        """
+        根据配置工作簿的各个 sheet 构建配置对象
+        :param sheets: sheet 名称 -> DataFrame
+        :return:
+        """
+        newhouse_config_df: pd.DataFrame = sheets['新房配置']
+        secondhouse_config_df: pd.DataFrame = sheets['二手房配置']
+        if '补数规则' in sheets:
+            fill_rule_df: pd.DataFrame = sheets['补数规则']
+            holiday_zero_fill_cities: List[str] = fill_rule_df['城市'][fill_rule_df['节假日周末补零'] == '是'].tolist()
+        else:
+            holiday_zero_fill_cities = ['衢州']
+
+        return ReportConfig(
+            newhouse_deal_cities=newhouse_config_df['城市'].tolist(),
+            newhouse_official_house_cities=newhouse_config_df['城市'][
+                (newhouse_config_df['物业类型'] == '商品住宅') & (newhouse_config_df['数据来源'] == '官方发布')].tolist(),
+            newhouse_official_all_cities=newhouse_config_df['城市'][
+                (newhouse_config_df['物业类型'] == '商品房') & (newhouse_config_df['数据来源'] == '官方发布')].tolist(),
+            newhouse_project_summary_cities=newhouse_config_df['城市'][
+                (newhouse_config_df['物业类型'] == '商品住宅') & (newhouse_config_df['数据来源'] == '项目汇总')].tolist(),
+            secondhouse_deal_cities=secondhouse_config_df['城市'].tolist(),
+            secondhouse_house_cities=secondhouse_config_df['城市'][
+                secondhouse_config_df['物业类型'] == '二手商品住宅'].tolist(),
+            secondhouse_all_cities=secondhouse_config_df['城市'][
+                secondhouse_config_df['物业类型'] == '二手商品房'].tolist(),
+            newhouse_available_cities=sheets['新房可售配置']['城市'].tolist(),
+            city_level_dict=sheets['城市梯队'].set_index('城市')['梯队'].to_dict(),
+            holiday_zero_fill_cities=holiday_zero_fill_cities,
+            sheets=sheets,
+        )
+
+    @cached_property
+    def city_dtype(self) -> pd.CategoricalDtype:
+        """
+        全部配置城市共用的"城市"分类类型：各成交、可售数据的城市列统一编码，合并、拼接时无需重新编码。
+        类别按城市名排序，分组、排序结果与字符串一致
+        :return:
+        """
+        city_set = set(self.newhouse_deal_cities) | set(self.secondhouse_deal_cities) \
+            | set(self.newhouse_available_cities) | set(self.city_level_dict)
+
+        return pd.CategoricalDtype(categories=sorted(city_set))
+
+    @cached_property
+    def level_dtype(self) -> pd.CategoricalDtype:
+        """
+        "梯队"分类类型：配置中的全部梯队及汇总行"全线"，类别按梯队名排序
+        :return:
+        """
+        return pd.CategoricalDtype(categories=sorted(set(self.city_level_dict.values()) | {'全线'}))
+
+    def get_deal_city_specs(self, house_type: str) -> Dict[str, str]:
+        """
+        各城市成交数据的取数口径：新房为 物业类型|数据来源，二手房为 物业类型（同一城市多行时以逗号连接），
+        本地仓库据此识别配置变更
+        :param house_type: 数据类型：newhouse--新房；secondhouse--二手房
+        :return: {城市: 取数口径}
+        """
+        if house_type == 'newhouse':
+            config_df: pd.DataFrame = self.sheets['新房配置']
+            spec_columns: List[str] = ['物业类型', '数据来源']
+        else:
+            config_df = self.sheets['二手房配置']
+            spec_columns = ['物业类型']
+        spec_sr: pd.Series = config_df[spec_columns].astype(str).agg('|'.join, axis=1)
+
+        return spec_sr.groupby(config_df['城市'], sort=False).agg(','.join).to_dict()
+
+    def map_city_level(self, cities: pd.Series) -> pd.Series:
+        """
+        城市 -> 梯队（分类编码）
+        :param cities: 城市序列
+        :return:
+        """
+        return cities.map(self.city_level_dict).astype(self.level_dtype)
+
+
+class ReportConfigLoader(object):
+    """
+    配置加载器：进程内缓存已解析的配置，配置文件修改后自动重新加载；
+    可选地将解析结果序列化为同目录下的二进制副本（.cache.pkl），下次启动时直接反序列化，无需 openpyxl 解析
+    """
+    config_cache: Dict[str, Tuple[int, ReportConfig]] = {}
+    config_cache_lock: threading.Lock = threading.Lock()
+    # 二进制副本格式版本：ReportConfig 的字段、缓存属性等结构变更时递增，旧版本副本不再读取
+    sidecar_version: int = 2
+
+    def __init__(self, use_sidecar: bool = True) -> None:
+        self.use_sidecar = use_sidecar
+
+    def get_sidecar_path(self, config_path: str) -> str:
+        """
+        获取配置二进制副本路径
+        :param config_path: 配置文件路径
+        :return:
+        """
+        return f'{config_path}.cache.pkl'
+
+    def load(self, config_path: str) -> ReportConfig:
+        """
+        加载配置：进程缓存 -> 二进制副本 -> 解析工作簿
+        :param config_path: 配置文件路径
+        :return:
+        """
+        abs_config_path: str = os.path.abspath(config_path)
+        config_mtime: int = os.stat(abs_config_path).st_mtime_ns
+        with self.config_cache_lock:
+            cached: Tuple[int, ReportConfig] | None = self.config_cache.get(abs_config_path)
+            if cached is not None and cached[0] == config_mtime:
+                return cached[1]
+
+            report_config: ReportConfig | None = self.load_sidecar(abs_config_path, config_mtime)
+            if report_config is None:
+                sheets: Dict[str, pd.DataFrame] = pd.read_excel(abs_config_path, sheet_name=None)
+                report_config = ReportConfig.from_sheets(sheets)
+                self.save_sidecar(abs_config_path, config_mtime, report_config)
+            self.config_cache[abs_config_path] = (config_mtime, report_config)
+
+        return report_config
+
+    def load_sidecar(self, config_path: str, config_mtime: int) -> ReportConfig | None:
+        """
+        读取配置二进制副本，副本不存在、已过期、格式版本不一致或无法读取时返回 None
+        :param config_path: 配置文件路径
+        :param config_mtime: 配置文件修改时间
+        :return:
+        """
+        sidecar_path: str = self.get_sidecar_path(config_path)
+        if not self.use_sidecar or not os.path.exists(sidecar_path):
+            return None
+        try:
+            with open(sidecar_path, 'rb') as f:
+                sidecar_version, sidecar_mtime, report_config = pickle.load(f)
+        except Exception:
+            return None
+        if sidecar_version != self.sidecar_version or not isinstance(report_config, ReportConfig):
+            return None
+
+        return report_config if sidecar_mtime == config_mtime else None
+
+    def save_sidecar(self, config_path: str, config_mtime: int, report_config: ReportConfig) -> None:
+        """
+        写入配置二进制副本（写入失败不影响报告运行）
+        :param config_path: 配置文件路径
+        :param config_mtime: 配置文件修改时间
+        :param report_config: 配置对象
+        :return:
+        """
+        if not self.use_sidecar:
+            return
+        try:
+            with open(self.get_sidecar_path(config_path), 'wb') as f:
+                pickle.dump((self.sidecar_version, config_mtime, report_config), f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass
@@ -0,0 +1,105 @@
+import os
+from typing import Dict, Tuple
+
+import pandas as pd
+
+
+class ReportWriter(object):
+    """
+    报告输出层：需要人工查看的工作簿以流式方式写入 xlsx（openpyxl write-only 模式，逐行序列化，内存占用恒定）；
+    仅供程序读取的原始日度数据可改为 Parquet/CSV 输出，跳过 Excel 渲染
+    """
+    raw_formats: Tuple[str, ...] = ('xlsx', 'parquet', 'csv')
+    # 写入 xlsx 时每次转换为 Python 原生对象的行数：转换副本只保留一块，峰值内存不随 sheet 行数增长
+    excel_chunk_rows: int = 5000
+
+    def __init__(self, raw_format: str = 'xlsx') -> None:
+        """
+        :param raw_format: 原始日度数据输出格式：xlsx--Excel 工作簿（可人工补数）；parquet--每个 sheet 一个 Parquet 文件；
+                           csv--每个 sheet 一个 CSV 文件
+        """
+        if raw_format not in self.raw_formats:
+            raise ValueError(f'不支持的原始数据输出格式：{raw_format}，可选：{self.raw_formats}')
+        self.raw_format = raw_format
+
+    @staticmethod
+    def get_default_raw_format(interactive: bool) -> str:
+        """
+        获取默认的原始日度数据输出格式：交互运行时需人工核对、补数，输出 xlsx；
+        批处理运行时原始数据仅供程序读取，输出 Parquet（未安装 pyarrow 时输出 CSV）
+        :param interactive: 是否交互运行
+        :return:
+        """
+        if interactive:
+            return 'xlsx'
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return 'csv'
+
+        return 'parquet'
+
+    def write_excel(self, file_path: str, sheets: Dict[str, pd.DataFrame]) -> str:
+        """
+        流式写入 Excel 工作簿：逐 sheet、按块转换后逐行写入，不保留单元格对象及样式
+        :param file_path: 文件路径
+        :param sheets: {sheet名称: 数据}
+        :return: 文件路径
+        """
+        # openpyxl 只在写出 xlsx 时导入
+        from openpyxl import Workbook
+
+        workbook: Workbook = Workbook(write_only=True)
+        for sheet_name, data_df in sheets.items():
+            worksheet = workbook.create_sheet(title=sheet_name)
+            worksheet.append([str(column) for column in data_df.columns])
+            # 按块转为 Python 原生对象，缺失值写为空单元格
+            for chunk_start in range(0, len(data_df), self.excel_chunk_rows):
+                chunk_df: pd.DataFrame = data_df.iloc[chunk_start:chunk_start + self.excel_chunk_rows]
+                cell_df: pd.DataFrame = chunk_df.astype(object).where(chunk_df.notnull(), None)
+                for row in cell_df.itertuples(index=False, name=None):
+                    worksheet.append(row)
+        workbook.save(file_path)
+
+        return file_path
+
+    def write_raw(self, base_path: str, sheets: Dict[str, pd.DataFrame]) -> str:
+        """
+        写入原始日度数据
+        :param base_path: 不含扩展名的输出路径
+        :param sheets: {sheet名称: 数据}
+        :return: 实际输出路径：xlsx 为工作簿文件，parquet/csv 为目录（每个 sheet 一个文件）
+        """
+        if self.raw_format == 'xlsx':
+            return self.write_excel(f'{base_path}.xlsx', sheets)
+
+        os.makedirs(base_path, exist_ok=True)
+        for sheet_name, data_df in sheets.items():
+            if self.raw_format == 'parquet':
+                data_df.to_parquet(os.path.join(base_path, f'{sheet_name}.parquet'), index=False)
+            else:
+                data_df.to_csv(os.path.join(base_path, f'{sheet_name}.csv'), index=False, encoding='utf-8-sig')
+
+        return base_path
+
+    def read_raw(self, raw_data_path: str) -> Dict[str, pd.DataFrame]:
+        """
+        读取原始日度数据（人工补数后重新加载）
+        :param raw_data_path: write_raw 返回的输出路径
+        :return: {sheet名称: 数据}
+        """
+        if raw_data_path.endswith('.xlsx'):
+            return pd.read_excel(raw_data_path, sheet_name=None)
+
+        data_dfs: Dict[str, pd.DataFrame] = {}
+        for file_name in sorted(os.listdir(raw_data_path)):
+            sheet_name, file_ext = os.path.splitext(file_name)
+            if file_ext == '.parquet':
+                data_dfs[sheet_name] = pd.read_parquet(os.path.join(raw_data_path, file_name))
+            elif file_ext == '.csv':
+                data_df: pd.DataFrame = pd.read_csv(os.path.join(raw_data_path, file_name), encoding='utf-8-sig')
+                if '数据日期' in data_df.columns:
+                    data_df['数据日期'] = pd.to_datetime(data_df['数据日期'])
+                data_dfs[sheet_name] = data_df
+
+        return data_dfs
@@ -0,0 +1,171 @@
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+class RunProfiler(object):
+    """
+    运行耗时分析：以命名区间（span）记录取数、转换、写出、绘图各阶段的耗时、输入/输出行数及进程内存峰值，
+    运行结束后写出 JSON 运行报告。区间可嵌套、可在线程中使用，开销仅为计时与读取进程内存计数
+    """
+    stages: Tuple[str, ...] = ('fetch', 'transform', 'write', 'render')
+
+    def __init__(self, report_path: str | None = None) -> None:
+        """
+        :param report_path: JSON 运行报告路径，为空时只记录不写出
+        """
+        self.report_path = report_path
+        self.spans: List[Dict[str, Any]] = []
+        self.started_at: str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.start_time: float = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @staticmethod
+    def get_peak_memory_mb() -> float | None:
+        """
+        获取进程内存峰值（MB）：Unix 读取 getrusage，Windows 需安装 psutil，均不可用时返回 None
+        :return:
+        """
+        try:
+            import resource
+        except ImportError:
+            try:
+                import psutil
+            except ImportError:
+                return None
+            return round(getattr(psutil.Process().memory_info(), 'peak_wset', 0) / 1024 ** 2, 1)
+        peak_memory: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为 KB，macOS 为字节
+        return round(peak_memory / (1024 ** 2 if sys.platform == 'darwin' else 1024), 1)
+
+    def start_span(self, name: str, stage: str, rows_in: int | None = None, parent: str | None = None,
+                   **attributes: Any) -> Dict[str, Any]:
+        """
+        开始一个命名区间（与 end_span 配对使用，适用于不便缩进为 with 代码块的长流程）
+        :param name: 区间名称
+        :param stage: 阶段：fetch--取数；transform--转换；write--写出；render--绘图
+        :param rows_in: 输入行数
+        :param parent: 上级区间名称，为空时取当前线程中最近一个未结束的区间（线程池任务须显式指定）
+        :param attributes: 附加属性（如报告日期），原样写入区间记录
+        :return: 区间记录
+        """
+        if stage not in self.stages:
+            raise ValueError(f'不支持的阶段：{stage}，可选：{self.stages}')
+        parent_stack: List[Dict[str, Any]] = getattr(self._local, 'stack', [])
+        if parent is None and parent_stack:
+            parent = parent_stack[-1]['name']
+        span: Dict[str, Any] = {
+            'name': name,
+            'stage': stage,
+            'parent': parent,
+            **attributes,
+            'thread': threading.current_thread().name,
+            'start_seconds': round(time.perf_counter() - self.start_time, 4),
+            'rows_in': rows_in,
+            'rows_out': None,
+            '_start_time': time.perf_counter(),
+            '_start_peak_memory_mb': self.get_peak_memory_mb(),
+        }
+        self._local.stack = parent_stack + [span]
+
+        return span
+
+    def end_span(self, span: Dict[str, Any], rows_out: int | None = None) -> None:
+        """
+        结束区间，记录耗时、输出行数、内存峰值及本区间内的峰值增长
+        :param span: start_span 返回的区间记录
+        :param rows_out: 输出行数
+        :return:
+        """
+        start_peak_memory_mb: float | None = span.pop('_start_peak_memory_mb')
+        span['wall_seconds'] = round(time.perf_counter() - span.pop('_start_time'), 4)
+        if rows_out is not None:
+            span['rows_out'] = rows_out
+        span['peak_memory_mb'] = self.get_peak_memory_mb()
+        span['peak_memory_growth_mb'] = (None if span['peak_memory_mb'] is None
+                                         else round(span['peak_memory_mb'] - start_peak_memory_mb, 1))
+        self._local.stack = [parent for parent in getattr(self._local, 'stack', []) if parent is not span]
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, stage: str, rows_in: int | None = None, parent: str | None = None,
+             **attributes: Any) -> Iterator[Dict[str, Any]]:
+        """
+        命名区间：with 代码块内的耗时计入该区间，代码块内可设置 span['rows_out'] 记录输出行数
+        :param name: 区间名称
+        :param stage: 阶段，见 start_span
+        :param rows_in: 输入行数
+        :param parent: 上级区间名称，见 start_span
+        :param attributes: 附加属性
+        :return:
+        """
+        span: Dict[str, Any] = self.start_span(name, stage, rows_in, parent, **attributes)
+        try:
+            yield span
+        finally:
+            self.end_span(span)
+
+    def get_report(self) -> Dict[str, Any]:
+        """
+        汇总运行报告：各区间明细（按开始时间排序）及各阶段合计耗时（只计顶层区间，嵌套区间不重复累计）
+        :return:
+        """
+        with self._lock:
+            spans: List[Dict[str, Any]] = sorted(self.spans, key=lambda span: span['start_seconds'])
+        stage_seconds: Dict[str, float] = {stage: round(sum(span['wall_seconds'] for span in spans
+                                                            if span['stage'] == stage and span['parent'] is None), 4)
+                                           for stage in self.stages}
+
+        return {
+            'started_at': self.started_at,
+            'wall_seconds': round(time.perf_counter() - self.start_time, 4),
+            'peak_memory_mb': self.get_peak_memory_mb(),
+            'stage_seconds': stage_seconds,
+            'spans': spans,
+        }
+
+    def write_report(self) -> str | None:
+        """
+        写出 JSON 运行报告
+        :return: 报告路径，未指定路径时返回 None
+        """
+        if self.report_path is None:
+            return None
+        report_dir: str = os.path.dirname(self.report_path)
+        if report_dir:
+            os.makedirs(report_dir, exist_ok=True)
+        with open(self.report_path, 'w', encoding='utf-8') as f:
+            json.dump(self.get_report(), f, ensure_ascii=False, indent=2)
+
+        return self.report_path
+
+    @staticmethod
+    @contextmanager
+    def profile_run(profile_path: str | None) -> Iterator[None]:
+        """
+        对 with 代码块开启 cProfile，结束后导出 pstats 文件（可用 python -m pstats 或 snakeviz 查看）
+        :param profile_path: pstats 文件路径，为空时不开启
+        :return:
+        """
+        if profile_path is None:
+            yield
+            return
+        profile: cProfile.Profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            profile_dir: str = os.path.dirname(profile_path)
+            if profile_dir:
+                os.makedirs(profile_dir, exist_ok=True)
+            profile.dump_stats(profile_path)
+            print(f'性能分析文件已导出：{profile_path}')
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+
+class StageCheckpointStore(object):
+    """
+    阶段检查点：流水线各阶段完成后将输出数据序列化（pickle 最高协议，数据表按列块二进制写出）至本次运行的检查点目录，
+    并记录阶段指纹（阶段名称 + 运行上下文 + 阶段参数 + 各输入数据的摘要）。续跑时指纹一致的阶段直接读取检查点，
+    不再重复取数、补数确认等耗时或交互步骤；输入数据变化（如人工修正数据更新）的阶段及其下游重新执行
+    """
+
+    def __init__(self, run_dir: str, resume: bool = False, context: Dict[str, Any] | None = None) -> None:
+        """
+        :param run_dir: 本次运行的检查点目录（如 检查点目录/周度-2025-02-23）
+        :param resume: 是否续跑：读取指纹一致的检查点；否则只写入检查点
+        :param context: 运行上下文（如报告日期、配置文件摘要），任一变化时全部阶段重新执行
+        """
+        self.run_dir = run_dir
+        self.resume = resume
+        self.context: Dict[str, Any] = context or {}
+
+    @staticmethod
+    def dump(value: Any) -> bytes:
+        """
+        序列化数据
+        :param value: 数据
+        :return:
+        """
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def get_digest(data: bytes) -> str:
+        """
+        计算序列化数据的摘要：内容相同的数据序列化结果相同，摘要一致即视为输入未变化
+        :param data: 序列化数据
+        :return:
+        """
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def get_file_digest(file_path: str) -> str | None:
+        """
+        计算文件内容摘要（如配置文件、原始日度数据），目录按文件名顺序计算其下各文件的内容摘要，文件不存在时返回 None
+        :param file_path: 文件或目录路径
+        :return:
+        """
+        if not os.path.exists(file_path):
+            return None
+        digest = hashlib.sha256()
+        file_paths: List[str] = [file_path]
+        if os.path.isdir(file_path):
+            file_paths = [os.path.join(file_path, file_name) for file_name in sorted(os.listdir(file_path))]
+        for path in file_paths:
+            if os.path.isdir(path):
+                continue
+            digest.update(os.path.basename(path).encode('utf-8'))
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+
+        return digest.hexdigest()
+
+    def get_key(self, stage_name: str, params: Dict[str, Any], input_digests: Dict[str, str]) -> str:
+        """
+        计算阶段指纹
+        :param stage_name: 阶段名称
+        :param params: 阶段参数（影响阶段输出的非数据参数，如补数策略）
+        :param input_digests: {输入数据名称: 摘要}
+        :return:
+        """
+        fingerprint: str = json.dumps([stage_name, self.context, params, input_digests],
+                                      ensure_ascii=False, sort_keys=True, default=str)
+
+        return hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()
+
+    def get_path(self, stage_name: str, output_name: str | None = None) -> str:
+        """
+        获取检查点文件路径：阶段元数据为 阶段名称.json，各输出数据为 阶段名称.输出名称.pkl
+        :param stage_name: 阶段名称
+        :param output_name: 输出数据名称，为空时返回元数据路径
+        :return:
+        """
+        if output_name is None:
+            return os.path.join(self.run_dir, f'{stage_name}.json')
+
+        return os.path.join(self.run_dir, f'{stage_name}.{output_name}.pkl')
+
+    def load(self, stage_name: str, key: str) -> Tuple[Dict[str, Any], Dict[str, str]] | None:
+        """
+        读取阶段检查点：非续跑、检查点不存在或指纹不一致时返回 None
+        :param stage_name: 阶段名称
+        :param key: 阶段指纹，见 get_key
+        :return: ({输出数据名称: 数据}, {输出数据名称: 摘要})
+        """
+        meta_path: str = self.get_path(stage_name)
+        if not self.resume or not os.path.exists(meta_path):
+            return None
+        with open(meta_path, encoding='utf-8') as f:
+            meta: Dict[str, Any] = json.load(f)
+        if meta['key'] != key:
+            return None
+        outputs: Dict[str, Any] = {}
+        for output_name in meta['output_digests']:
+            output_path: str = self.get_path(stage_name, output_name)
+            if not os.path.exists(output_path):
+                return None
+            with open(output_path, 'rb') as f:
+                outputs[output_name] = pickle.load(f)
+
+        return outputs, meta['output_digests']
+
+    def save(self, stage_name: str, key: str, output_dumps: Dict[str, bytes]) -> Dict[str, str]:
+        """
+        写入阶段检查点：先写各输出数据（临时文件再替换），最后写元数据，中断时不会留下指纹有效但数据不完整的检查点
+        :param stage_name: 阶段名称
+        :param key: 阶段指纹
+        :param output_dumps: {输出数据名称: 序列化数据}
+        :return: {输出数据名称: 摘要}
+        """
+        output_digests: Dict[str, str] = {output_name: self.get_digest(data) for output_name, data in output_dumps.items()}
+        os.makedirs(self.run_dir, exist_ok=True)
+        meta_path: str = self.get_path(stage_name)
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        for output_name, data in output_dumps.items():
+            output_path: str = self.get_path(stage_name, output_name)
+            with open(f'{output_path}.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(f'{output_path}.tmp', output_path)
+        with open(f'{meta_path}.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'stage': stage_name, 'key': key, 'output_digests': output_digests,
+                       'saved_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}, f, ensure_ascii=False, indent=2)
+        os.replace(f'{meta_path}.tmp', meta_path)
+
+        return output_digests
+
+    def clear(self) -> None:
+        """
+        删除本次运行的检查点（运行成功且无需保留时调用），检查点目录为空时一并删除
+        :return:
+        """
+        shutil.rmtree(self.run_dir, ignore_errors=True)
+        try:
+            os.rmdir(os.path.dirname(self.run_dir))
+        except OSError:
+            pass
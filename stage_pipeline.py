@@ -0,0 +1,227 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+import pandas as pd
+
+from run_profiler import RunProfiler
+from stage_checkpoint import StageCheckpointStore
+
+
+@dataclass
+class PipelineStage:
+    """
+    流水线阶段：以名称标识，声明输入、输出的数据名称，func 以输入为关键字参数调用（inputs 为 {参数名: 数据名称}），
+    返回值按 outputs 顺序对应（单个输出时直接返回该值，多个输出时返回元组）
+    """
+    name: str
+    func: Callable[..., Any]
+    inputs: Dict[str, str]
+    outputs: Tuple[str, ...]
+    # 运行耗时分析中的阶段：fetch--取数；transform--转换；write--写出；render--绘图，见 RunProfiler.stages
+    stage: str = 'transform'
+    # 是否写入检查点：写出、绘图等以文件为产出的阶段每次都重新执行
+    checkpoint: bool = True
+    # 影响输出的非数据参数（如补数策略），参与检查点指纹计算；值为可调用对象时，在输入就绪后以阶段输入调用取值
+    # （如输入路径对应文件的内容摘要）
+    params: Dict[str, Any] = field(default_factory=dict)
+    # 是否独占控制台：输出控制台信息（如缺数情况、年度同比剔除城市）的阶段逐个执行，避免并发阶段的输出交错
+    exclusive: bool = False
+
+
+class StagePipeline(object):
+    """
+    声明式阶段调度：各阶段声明输入、输出后，按依赖关系自动排序，输入已全部就绪的阶段提交线程池并发执行
+    （如新房、二手房两条统计分支并行，绘图与写出统计表并行），每个阶段的耗时、行数记为运行耗时分析的一个顶层区间。
+    初始数据中已提供全部输出的阶段直接跳过（如批量回溯时预先拉取的数据源）；指定检查点时各阶段输出写入检查点，
+    续跑时指纹（参数及输入摘要）未变化的阶段直接读取检查点，见 StageCheckpointStore
+    """
+
+    def __init__(self, profiler: RunProfiler | None = None, max_workers: int = 4,
+                 checkpoint_store: StageCheckpointStore | None = None, **span_attributes: Any) -> None:
+        """
+        :param profiler: 运行耗时分析器，为空时不记录
+        :param max_workers: 并发执行阶段的最大线程数
+        :param checkpoint_store: 阶段检查点，为空时不写入、不读取检查点
+        :param span_attributes: 各阶段区间的附加属性（如报告日期）
+        """
+        self.profiler = profiler
+        self.checkpoint_store = checkpoint_store
+        self.max_workers = max_workers
+        self.span_attributes = span_attributes
+        self.stages: Dict[str, PipelineStage] = {}
+        # 控制台锁：独占控制台的阶段执行期间持有，流水线自身的输出也需获取（可重入）
+        self.console_lock = threading.RLock()
+
+    def add_stage(self, name: str, func: Callable[..., Any], inputs: Tuple[str, ...] | Dict[str, str] = (),
+                  outputs: Tuple[str, ...] = (), stage: str = 'transform', checkpoint: bool = True,
+                  params: Dict[str, Any] | None = None, exclusive: bool = False) -> None:
+        """
+        添加阶段
+        :param name: 阶段名称
+        :param func: 阶段函数，见 PipelineStage
+        :param inputs: 输入数据名称（同时作为参数名），或 {参数名: 数据名称}（同一函数用于不同数据时）
+        :param outputs: 输出数据名称
+        :param stage: 运行耗时分析中的阶段
+        :param checkpoint: 是否写入检查点
+        :param params: 影响输出的非数据参数，参与检查点指纹计算，见 PipelineStage
+        :param exclusive: 是否独占控制台，见 PipelineStage
+        :return:
+        """
+        if name in self.stages:
+            raise ValueError(f'阶段名称重复：{name}')
+        for other_stage in self.stages.values():
+            duplicate_outputs: Set[str] = set(outputs).intersection(other_stage.outputs)
+            if duplicate_outputs:
+                raise ValueError(f'阶段 {name} 与 {other_stage.name} 的输出重复：{sorted(duplicate_outputs)}')
+        if not isinstance(inputs, dict):
+            inputs = {input_name: input_name for input_name in inputs}
+        self.stages[name] = PipelineStage(name, func, inputs, tuple(outputs), stage, checkpoint, params or {},
+                                          exclusive)
+
+    def get_stage_order(self, available_names: Set[str] | None = None) -> List[str]:
+        """
+        按依赖关系排序阶段（拓扑排序，同一层按添加顺序），并校验输入均可由初始数据或其他阶段提供、依赖无环
+        :param available_names: 初始数据名称
+        :return: 阶段名称
+        """
+        available: Set[str] = set(available_names or ())
+        pending: List[PipelineStage] = list(self.stages.values())
+        ordered_names: List[str] = []
+        while pending:
+            ready_stages: List[PipelineStage] = [stage for stage in pending if available.issuperset(stage.inputs.values())]
+            if not ready_stages:
+                missing_inputs: Dict[str, List[str]] = {
+                    stage.name: sorted(set(stage.inputs.values()).difference(available)) for stage in pending}
+                raise ValueError(f'阶段输入无法满足（缺少数据或存在循环依赖）：{missing_inputs}')
+            for stage in ready_stages:
+                ordered_names.append(stage.name)
+                available.update(stage.outputs)
+                pending.remove(stage)
+
+        return ordered_names
+
+    @staticmethod
+    def count_rows(values: List[Any]) -> int:
+        """
+        统计数据中数据表的总行数（数据表或 {名称: 数据表}）
+        :param values: 数据
+        :return:
+        """
+        row_count: int = 0
+        for value in values:
+            if isinstance(value, pd.DataFrame):
+                row_count += len(value)
+            elif isinstance(value, dict):
+                row_count += sum(len(data_df) for data_df in value.values() if isinstance(data_df, pd.DataFrame))
+
+        return row_count
+
+    def get_stage_outputs(self, stage: PipelineStage, kwargs: Dict[str, Any],
+                          key: str | None = None) -> Tuple[Dict[str, Any], Dict[str, str], bool]:
+        """
+        执行单个阶段的函数；指定检查点时计算输出摘要并写入检查点，续跑时指纹一致则直接读取检查点
+        :param stage: 阶段
+        :param kwargs: 阶段输入 {参数名: 数据}
+        :param key: 阶段指纹，为空时不读写检查点
+        :return: {输出数据名称: 数据}、{输出数据名称: 摘要}、是否读取自检查点
+        """
+        if key is not None and stage.checkpoint:
+            checkpoint: Tuple[Dict[str, Any], Dict[str, str]] | None = self.checkpoint_store.load(stage.name, key)
+            if checkpoint is not None:
+                with self.console_lock:
+                    print(f'阶段 {stage.name} 的输入未变化，读取检查点')
+                return checkpoint[0], checkpoint[1], True
+
+        result: Any = stage.func(**kwargs)
+        if len(stage.outputs) == 1:
+            outputs: Dict[str, Any] = {stage.outputs[0]: result}
+        elif len(stage.outputs) != len(result):
+            raise ValueError(f'阶段 {stage.name} 的返回值个数与声明的输出不一致：{stage.outputs}')
+        else:
+            outputs = dict(zip(stage.outputs, result))
+        if key is None:
+            return outputs, {}, False
+        output_dumps: Dict[str, bytes] = {output_name: self.checkpoint_store.dump(value)
+                                          for output_name, value in outputs.items()}
+        if stage.checkpoint:
+            return outputs, self.checkpoint_store.save(stage.name, key, output_dumps), False
+
+        return outputs, {output_name: self.checkpoint_store.get_digest(data)
+                         for output_name, data in output_dumps.items()}, False
+
+    def run_stage(self, stage: PipelineStage, kwargs: Dict[str, Any],
+                  key: str | None = None) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        执行单个阶段，并记录耗时、输入/输出行数；独占控制台的阶段执行期间持有控制台锁
+        :param stage: 阶段
+        :param kwargs: 阶段输入 {参数名: 数据}
+        :param key: 阶段指纹，见 get_stage_outputs
+        :return: {输出数据名称: 数据}、{输出数据名称: 摘要}
+        """
+        if stage.exclusive:
+            with self.console_lock:
+                return self.profile_stage(stage, kwargs, key)
+
+        return self.profile_stage(stage, kwargs, key)
+
+    def profile_stage(self, stage: PipelineStage, kwargs: Dict[str, Any],
+                      key: str | None = None) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        执行单个阶段并记录运行耗时分析区间
+        :param stage: 阶段
+        :param kwargs: 阶段输入 {参数名: 数据}
+        :param key: 阶段指纹
+        :return: {输出数据名称: 数据}、{输出数据名称: 摘要}
+        """
+        if self.profiler is None:
+            return self.get_stage_outputs(stage, kwargs, key)[:2]
+
+        with self.profiler.span(stage.name, stage.stage, rows_in=self.count_rows(list(kwargs.values())),
+                                **self.span_attributes) as span:
+            outputs, output_digests, resumed = self.get_stage_outputs(stage, kwargs, key)
+            span['rows_out'] = self.count_rows(list(outputs.values()))
+            if resumed:
+                span['resumed'] = True
+
+        return outputs, output_digests
+
+    def run(self, values: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        """
+        运行流水线：输入就绪的阶段立即提交执行，任一阶段失败时不再提交新阶段，等待已提交的阶段结束后抛出异常
+        :param values: 初始数据
+        :return: 初始数据及各阶段的输出
+        """
+        values = dict(values or {})
+        self.get_stage_order(set(values))
+        pending: List[PipelineStage] = [stage for stage in self.stages.values()
+                                        if not (stage.outputs and set(stage.outputs).issubset(values))]
+        # 各数据的摘要：阶段指纹由阶段参数及其输入的摘要计算，上游输出变化时下游阶段随之重新执行
+        digests: Dict[str, str] = {}
+        if self.checkpoint_store is not None:
+            digests = {name: self.checkpoint_store.get_digest(self.checkpoint_store.dump(value))
+                       for name, value in values.items()}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='stage') as executor:
+            running: Dict[Future, PipelineStage] = {}
+            while pending or running:
+                for stage in [stage for stage in pending if set(stage.inputs.values()).issubset(values)]:
+                    kwargs: Dict[str, Any] = {param_name: values[input_name]
+                                              for param_name, input_name in stage.inputs.items()}
+                    key: str | None = None
+                    if self.checkpoint_store is not None:
+                        params: Dict[str, Any] = {param_name: param(**kwargs) if callable(param) else param
+                                                  for param_name, param in stage.params.items()}
+                        key = self.checkpoint_store.get_key(
+                            stage.name, params, {input_name: digests[input_name] for input_name in stage.inputs.values()})
+                    running[executor.submit(self.run_stage, stage, kwargs, key)] = stage
+                    pending.remove(stage)
+                done_futures, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done_futures:
+                    running.pop(future)
+                    # 阶段异常在此抛出，退出线程池时等待其余已提交的阶段结束
+                    outputs, output_digests = future.result()
+                    values.update(outputs)
+                    digests.update(output_digests)
+
+        return values
@@ -0,0 +1,47 @@
+import os
+from typing import Dict
+
+import pandas as pd
+import pytest
+
+from Report_8am_morning import Report8AmMorning
+from benchmarks.synthetic_data import SyntheticDealData
+from run_profiler import RunProfiler
+
+REPO_ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def dataset(tmp_path_factory: pytest.TempPathFactory) -> SyntheticDealData:
+    """
+    合成数据集：主数据源缺失的日期约一半由测试表补充
+    """
+    dataset: SyntheticDealData = SyntheticDealData(10, 3, data_root=str(tmp_path_factory.mktemp('synthetic')))
+    dataset.prepare()
+
+    return dataset
+
+
+def run_monthly_report(dataset: SyntheticDealData, output_dir: str, aggregate_in_sql: bool) -> Dict[str, pd.DataFrame]:
+    """
+    在替身库上运行月度报告（不使用本地仓库、不补数），返回统计表
+    """
+    report: Report8AmMorning = Report8AmMorning(dataset.config_path, '2024-11-30', 'm', use_local_store=False,
+                                                fill_policy='none', output_dir=output_dir,
+                                                aggregate_in_sql=aggregate_in_sql, profiler=RunProfiler())
+    report.database_op = dataset.standin.get_database_op()
+    report.data_statistics()
+
+    return pd.read_excel(os.path.join(output_dir, '报告数据-月度.xlsx'), sheet_name=None)
+
+
+def test_aggregate_in_sql_matches_daily(dataset: SyntheticDealData, tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # 服务端汇总须与逐日取数去重后的统计结果一致（测试表补充的日期不能丢失）
+    monkeypatch.chdir(REPO_ROOT)
+    daily_dfs: Dict[str, pd.DataFrame] = run_monthly_report(dataset, str(tmp_path / 'daily'), False)
+    summary_dfs: Dict[str, pd.DataFrame] = run_monthly_report(dataset, str(tmp_path / 'summary'), True)
+
+    assert list(summary_dfs) == list(daily_dfs)
+    for sheet_name, daily_df in daily_dfs.items():
+        pd.testing.assert_frame_equal(summary_dfs[sheet_name], daily_df, check_exact=False, rtol=1e-9,
+                                      obj=sheet_name)
@@ -0,0 +1,67 @@
+import os
+from typing import Callable, List, Tuple
+
+import pandas as pd
+import pytest
+
+from Report_8am_morning import Report8AmMorning
+from benchmarks.synthetic_data import SyntheticDealData
+from deal_store import DealDataStore
+from run_profiler import RunProfiler
+
+
+@pytest.fixture(scope='module')
+def dataset(tmp_path_factory: pytest.TempPathFactory) -> SyntheticDealData:
+    """
+    合成数据集：数据截至 2025-02-28
+    """
+    dataset: SyntheticDealData = SyntheticDealData(10, 2, data_root=str(tmp_path_factory.mktemp('synthetic')))
+    dataset.prepare()
+
+    return dataset
+
+
+def test_warm_store_over_empty_window(dataset: SyntheticDealData, tmp_path) -> None:
+    # 本地仓库已覆盖此前的日期，补拉区间内各数据源均无数据（数据延迟发布、节假日）时返回空数据并登记覆盖范围
+    report: Report8AmMorning = Report8AmMorning(dataset.config_path, '2025-03-16', 'w', use_local_store=True,
+                                                fill_policy='none', output_dir=str(tmp_path),
+                                                profiler=RunProfiler())
+    report.database_op = dataset.standin.get_database_op()
+    report.deal_store = DealDataStore(os.path.join(str(tmp_path), 'deal_store.sqlite'))
+    queried_windows: List[Tuple[str, str]] = []
+    query_func: Callable[[str, str], pd.DataFrame] = report.query_newhouse_daily_deal_data
+
+    def query_newhouse_daily_deal_data(start_date: str, end_date: str) -> pd.DataFrame:
+        queried_windows.append((start_date, end_date))
+        return query_func(start_date, end_date)
+
+    report.query_newhouse_daily_deal_data = query_newhouse_daily_deal_data
+    warm_df: pd.DataFrame = report.get_newhouse_daily_deal_data('2025-02-01', '2025-02-28')
+    assert not warm_df.empty
+
+    data_df: pd.DataFrame = report.get_newhouse_daily_deal_data('2025-02-01', '2025-03-15')
+    assert queried_windows == [('2025-02-01', '2025-02-28'), ('2025-03-01', '2025-03-15')]
+    assert data_df.columns.tolist() == ['城市', '数据日期', '成交面积']
+    pd.testing.assert_frame_equal(data_df, warm_df)
+    # 已超过稳定天数的空区间记为已覆盖，不再重复查询数据库
+    assert report.deal_store.get_missing_dates('newhouse_deal', report.config.newhouse_deal_cities,
+                                               '2025-03-01', '2025-03-15') == []
+    report.get_newhouse_daily_deal_data('2025-03-01', '2025-03-15')
+    assert len(queried_windows) == 2
+
+    # 二手房同理
+    report.get_secondhouse_daily_deal_data('2025-02-01', '2025-02-28')
+    assert report.get_secondhouse_daily_deal_data('2025-03-01', '2025-03-15').empty
+
+
+def test_query_empty_window_is_typed(dataset: SyntheticDealData, tmp_path) -> None:
+    # 不使用本地仓库时，空区间同样返回列名、列类型完整的空数据
+    report: Report8AmMorning = Report8AmMorning(dataset.config_path, '2025-03-16', 'w', use_local_store=False,
+                                                fill_policy='none', output_dir=str(tmp_path),
+                                                profiler=RunProfiler())
+    report.database_op = dataset.standin.get_database_op()
+    data_df: pd.DataFrame = report.query_secondhouse_daily_deal_data('2025-03-01', '2025-03-15')
+
+    assert data_df.empty
+    assert data_df.columns.tolist() == ['城市', '数据日期', '成交套数']
+    assert data_df.dtypes.astype(str).tolist() == report.deal_dtypes
@@ -0,0 +1,71 @@
+from typing import Any, List, Tuple
+
+import pandas as pd
+import pytest
+
+from gap_filler import GapFiller
+
+
+@pytest.fixture
+def gap_filler(tmp_path) -> GapFiller:
+    """
+    补数引擎：CRIC官方发布数据只有 甲 2024-03-11 的新房成交（乙 2024-03-05 为二手房，不参与新房补数）
+    """
+    cric_data_path: str = str(tmp_path / 'cric.xlsx')
+    pd.DataFrame({'城市': ['甲', '乙'], '数据日期': pd.to_datetime(['2024-03-11', '2024-03-05']),
+                  '数据类型': ['新房', '二手房'], '成交面积/套数': [99.0, 77.0]}).to_excel(cric_data_path, index=False)
+
+    return GapFiller(cric_data_path=cric_data_path)
+
+
+@pytest.fixture
+def deal_df() -> pd.DataFrame:
+    """
+    两个城市 2024-03-04（周一）至 2024-03-31 的日度成交，成交面积为日期的日，部分日期缺数
+    """
+    dates: pd.DatetimeIndex = pd.date_range('2024-03-04', '2024-03-31')
+    deal_df: pd.DataFrame = pd.DataFrame({'城市': ['甲'] * len(dates) + ['乙'] * len(dates),
+                                          '数据日期': list(dates) * 2,
+                                          '成交面积': [float(date.day) for date in dates] * 2})
+    missing_keys: List[Tuple[str, str]] = [('甲', '2024-03-11'), ('甲', '2024-03-16'), ('甲', '2024-03-20'),
+                                           ('乙', '2024-03-05')]
+    for city, date in missing_keys:
+        deal_df.loc[(deal_df['城市'] == city) & (deal_df['数据日期'] == date), '成交面积'] = None
+
+    return deal_df
+
+
+def get_cell(data_df: pd.DataFrame, city: str, date: str, column: str) -> Any:
+    """
+    读取（城市, 数据日期）对应的单元格
+    """
+    return data_df.loc[(data_df['城市'] == city) & (data_df['数据日期'] == date), column].iloc[0]
+
+
+def test_fill_cascade_order_and_labels(gap_filler: GapFiller, deal_df: pd.DataFrame) -> None:
+    filled_df: pd.DataFrame = gap_filler.fill(deal_df, '成交面积', '新房', holiday_zero_fill_cities=['甲'])
+
+    # CRIC官方发布优先于其后的规则
+    assert get_cell(filled_df, '甲', '2024-03-11', '成交面积') == 99.0
+    assert get_cell(filled_df, '甲', '2024-03-11', '补数来源') == 'CRIC官方发布'
+    # 适用城市的周末补0
+    assert get_cell(filled_df, '甲', '2024-03-16', '成交面积') == 0.0
+    assert get_cell(filled_df, '甲', '2024-03-16', '补数来源') == '节假日周末补0'
+    # 此前同星期（03-06、03-13）均值
+    assert get_cell(filled_df, '甲', '2024-03-20', '成交面积') == 9.5
+    assert get_cell(filled_df, '甲', '2024-03-20', '补数来源') == '近期同星期均值'
+    # 此前没有同星期数据（首个周二），且二手房的CRIC数据不参与新房补数，由线性插值填充
+    assert get_cell(filled_df, '乙', '2024-03-05', '成交面积') == 5.0
+    assert get_cell(filled_df, '乙', '2024-03-05', '补数来源') == '线性插值'
+    # 未缺数的单元格不标记补数来源，原数据不被修改
+    assert filled_df['补数来源'].notnull().sum() == 4
+    assert deal_df['成交面积'].isnull().sum() == 4
+
+
+def test_fill_methods_override(gap_filler: GapFiller, deal_df: pd.DataFrame) -> None:
+    # 指定规则顺序时只使用指定的规则：周末缺数不再补0，改为线性插值
+    filled_df: pd.DataFrame = gap_filler.fill(deal_df, '成交面积', '新房', holiday_zero_fill_cities=['甲'],
+                                              fill_methods=['interpolate'])
+
+    assert get_cell(filled_df, '甲', '2024-03-16', '成交面积') == 16.0
+    assert set(filled_df['补数来源'].dropna()) == {'线性插值'}
@@ -0,0 +1,35 @@
+import pandas as pd
+
+from override_patches import OverridePatchStore
+
+
+def test_diff_save_apply_round_trip(tmp_path) -> None:
+    store: OverridePatchStore = OverridePatchStore(patch_path=str(tmp_path / 'patches' / '人工修正数据.csv'))
+    original_df: pd.DataFrame = pd.DataFrame({'城市': ['甲', '甲', '乙'],
+                                              '数据日期': pd.to_datetime(['2024-03-01', '2024-03-02', '2024-03-01']),
+                                              '成交面积': [1.0, None, 3.0]})
+    # 人工补数：补上缺数单元格、修正一个已有值，其余不变
+    edited_df: pd.DataFrame = original_df.assign(成交面积=[1.0, 2.0, 30.0])
+
+    patch_df: pd.DataFrame = store.diff(original_df, edited_df, '成交面积', '新房')
+    assert sorted(zip(patch_df['城市'], patch_df['指标值'])) == [('乙', 30.0), ('甲', 2.0)]
+    store.save(patch_df)
+
+    # 重新读取修正文件后应用到原始数据：被修正的单元格恢复为人工编辑后的值并标记补数来源，其他数据类型不受影响
+    patched_df: pd.DataFrame = OverridePatchStore(patch_path=store.patch_path).apply(original_df, '成交面积', '新房')
+    assert patched_df['成交面积'].tolist() == [1.0, 2.0, 30.0]
+    assert patched_df['补数来源'].tolist() == [None, '人工修正', '人工修正']
+    assert store.apply(original_df, '成交面积', '二手房') is original_df
+
+
+def test_save_keeps_latest_patch(tmp_path) -> None:
+    # 同一单元格多次修正时以最新一次为准
+    store: OverridePatchStore = OverridePatchStore(patch_path=str(tmp_path / '人工修正数据.csv'))
+    original_df: pd.DataFrame = pd.DataFrame({'城市': ['甲'], '数据日期': pd.to_datetime(['2024-03-01']),
+                                              '成交面积': [1.0]})
+    store.save(store.diff(original_df, original_df.assign(成交面积=[5.0]), '成交面积', '新房'))
+    store.save(store.diff(original_df, original_df.assign(成交面积=[7.0]), '成交面积', '新房'))
+
+    patch_df: pd.DataFrame = store.load()
+    assert len(patch_df) == 1
+    assert store.apply(original_df, '成交面积', '新房')['成交面积'].tolist() == [7.0]
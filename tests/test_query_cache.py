@@ -0,0 +1,83 @@
+import os
+import time
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+import pytest
+
+from database_op import DatabaseOp
+from query_cache import QueryCache, QueryCacheMiss
+
+SQL: str = 'SELECT city_name, data_date FROM deal WHERE data_date BETWEEN :start_date AND :end_date'
+# 仅缩进、换行不同的同一查询
+FORMATTED_SQL: str = '''
+    SELECT city_name, data_date
+    FROM deal
+    WHERE data_date BETWEEN :start_date AND :end_date;
+'''
+PARAMS: Dict[str, Any] = {'start_date': '2024-03-01', 'end_date': '2024-03-31'}
+
+
+def make_query_func(calls: List[int]) -> Callable[[], pd.DataFrame]:
+    """
+    模拟数据库查询，记录查询次数
+    """
+    def query_func() -> pd.DataFrame:
+        calls.append(1)
+        return pd.DataFrame({'city_name': ['甲', '乙'], 'data_date': pd.to_datetime(['2024-03-01', '2024-03-02'])})
+
+    return query_func
+
+
+def test_record_then_replay(tmp_path) -> None:
+    cache_dir: str = str(tmp_path / 'query_cache')
+    calls: List[int] = []
+    recorded_df: pd.DataFrame = QueryCache(cache_dir, mode='record').fetch('house', SQL, PARAMS, None,
+                                                                           make_query_func(calls))
+
+    # 仅缩进、换行不同的语句命中同一缓存，回放时不访问数据库
+    replay_cache: QueryCache = QueryCache(cache_dir, mode='replay')
+    replayed_df: pd.DataFrame = replay_cache.fetch('house', FORMATTED_SQL, PARAMS, None, make_query_func(calls))
+    pd.testing.assert_frame_equal(replayed_df, recorded_df)
+    assert len(calls) == 1
+    assert (replay_cache.hits, replay_cache.misses) == (1, 0)
+
+
+def test_replay_miss_raises(tmp_path) -> None:
+    cache_dir: str = str(tmp_path / 'query_cache')
+    calls: List[int] = []
+    QueryCache(cache_dir, mode='record').fetch('house', SQL, PARAMS, None, make_query_func(calls))
+
+    # 绑定参数不同即为未缓存的查询：仅回放模式下抛出 QueryCacheMiss，不访问数据库
+    replay_cache: QueryCache = QueryCache(cache_dir, mode='replay')
+    with pytest.raises(QueryCacheMiss):
+        replay_cache.fetch('house', SQL, {**PARAMS, 'end_date': '2024-04-30'}, None, make_query_func(calls))
+    assert len(calls) == 1
+    assert replay_cache.misses == 1
+
+
+def test_expired_cache_is_miss(tmp_path) -> None:
+    cache_dir: str = str(tmp_path / 'query_cache')
+    calls: List[int] = []
+    record_cache: QueryCache = QueryCache(cache_dir, mode='record', ttl_seconds=60)
+    record_cache.fetch('house', SQL, PARAMS, None, make_query_func(calls))
+    cache_path: str = record_cache.get_path(record_cache.get_key('house', SQL, PARAMS, None))
+    expired_time: float = time.time() - 120
+    os.utime(cache_path, (expired_time, expired_time))
+
+    with pytest.raises(QueryCacheMiss):
+        QueryCache(cache_dir, mode='replay', ttl_seconds=60).fetch('house', SQL, PARAMS, None, make_query_func(calls))
+    # 录制模式下过期缓存重新查询数据库
+    record_cache.fetch('house', SQL, PARAMS, None, make_query_func(calls))
+    assert len(calls) == 2
+
+
+def test_with_query_cache_returns_copy(tmp_path) -> None:
+    # 共享的数据库操作对象不被修改
+    database_op: DatabaseOp = DatabaseOp(conn_urls={'house': 'sqlite://'})
+    query_cache: QueryCache = QueryCache(str(tmp_path / 'query_cache'), mode='replay')
+    cached_op: DatabaseOp = database_op.with_query_cache(query_cache)
+
+    assert database_op.query_cache is None
+    assert cached_op.query_cache is query_cache
+    assert cached_op.conn_urls == database_op.conn_urls
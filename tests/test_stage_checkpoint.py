@@ -0,0 +1,88 @@
+import os
+from typing import Any, Dict, List
+
+from stage_checkpoint import StageCheckpointStore
+from stage_pipeline import StagePipeline
+
+
+def run_pipeline(run_dir: str, values: Dict[str, Any], resume: bool, calls: List[str]) -> Dict[str, Any]:
+    """
+    运行 source -> (double, passthrough) -> total 流水线，记录实际执行的阶段
+    """
+    def record(name: str, value: Any) -> Any:
+        calls.append(name)
+        return value
+
+    pipeline: StagePipeline = StagePipeline(checkpoint_store=StageCheckpointStore(run_dir, resume=resume))
+    pipeline.add_stage('double', lambda x: record('double', x * 2), ('x',), ('double',))
+    pipeline.add_stage('passthrough', lambda y: record('passthrough', y), ('y',), ('passthrough',))
+    pipeline.add_stage('total', lambda double, passthrough: record('total', double + passthrough),
+                       ('double', 'passthrough'), ('total',))
+
+    return pipeline.run(values)
+
+
+def test_resume_skips_unchanged_stages(tmp_path) -> None:
+    run_dir: str = str(tmp_path / 'run')
+    calls: List[str] = []
+    run_pipeline(run_dir, {'x': 1, 'y': 10}, resume=False, calls=calls)
+    assert sorted(calls) == ['double', 'passthrough', 'total']
+
+    calls.clear()
+    assert run_pipeline(run_dir, {'x': 1, 'y': 10}, resume=True, calls=calls)['total'] == 12
+    assert calls == []
+
+
+def test_changed_input_invalidates_stage_and_downstream(tmp_path) -> None:
+    run_dir: str = str(tmp_path / 'run')
+    calls: List[str] = []
+    run_pipeline(run_dir, {'x': 1, 'y': 10}, resume=False, calls=calls)
+
+    # x 变化：double 及其下游 total 重新执行，passthrough 读取检查点
+    calls.clear()
+    assert run_pipeline(run_dir, {'x': 2, 'y': 10}, resume=True, calls=calls)['total'] == 14
+    assert sorted(calls) == ['double', 'total']
+
+
+def test_non_resume_run_ignores_checkpoints(tmp_path) -> None:
+    run_dir: str = str(tmp_path / 'run')
+    calls: List[str] = []
+    run_pipeline(run_dir, {'x': 1, 'y': 10}, resume=False, calls=calls)
+
+    calls.clear()
+    run_pipeline(run_dir, {'x': 1, 'y': 10}, resume=False, calls=calls)
+    assert sorted(calls) == ['double', 'passthrough', 'total']
+
+
+def test_file_digest_param_invalidates_stage(tmp_path) -> None:
+    # 阶段参数为文件内容摘要时，文件修改后续跑重新执行该阶段
+    run_dir: str = str(tmp_path / 'run')
+    raw_dir: str = str(tmp_path / 'raw')
+    os.makedirs(raw_dir)
+    with open(os.path.join(raw_dir, 'sheet.csv'), 'w', encoding='utf-8') as f:
+        f.write('a\n1\n')
+    calls: List[str] = []
+
+    def run(resume: bool) -> None:
+        pipeline: StagePipeline = StagePipeline(checkpoint_store=StageCheckpointStore(run_dir, resume=resume))
+        pipeline.add_stage('review', lambda raw_data_path: calls.append('review'), ('raw_data_path',), ('reviewed',),
+                           params={'raw_data_digest': lambda raw_data_path: StageCheckpointStore.get_file_digest(
+                               raw_data_path)})
+        pipeline.run({'raw_data_path': raw_dir})
+
+    run(resume=False)
+    run(resume=True)
+    assert calls == ['review']
+    with open(os.path.join(raw_dir, 'sheet.csv'), 'w', encoding='utf-8') as f:
+        f.write('a\n2\n')
+    run(resume=True)
+    assert calls == ['review', 'review']
+
+
+def test_clear_removes_run_dir(tmp_path) -> None:
+    run_dir: str = str(tmp_path / 'checkpoints' / 'run')
+    run_pipeline(run_dir, {'x': 1, 'y': 10}, resume=False, calls=[])
+    assert os.path.exists(run_dir)
+
+    StageCheckpointStore(run_dir).clear()
+    assert not os.path.exists(os.path.dirname(run_dir))
@@ -0,0 +1,74 @@
+import threading
+import time
+from typing import Any, Dict, List
+
+import pytest
+
+from stage_pipeline import StagePipeline
+
+
+def test_stage_order_follows_dependencies() -> None:
+    pipeline: StagePipeline = StagePipeline()
+    pipeline.add_stage('total', lambda a, b: a + b, ('a', 'b'), ('total',))
+    pipeline.add_stage('a', lambda x: x + 1, ('x',), ('a',))
+    pipeline.add_stage('b', lambda x: x * 2, ('x',), ('b',))
+
+    assert pipeline.get_stage_order({'x'}) == ['a', 'b', 'total']
+    assert pipeline.run({'x': 3})['total'] == 10
+
+
+def test_missing_input_detected() -> None:
+    pipeline: StagePipeline = StagePipeline()
+    pipeline.add_stage('a', lambda x: x + 1, ('x',), ('a',))
+
+    with pytest.raises(ValueError, match='阶段输入无法满足'):
+        pipeline.get_stage_order(set())
+    # 运行前校验，不执行任何阶段
+    with pytest.raises(ValueError, match='阶段输入无法满足'):
+        pipeline.run({'y': 1})
+
+
+def test_cycle_detected() -> None:
+    pipeline: StagePipeline = StagePipeline()
+    pipeline.add_stage('a', lambda b: b, ('b',), ('a',))
+    pipeline.add_stage('b', lambda a: a, ('a',), ('b',))
+
+    with pytest.raises(ValueError, match='阶段输入无法满足') as exc_info:
+        pipeline.run({})
+    assert "'a': ['b']" in str(exc_info.value) and "'b': ['a']" in str(exc_info.value)
+
+
+def test_duplicate_stage_rejected() -> None:
+    pipeline: StagePipeline = StagePipeline()
+    pipeline.add_stage('a', lambda x: x, ('x',), ('a',))
+
+    with pytest.raises(ValueError, match='阶段名称重复'):
+        pipeline.add_stage('a', lambda x: x, ('x',), ('other',))
+    with pytest.raises(ValueError, match='输出重复'):
+        pipeline.add_stage('c', lambda x: x, ('x',), ('a',))
+
+
+def test_exclusive_stages_do_not_overlap() -> None:
+    # 独占控制台的阶段逐个执行，即使输入同时就绪
+    active: List[str] = []
+    overlaps: List[List[str]] = []
+    active_lock: threading.Lock = threading.Lock()
+
+    def exclusive_stage(x: int, name: str) -> int:
+        with active_lock:
+            active.append(name)
+            if len(active) > 1:
+                overlaps.append(list(active))
+        time.sleep(0.05)
+        with active_lock:
+            active.remove(name)
+
+        return x
+
+    pipeline: StagePipeline = StagePipeline()
+    for name in ('a', 'b', 'c'):
+        pipeline.add_stage(name, lambda x, name=name: exclusive_stage(x, name), ('x',), (name,), exclusive=True)
+    values: Dict[str, Any] = pipeline.run({'x': 1})
+
+    assert [values[name] for name in ('a', 'b', 'c')] == [1, 1, 1]
+    assert overlaps == []
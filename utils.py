@@ -1,19 +1,33 @@
+import hashlib
 import os.path
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from contextlib import nullcontext
 from datetime import datetime, timedelta
-from typing import Tuple, List
+from typing import Tuple, List, Dict
 
-import holidays
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib import rcParams
 
+from run_profiler import RunProfiler
 
-# 配置中文字体支持和解决负号显示问题
-rcParams['font.sans-serif'] = ['SimHei']  # 使用黑体显示中文
-rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+# holidays、matplotlib、PIL 只在构建日历维表、绘制图表时用到，首次使用时才导入（见 get_cn_holidays、
+# render_deal_trade_charts、read_chart_digest），导入本模块不再加载绘图库
 
 
 class CommonUtils(object):
+    # 日历维表缓存：(开始年份, 结束年份) -> 日历维表
+    calendar_cache: Dict[Tuple[int, int], pd.DataFrame] = {}
+    calendar_cache_lock: threading.Lock = threading.Lock()
+    # 图表后台绘制线程（单线程串行绘制，matplotlib 绘图不保证线程安全）
+    chart_executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chart')
+    # PNG 元数据中记录图表内容摘要的键
+    chart_digest_key: str = 'DealChartDigest'
+    # 统计周期标签的分类类型（整数编码 + 标签表），所有日历维表共用，不同年份区间的数据合并后仍为分类编码。
+    # 周度数：第01周 ~ 第53周；月份（yyyy-m）：2000 ~ 2099 年，按时间先后排列
+    week_dtype: pd.CategoricalDtype = pd.CategoricalDtype(categories=[f'第{week:02d}周' for week in range(1, 54)])
+    month_dtype: pd.CategoricalDtype = pd.CategoricalDtype(
+        categories=[f'{year}-{month}' for year in range(2000, 2100) for month in range(1, 13)])
+
     def __init__(self):
         pass
 
@@ -65,21 +79,32 @@ class CommonUtils(object):
 
         return start_date, end_date
 
-    def generate_continous_data(self, city_list: List[str], start_date: str, end_date: str) -> pd.DataFrame:
+    def generate_continous_data(self, city_list: List[str], start_date: str, end_date: str,
+                                data_df: pd.DataFrame | None = None,
+                                city_dtype: pd.CategoricalDtype | None = None) -> pd.DataFrame:
         """
-        生成连续数据：根据城市列表、开始日期、结束日期生成连续数据
+        生成连续数据：根据城市列表、开始日期、结束日期一次性生成 城市×日期 的笛卡尔积网格（城市为分类编码）。
+        传入 data_df 时直接将其按网格重建索引，等价于"网格 left join 数据 + 去重"，缺失的（城市, 日期）为空值。
         :param city_list: 城市列表
         :param start_date: 开始日期
         :param end_date: 结束日期
+        :param data_df: 可选，需要对齐到网格的数据（须包含"城市"、"数据日期"两列）
+        :param city_dtype: 可选，城市分类类型（如配置中共用的 city_dtype），为空时由城市列表生成
         :return:
         """
-        columns = ['城市', '数据日期']
-        data_df = pd.DataFrame(columns=columns)
-        date_range = [date_i for date_i in pd.date_range(start_date, end_date)]
-        for city in city_list:
-            city_df: pd.DataFrame = pd.DataFrame(data={'城市': [city] * len(date_range), '数据日期': date_range},
-                                                 columns=columns)
-            data_df = city_df if data_df.empty else pd.concat([data_df, city_df], ignore_index=True)
+        # 分类按城市名排序，保证后续分组、透视结果的顺序与字符串排序一致；网格行顺序仍与城市列表一致
+        if city_dtype is None:
+            city_dtype = pd.CategoricalDtype(categories=sorted(set(city_list)))
+        grid_index: pd.MultiIndex = pd.MultiIndex.from_product(
+            [pd.Categorical(list(dict.fromkeys(city_list)), dtype=city_dtype), pd.date_range(start_date, end_date)],
+            names=['城市', '数据日期'])
+        if data_df is None:
+            return grid_index.to_frame(index=False)
+
+        data_df = data_df.assign(城市=data_df['城市'].astype(city_dtype),
+                                 数据日期=pd.to_datetime(data_df['数据日期']).astype(grid_index.levels[1].dtype))
+        data_df = data_df[data_df['城市'].notnull()].drop_duplicates(subset=['城市', '数据日期'])
+        data_df = data_df.set_index(['城市', '数据日期']).reindex(grid_index).reset_index()
 
         return data_df
 
@@ -89,6 +114,8 @@ class CommonUtils(object):
         :param years:
         :return:
         """
+        import holidays
+
         cn_holidays = []
         for year in years:
             holiday_dates = holidays.country_holidays(country='CN', subdiv=None, years=year)
@@ -96,76 +123,203 @@ class CommonUtils(object):
 
         return cn_holidays
 
+    def get_calendar_df(self, start_year: int, end_year: int) -> pd.DataFrame:
+        """
+        获取日历维表（按年份区间构建一次后缓存）：每个日期对应的报告周度数（周日归入下一周的 ISO 周）、
+        月份（yyyy-m）、星期（0=周一）、是否节假日、去年同期同星期日期；周度数、月份为分类编码（见 week_dtype、month_dtype）
+        :param start_year: 开始年份
+        :param end_year: 结束年份
+        :return: 以"数据日期"为索引的日历维表
+        """
+        with self.calendar_cache_lock:
+            calendar_df: pd.DataFrame | None = self.calendar_cache.get((start_year, end_year))
+            if calendar_df is not None:
+                return calendar_df
+
+            date_index: pd.DatetimeIndex = pd.date_range(f'{start_year}-01-01', f'{end_year}-12-31', name='数据日期')
+            weekday: pd.Index = date_index.weekday
+            # 早八点的一周 = 前一周的周日到本周的周六，因此周日往后推一天再取 ISO 周数
+            week_date_index: pd.DatetimeIndex = date_index + pd.to_timedelta((weekday == 6).astype(int), unit='D')
+            week_num: pd.Index = week_date_index.isocalendar().week.to_numpy()
+            holiday_dates = set(self.get_cn_holidays(list(range(start_year, end_year + 1))))
+            # 去年同一天（2月29日取2月28日），再对齐到相同星期
+            last_year_date_index: pd.DatetimeIndex = date_index - pd.DateOffset(years=1)
+            last_year_same_weekday_index: pd.DatetimeIndex = last_year_date_index + pd.to_timedelta(
+                (weekday - last_year_date_index.weekday) % 7, unit='D')
+            calendar_df = pd.DataFrame(data={
+                '周度数': pd.Categorical([f'第{week:02d}周' for week in week_num], dtype=self.week_dtype),
+                '月份': pd.Categorical(date_index.year.astype(str) + '-' + date_index.month.astype(str),
+                                     dtype=self.month_dtype),
+                '星期': weekday,
+                '是否节假日': [date_i in holiday_dates for date_i in date_index.date],
+                '去年同期日期': last_year_same_weekday_index,
+            }, index=date_index)
+            self.calendar_cache[(start_year, end_year)] = calendar_df
+
+        return calendar_df
+
+    def lookup_calendar(self, dates: pd.Series, column: str) -> pd.Series:
+        """
+        从日历维表中批量查询日期对应的属性（一次向量化查找，替代逐行计算）
+        :param dates: 日期序列
+        :param column: 日历维表列名：周度数、月份、星期、是否节假日、去年同期日期
+        :return:
+        """
+        dates = pd.to_datetime(dates)
+        calendar_df: pd.DataFrame = self.get_calendar_df(int(dates.min().year), int(dates.max().year))
+
+        return dates.map(calendar_df[column])
+
+    def is_holiday_or_weekend(self, dates: pd.Series) -> pd.Series:
+        """
+        判断日期是否为节假日或周末
+        :param dates: 日期序列
+        :return: 布尔序列
+        """
+        dates = pd.to_datetime(dates)
+
+        return self.lookup_calendar(dates, '是否节假日').astype(bool) | (dates.dt.weekday >= 5)
+
+    def fill_holiday_weekend_zero(self, data_df: pd.DataFrame, value_column: str, city_list: List[str]) -> pd.DataFrame:
+        """
+        节假日、周末缺数补0：指定城市在节假日或周末无成交数据时默认成交为0
+        :param data_df: 日度数据（须包含"城市"、"数据日期"列）
+        :param value_column: 指标列名
+        :param city_list: 适用该规则的城市列表
+        :return:
+        """
+        if data_df.empty:
+            return data_df
+        fill_mask: pd.Series = (data_df['城市'].isin(city_list)
+                                & data_df[value_column].isnull()
+                                & self.is_holiday_or_weekend(data_df['数据日期']))
+        data_df.loc[fill_mask, value_column] = 0
+
+        return data_df
+
+    def get_chart_spec(self, date_flag: str) -> Dict[str, str] | None:
+        """
+        获取成交趋势图的周期相关设置：周度、月度共用同一套图表布局，仅统计周期列、标题、文件名不同
+        :param date_flag: 周期标识（w：周度，m：月度）
+        :return: 统计周期列、标题、图表名称，周期标识错误时返回 None
+        """
+        chart_specs: Dict[str, Dict[str, str]] = {
+            'w': {'period_column': '周度数',
+                  'title': '图：30城新房近8周成交趋势（左）、20城二手房近8周成交趋势（右）',
+                  'chart_name': '新房二手房近8周成交趋势图'},
+            'm': {'period_column': '月份',
+                  'title': '图：30城新房近6个月成交趋势（左）、20城二手房近6个月成交趋势（右）',
+                  'chart_name': '新房二手房近6个月成交趋势图'},
+        }
+
+        return chart_specs.get(date_flag)
+
+    def get_chart_digest(self, title: str, chart_dfs: List[pd.DataFrame]) -> str:
+        """
+        计算图表内容摘要：标题及各子图绘制的（统计周期, 指标值）数据不变时摘要不变
+        :param title: 图表标题
+        :param chart_dfs: 各子图绘制的数据（统计周期列、指标列）
+        :return:
+        """
+        chart_hash = hashlib.sha256(title.encode('utf-8'))
+        for chart_df in chart_dfs:
+            chart_hash.update(pd.util.hash_pandas_object(chart_df.astype(str), index=False).to_numpy().tobytes())
+
+        return chart_hash.hexdigest()
+
+    def render_deal_trade_charts(self, chart_dfs: List[pd.DataFrame], title: str, image_path: str,
+                                 digest: str) -> None:
+        """
+        绘制并保存成交趋势图（Agg 画布，不使用 pyplot 全局状态，字体配置仅在本图范围内生效），内容摘要写入 PNG 元数据
+        :param chart_dfs: 新房、二手房绘制的数据（统计周期列、指标列）
+        :param title: 图表标题
+        :param image_path: 图片路径
+        :param digest: 内容摘要，见 get_chart_digest
+        :return:
+        """
+        from matplotlib import rc_context
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        # 中文字体、负号显示只在本图范围内生效，不修改进程内的全局配置（绘制在后台线程中进行）
+        with rc_context({'font.sans-serif': ['SimHei'], 'axes.unicode_minus': False}):
+            fig: Figure = Figure(figsize=(12, 6), dpi=100)
+            FigureCanvasAgg(fig)
+            axes = fig.subplots(1, 2)  # 1行2列布局
+            fig.suptitle(title, fontsize=20, fontweight='bold')  # 设置标题并加粗
+
+            # 左：新房成交面积柱状图；右：二手房成交套数柱状图
+            for ax, chart_df, color, ylabel in zip(axes, chart_dfs, ['#008080', '#ff7f50'], ['万平方米', '套']):
+                ax.bar(chart_df.iloc[:, 0].astype(str), chart_df.iloc[:, 1], color=color)
+                ax.set_ylabel(ylabel, fontsize=12, rotation=90)
+                ax.tick_params(axis='x', rotation=45)  # 旋转x轴标签
+                ax.spines['top'].set_visible(False)  # 去除上边框
+                ax.spines['right'].set_visible(False)  # 去除右边框
+
+            # 调整布局并保存
+            fig.tight_layout()
+            fig.savefig(image_path, metadata={self.chart_digest_key: digest})
+
+    def read_chart_digest(self, image_path: str) -> str | None:
+        """
+        读取已生成图片中记录的内容摘要
+        :param image_path: 图片路径
+        :return: 图片不存在或未记录摘要时返回 None
+        """
+        if not os.path.exists(image_path):
+            return None
+        from PIL import Image
+
+        try:
+            with Image.open(image_path) as image:
+                return image.info.get(self.chart_digest_key)
+        except OSError:
+            return None
+
     def gen_deal_trade_charts(self, newhouse_deal_df: pd.DataFrame,
                               secondhouse_deal_df: pd.DataFrame,
                               save_path: str,
-                              date_flag: str) -> None:
+                              date_flag: str,
+                              profiler: RunProfiler | None = None,
+                              parent: str | None = None) -> Future | None:
         """
-        生成周度图表：生成新房成交面积和二手房成交套数的周度图表
-        :param newhouse_deal_df:
-        :param secondhouse_deal_df:
-        :param save_path:
-        :return:
+        生成成交趋势图：新房成交面积（左）、二手房成交套数（右）的周度或月度柱状图。
+        在后台线程中绘制（无界面、不阻塞），绘制数据与已生成图片一致时跳过重新绘制
+        :param newhouse_deal_df: 新房数据（统计周期列、成交面积）
+        :param secondhouse_deal_df: 二手房数据（统计周期列、成交套数）
+        :param save_path: 图片保存目录
+        :param date_flag: 周期标识（w：周度，m：月度）
+        :param profiler: 可选，运行耗时分析器，绘制耗时记为 render 阶段
+        :param parent: 可选，绘制耗时区间的上级区间名称（由流水线阶段等待绘制完成时，避免重复计入 render 阶段）
+        :return: 后台绘制任务，result() 返回图片路径
         """
-        if date_flag == 'w':
-            img_title = '图：30城新房近8周成交趋势（左）、20城二手房近8周成交趋势（右）'
-        elif date_flag == 'm':
-            img_title = '图：30城新房近6个月成交趋势（左）、20城二手房近6个月成交趋势（右）'
-        else:
+        chart_spec: Dict[str, str] | None = self.get_chart_spec(date_flag)
+        if chart_spec is None:
             print('输入错误，请重新输入！')
-            return
-        # 创建图表
-        if date_flag == 'w':
-            fig, axes = plt.subplots(1, 2, figsize=(12, 6), dpi=100)  # 2行1列布局
-            fig.suptitle(img_title, fontsize=20, fontweight='bold')  # 设置标题并加粗
-
-            # 新房成交面积柱状图
-            axes[0].bar(newhouse_deal_df["周度数"], newhouse_deal_df["成交面积"], color='#008080')
-            # axes[0].set_title("图：30城新房近8周成交趋势（左）", fontsize=20, fontweight='bold')  # 设置标题并加粗
-            axes[0].set_ylabel("万平方米", fontsize=12, rotation=90)
-            axes[0].tick_params(axis='x', rotation=45)  # 旋转x轴标签
-            axes[0].spines['top'].set_visible(False)  # 去除上边框
-            axes[0].spines['right'].set_visible(False)  # 去除右边框
-
-            # 二手房成交套数柱状图
-            axes[1].bar(secondhouse_deal_df["周度数"], secondhouse_deal_df["成交套数"], color='#ff7f50')
-            # axes[1].set_title("图：20城二手房近8周成交趋势（右）", fontsize=20, fontweight='bold')  # 设置标题并加粗
-            axes[1].set_ylabel("套", fontsize=12, rotation=90)
-            axes[1].tick_params(axis='x', rotation=45)  # 旋转x轴标签
-            axes[1].spines['top'].set_visible(False)  # 去除上边框
-            axes[1].spines['right'].set_visible(False)  # 去除右边框
+            return None
+        period_column: str = chart_spec['period_column']
+        chart_name: str = chart_spec['chart_name']
+        # 绘制数据在提交前复制，调用方后续修改不影响后台绘制
+        chart_dfs: List[pd.DataFrame] = [newhouse_deal_df[[period_column, '成交面积']].copy(),
+                                         secondhouse_deal_df[[period_column, '成交套数']].copy()]
+        image_path: str = os.path.join(save_path, f'{chart_name}.png')
 
-            # 调整布局并保存
-            plt.tight_layout()
-            plt.savefig(os.path.join(save_path, '新房二手房近8周成交趋势图.png'))  # 可选：保存图表
-            plt.show()
-            print('新房二手房近8周成交趋势图已生成！')
-        elif date_flag == 'm':
-            fig, axes = plt.subplots(1, 2, figsize=(12, 6), dpi=100)  # 2行1列布局
-            fig.suptitle(img_title, fontsize=20, fontweight='bold')  # 设置标题并加粗
-
-            # 新房成交面积柱状图
-            axes[0].bar(newhouse_deal_df["月份"], newhouse_deal_df["成交面积"], color='#008080')
-            # axes[0].set_title("图：30城新房近8周成交趋势（左）", fontsize=20, fontweight='bold')  # 设置标题并加粗
-            axes[0].set_ylabel("万平方米", fontsize=12, rotation=90)
-            axes[0].tick_params(axis='x', rotation=45)  # 旋转x轴标签
-            axes[0].spines['top'].set_visible(False)  # 去除上边框
-            axes[0].spines['right'].set_visible(False)  # 去除右边框
-
-            # 二手房成交套数柱状图
-            axes[1].bar(secondhouse_deal_df["月份"], secondhouse_deal_df["成交套数"], color='#ff7f50')
-            # axes[1].set_title("图：20城二手房近8周成交趋势（右）", fontsize=20, fontweight='bold')  # 设置标题并加粗
-            axes[1].set_ylabel("套", fontsize=12, rotation=90)
-            axes[1].tick_params(axis='x', rotation=45)  # 旋转x轴标签
-            axes[1].spines['top'].set_visible(False)  # 去除上边框
-            axes[1].spines['right'].set_visible(False)  # 去除右边框
+        def render() -> str:
+            render_span = (nullcontext({}) if profiler is None
+                           else profiler.span(f'render:{chart_name}', 'render', rows_in=sum(map(len, chart_dfs)),
+                                              parent=parent))
+            with render_span as span:
+                digest: str = self.get_chart_digest(chart_spec['title'], chart_dfs)
+                span['skipped'] = self.read_chart_digest(image_path) == digest
+                if span['skipped']:
+                    print(f'{chart_name}数据未变化，跳过重新生成')
+                    return image_path
+                self.render_deal_trade_charts(chart_dfs, chart_spec['title'], image_path, digest)
+                print(f'{chart_name}已生成！')
 
-            # 调整布局并保存
-            plt.tight_layout()
-            plt.savefig(os.path.join(save_path, '新房二手房近6个月成交趋势图.png'))  # 可选：保存图表
-            plt.show()
-            print('新房二手房近6个月成交趋势图已生成！')
+            return image_path
 
+        return self.chart_executor.submit(render)
 
 if __name__ == '__main__':
     common = CommonUtils()